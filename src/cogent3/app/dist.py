@@ -1,6 +1,11 @@
-import itertools
+import os
+
+from hashlib import md5
+
+from numpy import zeros
 
 from cogent3 import get_moltype, make_tree
+from cogent3.evolve.blocked_distance import blocked_distances
 from cogent3.evolve.fast_distance import (
     DistanceMatrix,
     get_distance_calculator,
@@ -34,7 +39,37 @@ class fast_slow_dist(ComposableDistance):
     _output_types = (PAIRWISE_DISTANCE_TYPE, SERIALISABLE_TYPE)
     _data_types = ("ArrayAlignment", "Alignment")
 
-    def __init__(self, distance=None, moltype=None, fast_calc=None, slow_calc=None):
+    def __init__(
+        self,
+        distance=None,
+        moltype=None,
+        fast_calc=None,
+        slow_calc=None,
+        out_dir=None,
+        tile_size=1000,
+    ):
+        """
+        Parameters
+        ----------
+        distance : str
+            name of a distance used for both fast and slow calculation
+        moltype : str
+            molecular type
+        fast_calc : str
+            name of a pairwise distance calculator, see
+            cogent3.evolve.fast_distance.available_distances
+        slow_calc : str
+            name of a substitution model, used for pairs whose fast distance
+            is 0
+        out_dir : str
+            if provided, fast distances are computed in tiles and written
+            into a subdirectory named from the alignment source, or from a
+            checksum of the sequences if it has no source. The returned
+            matrix reads distances from disk. Requires fast_calc and cannot
+            be combined with slow_calc.
+        tile_size : int
+            number of sequences in the row and column blocks of a tile
+        """
         super(fast_slow_dist, self).__init__(
             input_types=self._input_types,
             output_types=self._output_types,
@@ -55,6 +90,7 @@ class fast_slow_dist(ComposableDistance):
         if d and not self._moltype:
             raise ValueError(f"you must provide a moltype for {d}")
 
+        self._fast_label = fast_calc
         try:
             fast_calc = get_distance_calculator(fast_calc, moltype=self._moltype)
         except (ValueError, AttributeError):
@@ -68,6 +104,9 @@ class fast_slow_dist(ComposableDistance):
         if not (fast_calc or slow_calc):
             raise ValueError(f"invalid values for {slow_calc} or {fast_calc}")
 
+        if out_dir and (slow_calc or not fast_calc):
+            raise ValueError("out_dir requires fast_calc and no slow_calc")
+
         self.fast_calc = fast_calc
         if fast_calc and self._moltype and fast_calc.moltype != self._moltype:
             raise ValueError(
@@ -81,6 +120,8 @@ class fast_slow_dist(ComposableDistance):
         elif slow_calc:
             self._moltype = slow_calc.moltype
         self._sm = slow_calc
+        self._out_dir = out_dir
+        self._tile_size = tile_size
 
     def _est_dist_pair_slow(self, aln):
         """returns distance between seq pairs in aln"""
@@ -97,12 +138,27 @@ class fast_slow_dist(ComposableDistance):
         if self._moltype and self._moltype != aln.moltype:
             aln = aln.to_moltype(self._moltype)
 
+        if self._out_dir:
+            source = aln.info.get("source", None)
+            # make_aligned_seqs assigns "unknown" if no source is given
+            if source and source != "unknown":
+                name = os.path.splitext(os.path.basename(source))[0]
+            else:
+                name = _content_digest(aln)
+            return blocked_distances(
+                aln,
+                self._fast_label,
+                os.path.join(self._out_dir, name),
+                tile_size=self._tile_size,
+                show_progress=False,
+            )
+
         if self.fast_calc:
             self.fast_calc(aln, show_progress=False)
             dists = self.fast_calc.get_pairwise_distances()
         else:
-            empty = {p: 0 for p in itertools.product(aln.names, aln.names)}
-            dists = DistanceMatrix(empty)
+            names = sorted(aln.names)
+            dists = DistanceMatrix(zeros((len(names), len(names))), names=names)
         if self._sm:
             for a in dists.template.names[0]:
                 for b in dists.template.names[1]:
@@ -113,6 +169,15 @@ class fast_slow_dist(ComposableDistance):
         return dists
 
 
+def _content_digest(aln):
+    """returns md5 hexdigest of the names and sequences of aln"""
+    digest = md5()
+    data = aln.to_dict()
+    for name in sorted(data):
+        digest.update(f">{name}\n{data[name]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
 def get_fast_slow_calc(distance, **kwargs):
     """returns FastSlow instance for a given distance name"""
     return fast_slow_dist(distance, **kwargs)
@@ -688,3 +688,54 @@ class trim_stop_codons(ComposableSeq):
     def trim_stops(self, data):
         data = data.trim_stop_codons(gc=self._gc)
         return data
+
+
+class consensus(ComposableAligned):
+    """Computes the consensus of an alignment. Returns a Sequence."""
+
+    _input_types = (ALIGNED_TYPE, SERIALISABLE_TYPE)
+    _output_types = SERIALISABLE_TYPE
+    _data_types = ("ArrayAlignment", "Alignment")
+
+    def __init__(self, method="majority", moltype=None, name=None):
+        """
+        Parameters
+        ----------
+        method : str
+            either 'majority', the most frequent state in each column, or
+            'iupac', the least degenerate IUPAC code for the states in each
+            column
+        moltype
+            molecular type, can be string or instance
+        name : str
+            name of the consensus sequence, defaults to aln.info.source
+
+        Returns
+        -------
+        A Sequence of the alignment moltype
+        """
+        super(consensus, self).__init__(
+            input_types=self._input_types,
+            output_types=self._output_types,
+            data_types=self._data_types,
+        )
+        assert method in ("majority", "iupac"), f"invalid method {method!r}"
+        self._formatted_params()
+        if moltype:
+            moltype = get_moltype(moltype)
+        self._moltype = moltype
+        self._method = method
+        self._name = name
+        self.func = self.consensus
+
+    def consensus(self, aln):
+        if self._moltype and self._moltype != aln.moltype:
+            aln = aln.to_moltype(self._moltype)
+
+        if self._method == "iupac":
+            seq = aln.iupac_consensus()
+        else:
+            seq = str(aln.majority_consensus())
+
+        name = self._name or aln.info.source
+        return aln.moltype.make_seq(seq, name=name, info=dict(source=aln.info.source))
@@ -51,9 +51,17 @@ def best_frame(seq, gc=DEFAULT, allow_rc=False, require_stop=False):
         or the the stop codon is not at the sequence end
     """
     gc = get_code(gc)
-    translations = gc.sixframes(seq)
+    name = getattr(seq, "name", None)
+    return _best_frame(gc.sixframes(seq), name, allow_rc, require_stop)
+
+
+def _best_frame(translations, name, allow_rc, require_stop):
+    """returns reading frame start from six-frame translations, see
+    best_frame()"""
     if not allow_rc:
         translations = translations[:3]
+    else:
+        translations = list(translations)
 
     if not require_stop:
         # don't count stops if they're at the end of the aa sequence
@@ -66,7 +74,7 @@ def best_frame(seq, gc=DEFAULT, allow_rc=False, require_stop=False):
     min_stops, frame = stops_in_frame[0]
     # if min_stops > 1, cannot be translated
     if min_stops > 1:
-        raise ValueError("%s cannot be robustly translated" % seq.name)
+        raise ValueError("%s cannot be robustly translated" % name)
     elif min_stops == 0 and require_stop:
         # find seq with 1 stop
         min_stops = 20  # nonsense value
@@ -77,9 +85,9 @@ def best_frame(seq, gc=DEFAULT, allow_rc=False, require_stop=False):
 
     if 0 <= min_stops <= 1:
         if min_stops == 1 and not translations[frame].endswith("*"):
-            raise ValueError("%s cannot be robustly translated" % seq.name)
+            raise ValueError("%s cannot be robustly translated" % name)
     else:
-        raise ValueError("%s cannot be robustly translated" % seq.name)
+        raise ValueError("%s cannot be robustly translated" % name)
 
     frame += 1
     if allow_rc and frame > 3:
@@ -212,9 +220,16 @@ class select_translatable(ComposableSeq):
 
         translatable = []
         error_log = []
-        for seq in seqs.seqs:
+        seqs_ = list(seqs.seqs)
+        frames = self._gc.sixframes_many(seqs_)
+        for seq, translations in zip(seqs_, frames):
             try:
-                frame = best_frame(seq, self._gc, allow_rc=self._allow_rc)
+                if 0 < len(seq) < 3:
+                    # as raised by GeneticCode.sixframes()
+                    raise ValueError("Translation starts after end of RNA")
+                frame = _best_frame(
+                    translations, seq.name, self._allow_rc, require_stop=False
+                )
                 if frame < 0:
                     seq = seq.rc()
                     frame *= -1
@@ -1,5 +1,5 @@
 from cogent3 import make_tree
-from cogent3.phylo.nj import gnj
+from cogent3.phylo.nj import fast_nj
 
 from .composable import (
     PAIRWISE_DISTANCE_TYPE,
@@ -160,7 +160,6 @@ class quick_tree(ComposableTree):
             treestring = "(%s:%.4f,%s:%.4f)" % (species[0], dist, species[1], dist)
             tree = make_tree(treestring=treestring, underscore_unmunge=True)
         else:
-            (result,) = gnj(dists.to_dict(), keep=1, show_progress=False)
-            (score, tree) = result
+            tree = fast_nj(dists, show_progress=False)
 
         return tree
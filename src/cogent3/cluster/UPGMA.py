@@ -8,12 +8,16 @@ to the array as input. Can also generate this type of input from a DictArray usi
 inputs_from_dict_array function.
 
 Both return a PhyloNode object of the UPGMA cluster
+
+pgma takes pairwise distances as a dict or DistanceMatrix and clusters
+without copying the matrix at each step, so is suited to many sequences.
 """
 
 import numpy
 
 from numpy import argmin, array, average, diag, ma, ravel, sum, take
 
+from cogent3.cluster.pgma_numba import pgma_merges
 from cogent3.core.tree import PhyloNode
 from cogent3.util.dict_array import DictArray
 
@@ -52,6 +56,65 @@ def upgma(pairwise_distances):
     return tree
 
 
+def pgma(pairwise_distances, weighted=True):
+    """clusters sequences using WPGMA or UPGMA
+
+    Parameters
+    ----------
+    pairwise_distances
+        a dictionary with pair tuples mapped to a distance, or a
+        DistanceMatrix
+    weighted : bool
+        if True, the distance to a merged cluster is the mean of the
+        distances to the two merged clusters (WPGMA), the tree is that from
+        upgma. If False, distances are weighted by the number of sequences
+        in each cluster (UPGMA).
+
+    Returns
+    -------
+    PhyloNode
+
+    Notes
+    -----
+    A DistanceMatrix is used in its condensed form, so the square matrix is
+    never constructed. Memory use is one float per pair.
+    """
+    if hasattr(pairwise_distances, "to_condensed"):
+        names = list(pairwise_distances.names)
+        dists = numpy.array(pairwise_distances.to_condensed(), dtype=float)
+    else:
+        darr = DictArray(pairwise_distances)
+        names = list(darr.keys())
+        dists = darr.array[numpy.triu_indices(len(names), 1)].astype(float)
+
+    if len(names) < 2:
+        raise ValueError("at least 2 sequences are required for clustering")
+    if numpy.isnan(dists).any():
+        raise ValueError("distances include nan, drop invalid distances first")
+
+    merges, heights = pgma_merges(dists, len(names), weighted)
+    nodes = list(map(PhyloNode, names))
+    node_heights = [0.0] * len(names)
+    for (i, j), height in zip(merges, heights):
+        new_node = PhyloNode()
+        for k in (i, j):
+            nodes[k].length = height - node_heights[k]
+            new_node.children.append(nodes[k])
+            nodes[k].parent = new_node
+        nodes[i] = new_node
+        node_heights[i] = height
+
+    tree = nodes[merges[-1][0]]
+    index = 0
+    for node in tree.traverse():
+        if not node.parent:
+            node.name = "root"
+        elif not node.name:
+            node.name = "edge." + str(index)
+            index += 1
+    return tree
+
+
 def find_smallest_index(matrix):
     """returns the index of the smallest element in a numpy array
 
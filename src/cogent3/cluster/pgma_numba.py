@@ -0,0 +1,116 @@
+import numpy
+
+from numba import njit
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Alpha"
+
+
+@njit(cache=True)
+def _index(i, j, num):
+    """index of i, j in a condensed distance matrix"""
+    if i > j:
+        i, j = j, i
+    return i * num - i * (i + 1) // 2 + j - i - 1
+
+
+@njit(cache=True)
+def _row_min(dists, active, i, num):
+    """returns the smallest distance from i to active j > i, and j
+
+    j is -1 if there is no such distance"""
+    best = numpy.inf
+    best_j = -1
+    offset = _index(i, i + 1, num) - (i + 1)
+    for j in range(i + 1, num):
+        if active[j] and (best_j == -1 or dists[offset + j] < best):
+            best = dists[offset + j]
+            best_j = j
+    return best, best_j
+
+
+@njit(cache=True)
+def pgma_merges(dists, num, weighted):
+    """returns the merged indices and heights of pair group clustering
+
+    Parameters
+    ----------
+    dists
+        condensed distance matrix, modified in place
+    num
+        number of clusters
+    weighted
+        if True, the distance to a merged cluster is the mean of the
+        distances to its parts (WPGMA), otherwise parts are weighted by
+        their sizes (UPGMA)
+
+    Returns
+    -------
+    [(i, j), ...], [height, ...] for each merge. The merged cluster
+    replaces i. Of equal distances, the first in row major order is merged.
+
+    Notes
+    -----
+    The closest active j > i of each row is cached, so only rows affected by
+    a merge are searched.
+    """
+    active = numpy.ones(num, dtype=numpy.bool_)
+    sizes = numpy.ones(num)
+    row_best = numpy.empty(num)
+    row_col = numpy.empty(num, dtype=numpy.int64)
+    for i in range(num):
+        row_best[i], row_col[i] = _row_min(dists, active, i, num)
+
+    merges = numpy.empty((num - 1, 2), dtype=numpy.int64)
+    heights = numpy.empty(num - 1)
+    for step in range(num - 1):
+        i = -1
+        for k in range(num):
+            if active[k] and row_col[k] != -1:
+                if i == -1 or row_best[k] < row_best[i]:
+                    i = k
+        j = row_col[i]
+        merges[step, 0] = i
+        merges[step, 1] = j
+        heights[step] = dists[_index(i, j, num)] / 2.0
+
+        active[j] = False
+        w_i = sizes[i] / (sizes[i] + sizes[j])
+        w_j = sizes[j] / (sizes[i] + sizes[j])
+        sizes[i] += sizes[j]
+        for k in range(num):
+            if not active[k] or k == i:
+                continue
+            ik = _index(i, k, num)
+            if weighted:
+                dists[ik] = (dists[ik] + dists[_index(j, k, num)]) / 2.0
+            else:
+                dists[ik] = w_i * dists[ik] + w_j * dists[_index(j, k, num)]
+
+        row_best[i], row_col[i] = _row_min(dists, active, i, num)
+        for k in range(j):
+            if not active[k] or k == i:
+                continue
+            if k > i:
+                # only the loss of j affects these rows
+                if row_col[k] == j:
+                    row_best[k], row_col[k] = _row_min(dists, active, k, num)
+                continue
+
+            value = dists[_index(k, i, num)]
+            if row_col[k] == j or (row_col[k] == i and value > row_best[k]):
+                row_best[k], row_col[k] = _row_min(dists, active, k, num)
+            elif row_col[k] == i:
+                row_best[k] = value
+            elif value < row_best[k] or (value == row_best[k] and i < row_col[k]):
+                row_best[k] = value
+                row_col[k] = i
+
+    return merges, heights
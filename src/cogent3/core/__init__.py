@@ -10,6 +10,7 @@ __all__ = [
     "moltype",
     "profile",
     "sequence",
+    "sketch",
     "tree",
 ]
 
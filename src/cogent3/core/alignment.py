@@ -52,18 +52,27 @@ from numpy.random import choice, permutation, randint
 
 import cogent3  # will use to get at cogent3.parse.fasta.MinimalFastaParser,
 
+from cogent3.core.alphabet import CharAlphabet
 from cogent3.core.annotation import Map, _Annotatable
-from cogent3.core.genetic_code import DEFAULT, get_code
+from cogent3.core.genetic_code import DEFAULT, _nucleotide_indices, get_code
 from cogent3.core.info import Info as InfoClass
+from cogent3.core.kmer import kmer_counts_per_seq
 from cogent3.core.location import LostSpan, Span
-from cogent3.core.profile import PSSM, MotifCountsArray
-from cogent3.core.sequence import ArraySequence, frac_same
+from cogent3.core.motif_search import MotifSearch
+from cogent3.core.profile import PSSM, MotifCountsArray, scan_pssms
+from cogent3.core.sequence import (
+    ArraySequence,
+    ByteSequence,
+    LightSequence,
+    Sequence,
+    frac_same,
+)
+from cogent3.core.sketch import MinHashIndex
 # which is a circular import otherwise.
 from cogent3.format.alignment import save_to_filename
 from cogent3.format.fasta import alignment_to_fasta
 from cogent3.format.nexus import nexus_from_alignment
 from cogent3.format.phylip import alignment_to_phylip
-from cogent3.maths.stats.number import CategoryCounter
 from cogent3.maths.util import safe_log
 from cogent3.parse.gff import gff_parser
 from cogent3.util import progress_display as UI
@@ -267,6 +276,411 @@ def coerce_to_string(s):
         return "".join(map(str, s))
 
 
+def _block_signatures(seq, mask, num_blocks, width):
+    """returns hashes for fixed width blocks of seq, and whether each block
+    includes a masked position (positions beyond the end are masked)"""
+    padded = ones(num_blocks * width, dtype=bool)
+    padded[: len(mask)] = mask[: num_blocks * width]
+    dirty = padded.reshape(num_blocks, width).any(axis=1)
+    keys = [
+        0 if d else hash(seq[i * width : (i + 1) * width].tobytes())
+        for i, d in enumerate(dirty)
+    ]
+    return keys, dirty
+
+
+def _padded(indices, seqs, masks, length):
+    """returns 2D arrays of the indexed seqs and masks, and a bool array
+    indicating positions beyond the end of each sequence"""
+    data = zeros((len(indices), length), dtype=seqs[indices[0]].dtype)
+    mask = zeros((len(indices), length), dtype=bool)
+    beyond = ones((len(indices), length), dtype=bool)
+    for row, j in enumerate(indices):
+        data[row, : len(seqs[j])] = seqs[j]
+        mask[row, : len(seqs[j])] = masks[j]
+        beyond[row, : len(seqs[j])] = False
+    return data, mask, beyond
+
+
+def _masked_identical_sets(seqs, masks, num_blocks=32):
+    """returns sets of indices of sequences that are identical at all
+    positions not masked in either sequence
+
+    Parameters
+    ----------
+    seqs
+        series of 1D numpy arrays, one per sequence. Must all be distinct.
+    masks
+        series of 1D bool arrays, True where a position is to be ignored
+    num_blocks
+        number of fixed width blocks used to bucket candidate matches
+
+    Notes
+    -----
+    Positions beyond the end of the shorter sequence match only if they are
+    masked in the longer sequence. Candidates are restricted to those whose block
+    contents are identical, or masked, for the query's unmasked blocks,
+    before a vectorised comparison of the full sequences. Grouping is greedy
+    in order of the sequences.
+    """
+    num_seqs = len(seqs)
+    max_length = max(len(s) for s in seqs)
+    num_blocks = max(1, min(num_blocks, max_length))
+    width = -(-max_length // num_blocks)
+    keys = numpy.empty((num_seqs, num_blocks), dtype=numpy.int64)
+    dirty = numpy.empty((num_seqs, num_blocks), dtype=bool)
+    for i in range(num_seqs):
+        keys[i], dirty[i] = _block_signatures(seqs[i], masks[i], num_blocks, width)
+
+    has_masked = array([m.any() for m in masks], dtype=bool)
+    dirty_in_block = [nonzero(dirty[:, b])[0] for b in range(num_blocks)]
+    buckets = []
+    for b in range(num_blocks):
+        bucket = defaultdict(list)
+        for i in nonzero(~dirty[:, b])[0]:
+            bucket[keys[i, b]].append(i)
+        buckets.append({k: array(v) for k, v in bucket.items()})
+
+    identical_sets = []
+    seen = zeros(num_seqs, dtype=bool)
+    for i in range(num_seqs - 1):
+        if seen[i]:
+            continue
+
+        clean = nonzero(~dirty[i])[0]
+        if len(clean):
+            # the clean block with the fewest possible partners
+            sizes = [
+                len(buckets[b][keys[i, b]]) + len(dirty_in_block[b]) for b in clean
+            ]
+            b = clean[numpy.argmin(sizes)]
+            candidates = numpy.concatenate([buckets[b][keys[i, b]], dirty_in_block[b]])
+        else:
+            candidates = arange(num_seqs)
+
+        candidates = candidates[(candidates > i) & ~seen[candidates]]
+        if not has_masked[i]:
+            # distinct sequences can only match if one has masked positions
+            candidates = candidates[has_masked[candidates]]
+        if len(candidates) and len(clean):
+            same = (keys[candidates][:, clean] == keys[i, clean]) | dirty[candidates][
+                :, clean
+            ]
+            candidates = candidates[same.all(axis=1)]
+        if not len(candidates):
+            continue
+
+        length = max(len(seqs[i]), max(len(seqs[j]) for j in candidates))
+        query, query_mask, query_end = _padded([i], seqs, masks, length)
+        other, other_mask, other_end = _padded(candidates, seqs, masks, length)
+        same = (other == query) & (other_end == query_end)
+        matched = (same | other_mask | query_mask).all(axis=1)
+        matched = candidates[matched]
+        if len(matched):
+            seen[matched] = True
+            identical_sets.append(set([i] + matched.tolist()))
+
+    return identical_sets
+
+
+def _identical_sets(seqs, get_mask=None):
+    """returns sets of indices of identical sequences
+
+    Parameters
+    ----------
+    seqs
+        series of 1D numpy arrays, one per sequence
+    get_mask
+        callable returning a bool array that is True for positions to be
+        ignored in a sequence. If None, sequences must match exactly.
+
+    Notes
+    -----
+    Exact matches are identified by hashing. When masking, only one member
+    of each exactly identical group is compared (see _masked_identical_sets).
+    """
+    groups = {}
+    for i, seq in enumerate(seqs):
+        groups.setdefault(seq.tobytes(), []).append(i)
+    groups = list(groups.values())
+    if get_mask is None or len(groups) < 2:
+        return [set(g) for g in groups if len(g) > 1]
+
+    unique = [seqs[g[0]] for g in groups]
+    masks = [get_mask(s) for s in unique]
+    identical_sets = []
+    merged = set()
+    for matched in _masked_identical_sets(unique, masks):
+        merged.update(matched)
+        identical_sets.append(set(i for k in matched for i in groups[k]))
+
+    identical_sets.extend(
+        set(g) for k, g in enumerate(groups) if len(g) > 1 and k not in merged
+    )
+    return identical_sets
+
+
+def _seqs_to_buffer(seqs):
+    """returns concatenated uint8 array of sequences and their offsets
+
+    Parameters
+    ----------
+    seqs
+        series of strings or sequence objects, all characters must be < 256
+
+    Returns
+    -------
+    data, offsets where sequence i is data[offsets[i]: offsets[i + 1]]
+    """
+    seqs = [str(s) for s in seqs]
+    offsets = numpy.zeros(len(seqs) + 1, dtype=numpy.int64)
+    numpy.cumsum([len(s) for s in seqs], out=offsets[1:])
+    # latin-1 maps every character < 256 to a single byte
+    data = "".join(seqs).encode("latin-1")
+    return numpy.frombuffer(data, dtype=uint8), offsets
+
+
+def _motif_mask(moltype, include_ambiguity=False, allow_gap=False):
+    """returns bool array of length 256, True for bytes that exclude a motif"""
+    excluded = zeros(256, dtype=bool)
+    chars = []
+    if not include_ambiguity:
+        chars.extend(moltype.degenerates)
+    if not allow_gap:
+        chars.extend(moltype.gaps)
+    excluded[[ord(c) for c in chars if len(c) == 1 and ord(c) < 256]] = True
+    return excluded
+
+
+def _lengths_from_buffer(data, offsets, excluded):
+    """returns number of non-excluded characters in each sequence"""
+    cumulative = numpy.zeros(len(data) + 1, dtype=numpy.int64)
+    numpy.cumsum(~excluded[data], out=cumulative[1:])
+    return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+
+
+def _reordered_counts(counts, observed, motifs):
+    """returns counts with columns in the order of motifs
+
+    Parameters
+    ----------
+    counts
+        2D array of counts with columns corresponding to observed
+    observed
+        motifs as returned from _counts_from_buffer
+    motifs
+        the motifs, and their order, required. Motifs not in observed are
+        assigned 0.
+    """
+    index = {m: i for i, m in enumerate(observed)}
+    result = zeros((counts.shape[0], len(motifs)), dtype=numpy.int64)
+    for i, motif in enumerate(motifs):
+        if motif in index:
+            result[:, i] = counts[:, index[motif]]
+    if not result.any():
+        # MotifCountsArray rejects an all zero array, but not nested lists
+        result = result.tolist()
+    return result
+
+
+def _column_char_sets(chars):
+    """returns the distinct sets of characters occurring in columns
+
+    Parameters
+    ----------
+    chars
+        uint8 array [seqs, positions]
+
+    Returns
+    -------
+    list of strings, one per distinct set, and the index of each column
+    into that list
+
+    Notes
+    -----
+    The characters present in a column are encoded as a bitmask and columns
+    are grouped by their bitmask.
+    """
+    num_seqs, num_pos = chars.shape
+    states = nonzero(numpy.bincount(chars.ravel(), minlength=256))[0]
+    num_words = max(1, -(-len(states) // 64))
+    # the bitmask for each state, split across uint64 words
+    state_bits = zeros((256, num_words), dtype=numpy.uint64)
+    for i, state in enumerate(states):
+        state_bits[state, i // 64] = numpy.uint64(1) << numpy.uint64(i % 64)
+
+    masks = zeros((num_pos, num_words), dtype=numpy.uint64)
+    for seq in chars:
+        masks |= state_bits[seq]
+
+    if num_words == 1:
+        unique, index = numpy.unique(masks[:, 0], return_inverse=True)
+        unique = unique[:, None]
+    else:
+        unique, index = numpy.unique(masks, axis=0, return_inverse=True)
+
+    char_sets = []
+    for mask in unique:
+        present = [i for i in range(len(states)) if int(mask[i // 64]) >> (i % 64) & 1]
+        char_sets.append(bytes(states[present].tolist()).decode("latin-1"))
+    return char_sets, index
+
+
+def _iupac_consensus(chars, moltype):
+    """returns IUPAC consensus of the columns of chars"""
+    char_sets, index = _column_char_sets(chars)
+    # the degenerate character for each distinct column state
+    lookup = array([moltype.degenerate_from_seq(s) for s in char_sets] or [""])
+    return "".join(lookup[index].tolist())
+
+
+def _majority_consensus(chars):
+    """returns the most frequent character in each column of chars, ties are
+    resolved in favour of the character with the largest ordinal"""
+    num_seqs, num_pos = chars.shape
+    if num_seqs == 0 or num_pos == 0:
+        return ""
+    states = nonzero(numpy.bincount(chars.ravel(), minlength=256))[0]
+    recode = zeros(256, dtype=numpy.int64)
+    recode[states] = arange(len(states))
+    columns = arange(num_pos) * len(states)
+    counts = numpy.bincount(
+        (recode[chars] + columns).ravel(), minlength=num_pos * len(states)
+    ).reshape(num_pos, len(states))
+    # argmax returns the first maximum so search the states in reverse order
+    mode = len(states) - 1 - counts[:, ::-1].argmax(axis=1)
+    return states.astype(uint8)[mode].tobytes().decode("latin-1")
+
+
+def _codons_are_stops(codons, gc):
+    """returns bool array, True for rows of the uint8 array codons that are
+    stop codons in the genetic code gc"""
+    codons = _nucleotide_indices.take(codons).astype(numpy.int64).dot([25, 5, 1])
+    return gc._stop_table.take(codons)
+
+
+def _terminal_stops(data, offsets, gc, moltype=None, allow_partial=False):
+    """returns bool array, True for sequences in the buffer that end with a
+    stop codon
+
+    Parameters
+    ----------
+    data, offsets
+        as returned by _seqs_to_buffer
+    gc
+        genetic code object
+    moltype
+        if provided and not allow_partial, the last three characters of every
+        sequence must be non-gap characters
+    allow_partial
+        if True, sequences whose length is not divisible by 3 are ignored.
+        Otherwise, a ValueError is raised.
+    """
+    lengths = numpy.diff(offsets)
+    divisible = lengths % 3 == 0
+    if not allow_partial and not divisible.all():
+        raise ValueError("seq length not divisible by 3")
+
+    if not allow_partial and moltype is not None:
+        is_gap = _motif_mask(moltype, include_ambiguity=True)
+        cumulative = numpy.zeros(len(data) + 1, dtype=numpy.int64)
+        numpy.cumsum(~is_gap[data], out=cumulative[1:])
+        starts = numpy.maximum(offsets[1:] - 3, offsets[:-1])
+        if (cumulative[offsets[1:]] - cumulative[starts] != 3).any():
+            raise ValueError("seq length not divisible by 3")
+
+    result = zeros(len(lengths), dtype=bool)
+    has_codon = divisible & (lengths >= 3)
+    ends = offsets[1:][has_codon]
+    result[has_codon] = _codons_are_stops(data[ends[:, None] + arange(-3, 0)], gc)
+    return result
+
+
+def _alphabet_byte_indices(alphabet):
+    """returns array mapping byte values to alphabet indices, -1 if invalid"""
+    indices = numpy.full(256, -1, dtype=numpy.int64)
+    for i, char in enumerate(alphabet):
+        if len(char) == 1 and ord(char) < 256:
+            indices[ord(char)] = i
+    return indices
+
+
+def _counts_from_buffer(data, offsets, motif_length, excluded, names=None):
+    """returns counts of non-overlapping motifs in each sequence
+
+    Parameters
+    ----------
+    data, offsets
+        as returned by _seqs_to_buffer
+    motif_length : int
+        number of characters per motif, incomplete terminal motifs are dropped
+    excluded
+        bool array of length 256, motifs containing a True byte are not
+        counted
+    names
+        sequence names, used to warn of sequences whose length is not
+        divisible by motif_length
+
+    Returns
+    -------
+    counts array of shape (num_seqs, num_motifs), sorted motif strings
+    """
+    num_seqs = len(offsets) - 1
+    lengths = numpy.diff(offsets)
+    if motif_length > 1 and (lengths % motif_length).any():
+        for i in nonzero(lengths % motif_length)[0] if names else []:
+            warnings.warn(
+                "%s length not divisible by %s, truncating" % (names[i], motif_length)
+            )
+        # drop incomplete terminal motifs
+        limits = (lengths // motif_length) * motif_length
+        starts = numpy.repeat(offsets[:-1], limits)
+        new_offsets = numpy.zeros(num_seqs + 1, dtype=numpy.int64)
+        numpy.cumsum(limits, out=new_offsets[1:])
+        data = data[
+            arange(new_offsets[-1]) + starts - numpy.repeat(new_offsets[:-1], limits)
+        ]
+        lengths = limits
+
+    seq_index = numpy.repeat(arange(num_seqs), lengths // motif_length)
+    motifs = data.reshape(-1, motif_length)
+    keep = ~excluded[motifs].any(axis=1)
+    motifs, seq_index = motifs[keep], seq_index[keep]
+    # recode observed bytes as consecutive integers so motifs can be encoded as
+    # a single integer
+    observed = numpy.bincount(motifs.ravel(), minlength=256)
+    states = nonzero(observed)[0]
+    num_states = max(len(states), 1)
+    if num_states ** motif_length < 2 ** 62:
+        index = numpy.zeros(256, dtype=numpy.int64)
+        index[states] = arange(len(states))
+        codes = index[motifs[:, 0]]
+        for i in range(1, motif_length):
+            codes = codes * num_states + index[motifs[:, i]]
+        if num_states ** motif_length <= 2 ** 20:
+            present = numpy.bincount(codes, minlength=num_states ** motif_length)
+            present = nonzero(present)[0]
+            lookup = numpy.zeros(num_states ** motif_length, dtype=numpy.int64)
+            lookup[present] = arange(len(present))
+            motif_index = lookup[codes]
+        else:
+            present, motif_index = numpy.unique(codes, return_inverse=True)
+        # decode the motifs
+        unique = zeros((len(present), motif_length), dtype=uint8)
+        for i in range(motif_length - 1, -1, -1):
+            unique[:, i] = states[present % num_states]
+            present = present // num_states
+    else:
+        unique, motif_index = numpy.unique(motifs, axis=0, return_inverse=True)
+
+    num_motifs = len(unique)
+    counts = numpy.bincount(
+        seq_index * num_motifs + motif_index, minlength=num_seqs * num_motifs
+    ).reshape(num_seqs, num_motifs)
+    motifs = [m.tobytes().decode("latin-1") for m in unique]
+    return counts, motifs
+
+
 def seqs_from_array(a, alphabet=None):
     """SequenceCollection from array of pos x seq: names are integers.
 
@@ -708,7 +1122,14 @@ class _SequenceCollectionBase:
         """
         if is_array:
             seqs = list(map(str, list(map(self.moltype.make_array_seq, seqs))))
-        return list(map(self.moltype.make_seq, seqs))
+        return list(map(self._coerce_seq, seqs))
+
+    def _coerce_seq(self, seq):
+        """LightSequence instances are kept, only rebound to self.moltype, so
+        they are promoted only if a Sequence attribute is used"""
+        if isinstance(seq, LightSequence):
+            return LightSequence(seq, moltype=self.moltype, preserve_case=True)
+        return self.moltype.make_seq(seq)
 
     def _guess_input_type(self, data):
         """Guesses input type of data; returns result as key of _input_handlers.
@@ -754,7 +1175,7 @@ class _SequenceCollectionBase:
             return "array"
         if isinstance(first, str) and first.startswith(">"):
             return "fasta"
-        if isinstance(first, Aligned) or isinstance(first, Sequence):
+        if isinstance(first, (Aligned, Sequence, LightSequence)):
             return "generic"
         try:
             dict(data)
@@ -903,79 +1324,26 @@ class _SequenceCollectionBase:
             if True, degenerate characters are ignored
 
         """
-        # TODO handle case of not strict by building mask of degen positions
-        # per seq
         if mask_degen and not hasattr(self.moltype, "alphabets"):
             UserWarning(
                 "in get_identical_sets, strict has no effect as moltype "
                 "has no degenerate characters"
             )
             mask_degen = False
-        elif mask_degen:
-            degens = list(self.moltype.degenerates) + [self.moltype.gap]
 
-        def reduced(seq, indices):
-            s = "".join(seq[i] for i in range(len(seq)) if i not in indices)
-            return s
+        get_mask = None
+        if mask_degen:
+            degens = list(self.moltype.degenerates) + [self.moltype.gap]
+            is_degen = zeros(256, dtype=bool)
+            is_degen[[ord(c) for c in degens]] = True
+            get_mask = is_degen.take
 
-        identical_sets = []
-        mask_posns = {}
-        seen = []
-        # if strict, we do a sort and one pass through the list
         seqs = self.to_dict()
-        if not mask_degen:
-            seqs_names = [(s, n) for n, s in seqs.items()]
-            seqs_names.sort()
-            matched = None
-            dupes = defaultdict(set)
-            for i in range(len(seqs_names) - 1):
-                if seqs_names[i][0] == seqs_names[i + 1][0]:
-                    matched = seqs_names[i][1] if matched is None else matched
-                    dupes[matched].update([seqs_names[i + 1][1], matched])
-                else:
-                    matched = None
-            identical_sets = list(dupes.values())
-            return identical_sets
-
-        for i in range(len(self.names) - 1):
-            n1 = self.names[i]
-            if n1 in seen:
-                continue
-
-            seq1 = seqs[n1]
-            if n1 not in mask_posns:
-                pos = self.moltype.get_degenerate_positions(seq1, include_gap=True)
-                mask_posns[n1] = pos
-                # TODO separately implement for ArrayAlignment
-
-            group = set()
-            for j in range(i + 1, len(self.names)):
-                n2 = self.names[j]
-                if n2 in seen:
-                    continue
-
-                seq2 = seqs[n2]
-                if n2 not in mask_posns:
-                    pos = self.moltype.get_degenerate_positions(seq2, include_gap=True)
-                    mask_posns[n2] = pos
-
-                seq2 = seqs[n2]
-
-                s1, s2 = seq1, seq2
-
-                pos = mask_posns[n1] + mask_posns[n2]
-                if pos:
-                    s1 = reduced(seq1, pos)
-                    s2 = reduced(seq2, pos)
-
-                if s1 == s2:
-                    seen.append(n2)
-                    group.update([n1, n2])
-
-            if group:
-                identical_sets.append(group)
-
-        return identical_sets
+        seqs = [
+            numpy.frombuffer(seqs[n].encode("utf8"), dtype=uint8) for n in self.names
+        ]
+        identical_sets = _identical_sets(seqs, get_mask=get_mask)
+        return [set(self.names[i] for i in group) for group in identical_sets]
 
     def get_similar(
         self,
@@ -1033,6 +1401,63 @@ class _SequenceCollectionBase:
 
         return self.take_seqs_if(f)
 
+    def similarity_index(self, k=8, num_hashes=64, num_bands=16, seed=0):
+        """returns a MinHashIndex of the k-mer content of the sequences
+
+        The index is built once and supports repeated rapid queries via its
+        candidates() and get_similar() methods.
+
+        Parameters
+        ----------
+        k : int
+            k-mer size. Characters not in the moltype alphabet are excluded
+            from k-mers, gaps are ignored.
+        num_hashes : int
+            number of hash functions, the size of each sketch
+        num_bands : int
+            number of bands used to identify candidates, must divide num_hashes
+        seed : int
+            seed for generating the hash functions
+        """
+        return MinHashIndex(
+            self, k=k, num_hashes=num_hashes, num_bands=num_bands, seed=seed
+        )
+
+    def find_motifs(
+        self,
+        patterns,
+        both_strands=True,
+        parallel=False,
+        par_kw=None,
+        chunk_size=1000000,
+    ):
+        """returns all, including overlapping, matches to IUPAC patterns in
+        the sequences. Gaps are removed, so hit coordinates are with respect to
+        the ungapped sequences.
+
+        Parameters
+        ----------
+        patterns
+            a series of IUPAC patterns, or a dict of {name: pattern}
+        both_strands : bool
+            if True, the reverse complement of patterns are also searched for
+            on nucleic acid sequences
+        parallel : bool
+            if True, sequence chunks are searched in separate processes
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
+        chunk_size : int
+            sequences are searched in chunks of this length
+
+        Returns
+        -------
+        MotifHits, use its annotate() method to add the hits as features
+        """
+        search = MotifSearch(patterns, moltype=self.moltype, both_strands=both_strands)
+        return search.search(
+            self, parallel=parallel, par_kw=par_kw, chunk_size=chunk_size
+        )
+
     def is_ragged(self):
         """Returns True if alignment has sequences of different lengths."""
         seqs = self.seqs  # Get all sequences in alignment
@@ -1365,15 +1790,21 @@ class _SequenceCollectionBase:
             by 3, ignores the 3' terminal incomplete codon
 
         """
-        stops = []
-        aligned = isinstance(self, Alignment)
-        for seq_name in self.names:
-            if aligned:
-                seq = self.named_seqs[seq_name].data
+        gc = get_code(gc)
+        if isinstance(self, ArrayAlignment):
+            chars = self._get_char_array()
+            data = chars.ravel()
+            offsets = arange(chars.shape[0] + 1) * chars.shape[1]
+        else:
+            if isinstance(self, Alignment):
+                seqs = [self.named_seqs[n].data for n in self.names]
             else:
-                seq = self.named_seqs[seq_name]
-            stops.append(seq.has_terminal_stop(gc=gc, allow_partial=allow_partial))
-        return max(stops)
+                seqs = self.to_dict()
+                seqs = [seqs[n] for n in self.names]
+            data, offsets = _seqs_to_buffer(seqs)
+
+        stops = _terminal_stops(data, offsets, gc, self.moltype, allow_partial)
+        return bool(stops.any())
 
     def trim_stop_codons(self, gc=None, allow_partial=False, **kwargs):
         """Removes any terminal stop codons from the sequences
@@ -1388,12 +1819,19 @@ class _SequenceCollectionBase:
 
         """
         gc = get_code(gc)
+        seqs = [self.named_seqs[n] for n in self.names]
+        data, offsets = _seqs_to_buffer(seqs)
+        lengths = numpy.diff(offsets)
+        stops = _terminal_stops(data, offsets, gc, allow_partial=allow_partial)
         new_seqs = []
-
-        for seq_name in self.names:
-            old_seq = self.named_seqs[seq_name]
-            new_seq = old_seq.trim_stop_codon(gc=gc, allow_partial=allow_partial)
-            new_seqs.append((seq_name, new_seq))
+        for name, seq, length, stop in zip(self.names, seqs, lengths, stops):
+            if isinstance(seq, LightSequence) and seq._promoted is None:
+                new_seqs.append((name, seq[: length - 3] if stop else seq))
+                continue
+            if isinstance(seq, LightSequence):
+                seq = seq.to_sequence()
+            new_seq = str(seq)[: length - 3] if stop else str(seq)
+            new_seqs.append((name, seq.__class__(new_seq, name=name, info=seq.info)))
 
         return self.__class__(
             moltype=self.moltype, data=new_seqs, info=self.info, **kwargs
@@ -1411,11 +1849,13 @@ class _SequenceCollectionBase:
             if True, motifs containing a gap character are included.
 
         """
-        counts = self.counts_per_seq(
-            motif_length=1, include_ambiguity=include_ambiguity, allow_gap=allow_gap
+        seqs = self.to_dict()
+        data, offsets = _seqs_to_buffer(seqs[n] for n in self.names)
+        excluded = _motif_mask(
+            self.moltype, include_ambiguity=include_ambiguity, allow_gap=allow_gap
         )
-        lengths = counts.row_sum()
-        return lengths
+        lengths = _lengths_from_buffer(data, offsets, excluded)
+        return DictArrayTemplate(self.names).wrap(lengths)
 
     def counts_per_seq(
         self,
@@ -1441,25 +1881,52 @@ class _SequenceCollectionBase:
 
         only non-overlapping motifs are counted
         """
-        # this is overridden for Alignments, so just rely on the sequence counts
-        # method
-        counts = []
-        motifs = set()
-        for name in self.names:
-            seq = self.named_seqs[name]
-            c = seq.counts(
-                motif_length=motif_length,
-                include_ambiguity=include_ambiguity,
-                allow_gap=allow_gap,
-                exclude_unobserved=exclude_unobserved,
-            )
-            motifs.update(c.keys())
-            counts.append(c)
-        motifs = list(sorted(motifs))
-        for i, c in enumerate(counts):
-            counts[i] = c.tolist(motifs)
+        # this is overridden for Alignments. All sequences are counted at once
+        # from a single concatenated array
+        seqs = self.to_dict()
+        data, offsets = _seqs_to_buffer(seqs[n] for n in self.names)
+        excluded = _motif_mask(
+            self.moltype, include_ambiguity=include_ambiguity, allow_gap=allow_gap
+        )
+        counts, motifs = _counts_from_buffer(
+            data, offsets, motif_length, excluded, names=self.names
+        )
         return MotifCountsArray(counts, motifs, row_indices=self.names)
 
+    def kmer_counts_per_seq(
+        self, k, canonical=False, dense=False, parallel=False, par_kw=None
+    ):
+        """returns MotifCountsArray of counts of overlapping k-mers per
+        sequence
+
+        Parameters
+        ----------
+        k : int
+            k-mer size. Gaps are removed, k-mers containing characters not in
+            the moltype alphabet (e.g. ambiguity codes) are excluded.
+        canonical : bool
+            if True, a k-mer and its reverse complement are counted as the
+            same k-mer, the one that is lexicographically first (with
+            characters in alphabet order) is reported
+        dense : bool
+            if True, all possible k-mers are included, otherwise only
+            observed k-mers are included
+        parallel : bool
+            if True, sequences are counted in separate processes
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
+        """
+        return kmer_counts_per_seq(
+            self.to_dict(),
+            k,
+            self.moltype,
+            names=self.names,
+            canonical=canonical,
+            dense=dense,
+            parallel=parallel,
+            par_kw=par_kw,
+        )
+
     def counts(
         self,
         motif_length=1,
@@ -1527,22 +1994,15 @@ class _SequenceCollectionBase:
             if allow_gap:
                 alphabet = alphabet.gapped
 
-        counts = {}
-        for seq_name in self.names:
-            sequence = self.named_seqs[seq_name]
-            motif_len = alphabet.get_motif_len()
-            if motif_len > 1:
-                posns = list(range(0, len(sequence) + 1 - motif_len, motif_len))
-                sequence = [sequence[i : i + motif_len] for i in posns]
-            for motif in sequence:
-                if not allow_gap:
-                    if self.moltype.gap in motif:
-                        continue
-
-                if motif in counts:
-                    counts[motif] += 1
-                else:
-                    counts[motif] = 1
+        seqs = self.to_dict()
+        data, offsets = _seqs_to_buffer(seqs[n] for n in self.names)
+        excluded = zeros(256, dtype=bool)
+        if not allow_gap:
+            excluded[ord(self.moltype.gap)] = True
+        counts, motifs = _counts_from_buffer(
+            data, offsets, alphabet.get_motif_len(), excluded
+        )
+        counts = dict(zip(motifs, counts.sum(axis=0).tolist()))
 
         probs = {}
         if not exclude_unobserved:
@@ -1679,7 +2139,16 @@ class _SequenceCollectionBase:
                 seq = self.named_seqs[seq_name].data
             else:
                 seq = self.named_seqs[seq_name]
-            padded_seq = seq + "-" * (pad_length - len(seq))
+            padding = "-" * (pad_length - len(seq))
+            if isinstance(seq, LightSequence):
+                padded_seq = LightSequence(
+                    str(seq) + padding,
+                    name=seq_name,
+                    moltype=seq.moltype,
+                    preserve_case=True,
+                )
+            else:
+                padded_seq = seq + padding
             new_seqs.append((seq_name, padded_seq))
 
         # return new SequenceCollection object
@@ -1876,7 +2345,8 @@ class _SequenceCollectionBase:
             else:
                 data = self.array_seqs
 
-            result = [pssm.score_indexed_seq(seq) for seq in ui.series(data)]
+            # all sequences are scored at once
+            result = pssm.score_indexed_seqs(data)
         else:
             if names:
                 seqs = [self.named_seqs[n] for n in names]
@@ -1886,6 +2356,57 @@ class _SequenceCollectionBase:
 
         return array(result)
 
+    def scan_pssms(
+        self,
+        pssms,
+        threshold=None,
+        top_k=None,
+        names=None,
+        chunk_size=100000,
+        parallel=False,
+        par_kw=None,
+    ):
+        """scores sequences with many PSSMs, returning only the best windows
+
+        Parameters
+        ----------
+        pssms
+            a PSSM or series of PSSM instances, e.g. from
+            MotifCountsArray.to_pssm() on matrices read by cogent3.parse.jaspar
+        threshold
+            only windows with a score >= threshold are returned
+        top_k : int
+            only the top_k highest scoring windows for each PSSM and sequence
+            are returned
+        names
+            scores only these sequences, in this order
+        chunk_size : int
+            number of windows scored at once per sequence
+        parallel : bool
+            if True, sequences are scored in separate processes
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
+
+        Returns
+        -------
+        numpy structured array with fields pssm, seq, start and score. pssm
+        and seq are indices into pssms and names (defaults to self.names).
+        Sequences are scored as is, so for alignments gap characters
+        contribute 0 to a score.
+        """
+        if type(names) == str:
+            names = [names]
+        data = self.to_dict()
+        return scan_pssms(
+            pssms,
+            [data[n] for n in names or self.names],
+            threshold=threshold,
+            top_k=top_k,
+            chunk_size=chunk_size,
+            parallel=parallel,
+            par_kw=par_kw,
+        )
+
     def set_repr_policy(self, num_seqs=None, num_pos=None, ref_name=None):
         """specify policy for repr(self)
 
@@ -2022,6 +2543,356 @@ class SequenceCollection(_SequenceCollectionBase):
             seq.annotate_from_gff(seq_dict[seq_id], pre_parsed=True)
 
 
+class CompactSequenceCollection:
+    """Memory efficient container for many unaligned sequences
+
+    All sequences are stored in a single concatenated uint8 buffer, with an
+    offsets array delimiting each sequence. Sequence objects are only created
+    when accessed, and do not support annotations. Use to_collection() to
+    get a SequenceCollection.
+    """
+
+    def __init__(self, data, names=None, moltype=None, info=None):
+        """
+        Parameters
+        ----------
+        data
+            dict of {name: seq}, series of (name, seq) pairs (e.g. as
+            produced by MinimalFastaParser), a sequence collection, or a
+            series of sequence objects with a name attribute. Sequence
+            characters must be < 256, and are converted to upper case unless
+            moltype preserves case (e.g. BYTES).
+        names
+            order of sequences to include, defaults to order in data
+        moltype
+            the moltype, string or instance. Defaults to the moltype of data,
+            otherwise BYTES.
+        info
+            a dict from which to make an info object
+        """
+        if type(moltype) == str:
+            from cogent3.core.moltype import get_moltype
+
+            moltype = get_moltype(moltype)
+
+        if moltype is None:
+            moltype = getattr(data, "moltype", None) or SequenceCollection.moltype
+
+        if info is None:
+            info = getattr(data, "info", None)
+
+        if hasattr(data, "to_dict") and hasattr(data, "names"):
+            names = names or data.names
+            data = data.to_dict()
+
+        if isinstance(data, dict):
+            names = list(names or data)
+            seqs = [data[n] for n in names]
+        else:
+            data = list(data)
+            if data and all(hasattr(s, "name") for s in data):
+                data = [(s.name, s) for s in data]
+            data_names = [n for n, _ in data]
+            if names is None:
+                names = data_names
+                seqs = [s for _, s in data]
+            else:
+                lookup = dict(data)
+                seqs = [lookup[n] for n in names]
+
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate sequence names")
+
+        # as for moltype.make_seq, Sequence classes other than ByteSequence
+        # convert to upper case
+        make_seq = moltype._make_seq
+        if (
+            isinstance(make_seq, type)
+            and issubclass(make_seq, Sequence)
+            and not issubclass(make_seq, ByteSequence)
+        ):
+            seqs = [str(s).upper() for s in seqs]
+
+        self._data, self._offsets = _seqs_to_buffer(seqs)
+        self.names = list(names)
+        self.moltype = moltype
+        self.info = InfoClass(info or {})
+
+    @classmethod
+    def from_buffer(cls, data, offsets, names, moltype, info=None):
+        """returns instance directly from a buffer, no data are copied
+
+        Parameters
+        ----------
+        data
+            1D uint8 array of concatenated sequences
+        offsets
+            sequence i is data[offsets[i]: offsets[i + 1]]
+        names
+            sequence names
+        moltype
+            MolType instance
+        """
+        if len(offsets) != len(names) + 1:
+            raise ValueError("require one more offset than names")
+        result = cls.__new__(cls)
+        result._data = numpy.asarray(data, dtype=uint8)
+        result._offsets = numpy.asarray(offsets, dtype=numpy.int64)
+        result.names = list(names)
+        result.moltype = moltype
+        result.info = InfoClass(info or {})
+        return result
+
+    def __repr__(self):
+        return (
+            f"{self.num_seqs}x ({self._offsets[-1]} total) "
+            f"{self.moltype.label} {self.__class__.__name__}"
+        )
+
+    def __len__(self):
+        """length of the longest sequence"""
+        return self.seq_len
+
+    @property
+    def num_seqs(self):
+        return len(self.names)
+
+    @property
+    def seq_len(self):
+        """length of the longest sequence"""
+        return int(numpy.diff(self._offsets).max()) if self.num_seqs else 0
+
+    def _seq_index(self, name):
+        if not hasattr(self, "_name_index"):
+            self._name_index = {n: i for i, n in enumerate(self.names)}
+        return self._name_index[name]
+
+    def _get_str(self, index):
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._data[start:end].tobytes().decode("latin-1")
+
+    def get_seq(self, seqname):
+        """returns the named sequence object"""
+        return self.moltype.make_seq(self._get_str(self._seq_index(seqname)), seqname)
+
+    def iter_seqs(self, seq_order=None):
+        """Iterates over sequence objects, optionally in provided order
+
+        Parameters
+        ----------
+        seq_order
+            list of seq names
+        """
+        for name in seq_order or self.names:
+            yield self.get_seq(name)
+
+    @property
+    def seqs(self):
+        return list(self.iter_seqs())
+
+    @property
+    def named_seqs(self):
+        return {s.name: s for s in self.iter_seqs()}
+
+    def to_dict(self):
+        """returns {name: seq string, ...}"""
+        return {n: self._get_str(i) for i, n in enumerate(self.names)}
+
+    def to_collection(self):
+        """returns a SequenceCollection"""
+        return SequenceCollection(
+            data=[(n, s) for n, s in self.to_dict().items()],
+            moltype=self.moltype,
+            info=self.info,
+        )
+
+    def to_fasta(self, block_size=60):
+        """returns sequences in fasta format
+
+        Parameters
+        ----------
+        block_size
+            line width of sequences
+        """
+        return alignment_to_fasta(self.to_dict(), block_size=block_size)
+
+    def _take(self, indices):
+        """returns data, offsets for the indexed sequences"""
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        starts = self._offsets[indices]
+        lengths = self._offsets[indices + 1] - starts
+        offsets = numpy.zeros(len(indices) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=offsets[1:])
+        positions = arange(offsets[-1]) + numpy.repeat(starts - offsets[:-1], lengths)
+        return self._data[positions], offsets
+
+    def take_seqs(self, seqs, negate=False):
+        """returns new instance containing only the specified seqs
+
+        Parameters
+        ----------
+        seqs
+            series of sequence names
+        negate
+            if True, excludes the specified seqs
+        """
+        if type(seqs) == str:
+            seqs = [seqs]
+        if negate:
+            seqs = set(seqs)
+            seqs = [n for n in self.names if n not in seqs]
+        indices = [self._seq_index(n) for n in seqs]
+        data, offsets = self._take(indices)
+        return self.__class__.from_buffer(
+            data, offsets, seqs, self.moltype, info=self.info
+        )
+
+    def degap(self):
+        """returns new instance with gap characters removed"""
+        gaps = _motif_mask(self.moltype, include_ambiguity=True, allow_gap=False)
+        keep = ~gaps[self._data]
+        cumulative = numpy.zeros(len(keep) + 1, dtype=numpy.int64)
+        numpy.cumsum(keep, out=cumulative[1:])
+        return self.__class__.from_buffer(
+            self._data[keep],
+            cumulative[self._offsets],
+            self.names,
+            self.moltype,
+            info=self.info,
+        )
+
+    def get_lengths(self, include_ambiguity=False, allow_gap=False):
+        """returns {name: seq length, ...}
+
+        Parameters
+        ----------
+        include_ambiguity
+            if True, ambiguous characters from the seq moltype are included.
+        allow_gap
+            if True, gap characters are included.
+        """
+        excluded = _motif_mask(
+            self.moltype, include_ambiguity=include_ambiguity, allow_gap=allow_gap
+        )
+        lengths = _lengths_from_buffer(self._data, self._offsets, excluded)
+        return DictArrayTemplate(self.names).wrap(lengths)
+
+    def counts_per_seq(
+        self,
+        motif_length=1,
+        include_ambiguity=False,
+        allow_gap=False,
+        exclude_unobserved=False,
+    ):
+        """returns MotifCountsArray of counts of motifs per sequence
+
+        Parameters
+        ----------
+        motif_length
+            number of characters per tuple.
+        include_ambiguity
+            if True, motifs containing ambiguous characters
+            from the seq moltype are included. No expansion of those is attempted.
+        allow_gap
+            if True, motifs containing a gap character are included.
+        exclude_unobserved
+            has no effect, only observed motifs are included
+
+        Notes
+        -----
+
+        only non-overlapping motifs are counted
+        """
+        excluded = _motif_mask(
+            self.moltype, include_ambiguity=include_ambiguity, allow_gap=allow_gap
+        )
+        counts, motifs = _counts_from_buffer(
+            self._data, self._offsets, motif_length, excluded, names=self.names
+        )
+        return MotifCountsArray(counts, motifs, row_indices=self.names)
+
+    def kmer_counts_per_seq(
+        self, k, canonical=False, dense=False, parallel=False, par_kw=None
+    ):
+        """returns MotifCountsArray of counts of overlapping k-mers per
+        sequence
+
+        Parameters
+        ----------
+        k : int
+            k-mer size. Gaps are removed, k-mers containing characters not in
+            the moltype alphabet (e.g. ambiguity codes) are excluded.
+        canonical : bool
+            if True, a k-mer and its reverse complement are counted as the
+            same k-mer, the one that is lexicographically first (with
+            characters in alphabet order) is reported
+        dense : bool
+            if True, all possible k-mers are included, otherwise only
+            observed k-mers are included
+        parallel : bool
+            if True, sequences are counted in separate processes
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
+        """
+        offsets = self._offsets
+        seqs = {
+            n: self._data[offsets[i] : offsets[i + 1]] for i, n in enumerate(self.names)
+        }
+        return kmer_counts_per_seq(
+            seqs,
+            k,
+            self.moltype,
+            names=self.names,
+            canonical=canonical,
+            dense=dense,
+            parallel=parallel,
+            par_kw=par_kw,
+        )
+
+    def has_terminal_stops(self, gc=None, allow_partial=False):
+        """Returns True if any sequence has a terminal stop codon.
+
+        Parameters
+        ----------
+        gc
+            genetic code object
+        allow_partial
+            if True and the sequence length is not divisible
+            by 3, ignores the 3' terminal incomplete codon
+        """
+        stops = _terminal_stops(
+            self._data, self._offsets, get_code(gc), self.moltype, allow_partial
+        )
+        return bool(stops.any())
+
+    def trim_stop_codons(self, gc=None, allow_partial=False):
+        """returns new instance with terminal stop codons removed
+
+        Parameters
+        ----------
+        gc
+            genetic code object
+        allow_partial
+            if True and the sequence length is not divisible
+            by 3, ignores the 3' terminal incomplete codon
+        """
+        stops = _terminal_stops(
+            self._data, self._offsets, get_code(gc), allow_partial=allow_partial
+        )
+        keep = numpy.ones(len(self._data), dtype=bool)
+        ends = self._offsets[1:][stops]
+        keep[(ends[:, None] + arange(-3, 0)).ravel()] = False
+        removed = numpy.zeros(len(self._offsets), dtype=numpy.int64)
+        numpy.cumsum(stops * 3, out=removed[1:])
+        return self.__class__.from_buffer(
+            self._data[keep],
+            self._offsets - removed,
+            self.names,
+            self.moltype,
+            info=self.info,
+        )
+
+
 @total_ordering
 class Aligned(object):
     """One sequence in an alignment, a map between alignment coordinates and
@@ -2354,11 +3225,7 @@ class AlignmentI(object):
         """
         if alphabet is None:
             alphabet = self.moltype
-        consensus = []
-        degen = alphabet.degenerate_from_seq
-        for col in self.positions:
-            consensus.append(degen(coerce_to_string(col)))
-        return coerce_to_string(consensus)
+        return _iupac_consensus(self._get_char_array(), alphabet)
 
     def majority_consensus(self):
         """Returns list containing most frequent item at each position.
@@ -2367,13 +3234,8 @@ class AlignmentI(object):
         will be converted (useful when consensus should be same type as
         originals).
         """
-        states = []
-        data = zip(*map(str, self.seqs))
-        for pos in data:
-            pos = CategoryCounter(pos)
-            states.append(pos.mode)
-
-        return self.moltype.make_seq("".join(states))
+        states = _majority_consensus(self._get_char_array())
+        return self.moltype.make_seq(states)
 
     def probs_per_pos(
         self, motif_length=1, include_ambiguity=False, allow_gap=False, alert=False
@@ -2524,24 +3386,25 @@ class AlignmentI(object):
             corresponds to codons. A motif that includes a gap at any position
             is included in the counting. Default is 1.
 
+        Notes
+        -----
+        If the alignment length is not divisible by motif_length, the
+        trailing partial motif is dropped with a UserWarning.
         """
-        is_array = isinstance(self, ArrayAlignment)
-        try:
-            alpha = self.moltype.alphabets.degen_gapped
-        except:
-            alpha = self.moltype.alphabet
-
-        gaps = list(self.moltype.gaps)
-        if is_array:
-            gaps = list(map(alpha.index, gaps))
-
-        gaps_ok = GapsOk(
-            gaps, allowed_gap_frac, is_array=is_array, motif_length=motif_length
-        )
-        # if we're not deleting the 'naughty' seqs that contribute to the
-        # gaps, it's easy...
-        result = self.filtered(gaps_ok, motif_length=motif_length)
-        return result
+        is_gap = zeros(256, dtype=bool)
+        is_gap[[ord(g) for g in self.moltype.gaps if ord(g) < 256]] = True
+        num_motifs = len(self) // motif_length
+        remainder = len(self) - num_motifs * motif_length
+        if remainder:
+            warnings.warn(
+                f"dropped remainder of {remainder} positions from end of alignment",
+                UserWarning,
+            )
+        chars = self._get_char_array()[:, : num_motifs * motif_length]
+        gapped = is_gap[chars].reshape(self.num_seqs, num_motifs, motif_length)
+        # same as GapsOk, the fraction of all characters in a column that are gaps
+        gap_frac = gapped.sum(axis=(0, 2)) / (self.num_seqs * motif_length)
+        return self._take_motif_columns(gap_frac <= allowed_gap_frac, motif_length)
 
     def get_gap_array(self, include_ambiguity=True):
         """returns bool array with gap state True, False otherwise
@@ -2567,6 +3430,65 @@ class AlignmentI(object):
 
         return gapped
 
+    def _get_char_array(self):
+        """returns uint8 array [seqs, positions] of the aligned characters"""
+        seqs = self.to_dict()
+        data, _ = _seqs_to_buffer(seqs[n] for n in self.names)
+        return data.reshape(len(self.names), len(self))
+
+    def trim_stop_codons(self, gc=DEFAULT, allow_partial=False, **kwargs):
+        """Removes any terminal stop codons from the sequences
+
+        Parameters
+        ----------
+        gc
+            genetic code object
+        allow_partial
+            if True and the sequence length is not divisible
+            by 3, ignores the 3' terminal incomplete codon
+
+        Notes
+        -----
+        Stop codons are replaced by gaps and trailing columns that are
+        entirely gaps are removed.
+        """
+        gc = get_code(gc)
+        if len(self) % 3 != 0 and not allow_partial:
+            raise ValueError("alignment length not divisible by 3")
+
+        chars = self._get_char_array().copy()
+        is_gap = _motif_mask(self.moltype, include_ambiguity=True)
+        non_gap = ~is_gap[chars]
+        # the index after the last non-gap character of each sequence
+        if len(self):
+            ends = len(self) - non_gap[:, ::-1].argmax(axis=1)
+        else:
+            ends = zeros(len(chars), dtype=int)
+        has_data = non_gap.any(axis=1)
+        partial = has_data & (ends % 3 != 0)
+        if partial.any() and not allow_partial:
+            name = self.names[nonzero(partial)[0][0]]
+            raise ValueError("'%s' length not divisible by 3" % name)
+
+        # the final three positions of each sequence
+        rows = nonzero(has_data & (ends >= 3))[0]
+        cols = ends[rows, None] + arange(-3, 0)
+        stops = _codons_are_stops(chars[rows[:, None], cols], gc)
+        chars[rows[stops, None], cols[stops]] = ord(self.moltype.gap)
+
+        # as before, we trim up to the last column with non-gap characters
+        non_gap = ~is_gap[chars].all(axis=0)
+        length = len(self) - non_gap[::-1].argmax() if non_gap.any() else 1
+        chars = chars[:, :length]
+        if isinstance(self, ArrayAlignment):
+            data = _alphabet_byte_indices(self.alphabet).take(chars)
+            return self.__class__(
+                data.T, moltype=self.moltype, names=self.names, info=self.info
+            )
+
+        data = [(n, s.tobytes().decode("latin-1")) for n, s in zip(self.names, chars)]
+        return self.__class__(data=data, moltype=self.moltype, info=self.info, **kwargs)
+
     def count_gaps_per_pos(self, include_ambiguity=True):
         """return counts of gaps per position as a DictArray
 
@@ -2986,9 +3908,18 @@ class AlignmentI(object):
         if alert and len(self) != length:
             warnings.warn(f"trimmed {len(self) - length}", UserWarning)
 
-        data = list(self.to_dict().values())
+        # each column of motifs is laid out contiguously so that columns can
+        # be counted like sequences
+        num_motifs = length // motif_length
+        chars = self._get_char_array()[:, :length]
+        chars = chars.reshape(self.num_seqs, num_motifs, motif_length)
+        data = numpy.ascontiguousarray(chars.transpose(1, 0, 2)).ravel()
+        offsets = arange(num_motifs + 1) * self.num_seqs * motif_length
+        counts, all_motifs = _counts_from_buffer(
+            data, offsets, motif_length, zeros(256, dtype=bool)
+        )
+
         alpha = self.moltype.alphabet.get_word_alphabet(motif_length)
-        all_motifs = set()
         exclude_chars = set()
         if not allow_gap:
             exclude_chars.update(self.moltype.gap)
@@ -2997,24 +3928,15 @@ class AlignmentI(object):
             ambigs = [c for c, v in self.moltype.ambiguities.items() if len(v) > 1]
             exclude_chars.update(ambigs)
 
-        result = []
-        for i in range(0, len(self) - motif_length + 1, motif_length):
-            counts = CategoryCounter([s[i : i + motif_length] for s in data])
-            all_motifs.update(list(counts))
-            result.append(counts)
-
         if all_motifs:
-            alpha += tuple(sorted(set(alpha) ^ all_motifs))
+            alpha += tuple(sorted(set(alpha) ^ set(all_motifs)))
 
         if exclude_chars:
             # this additional clause is required for the bytes moltype
             # That moltype includes '-' as a character
             alpha = [m for m in alpha if not (set(m) & exclude_chars)]
 
-        for i, counts in enumerate(result):
-            result[i] = counts.tolist(alpha)
-
-        result = MotifCountsArray(result, alpha)
+        result = MotifCountsArray(_reordered_counts(counts, all_motifs, alpha), alpha)
         return result
 
     def counts_per_seq(
@@ -3046,25 +3968,15 @@ class AlignmentI(object):
         if alert and len(self) != length:
             warnings.warn(f"trimmed {len(self) - length}", UserWarning)
 
-        is_array = isinstance(self, ArrayAlignment)
-        counts = []
-        motifs = set()
-        for name in self.names:
-            if is_array:
-                seq = self.moltype.make_array_seq(
-                    self.array_seqs[self.names.index(name)]
-                )
-            else:
-                seq = self.get_gapped_seq(name)
-            c = seq.counts(
-                motif_length=motif_length,
-                include_ambiguity=include_ambiguity,
-                allow_gap=allow_gap,
-                exclude_unobserved=exclude_unobserved,
-            )
-            motifs.update(c.keys())
-            counts.append(c)
-
+        chars = self._get_char_array()
+        offsets = arange(self.num_seqs + 1) * len(self)
+        excluded = _motif_mask(
+            self.moltype, include_ambiguity=include_ambiguity, allow_gap=allow_gap
+        )
+        counts, observed = _counts_from_buffer(
+            chars.ravel(), offsets, motif_length, excluded, names=self.names
+        )
+        motifs = set(observed)
         if not exclude_unobserved:
             motifs.update(self.moltype.alphabet.get_word_alphabet(motif_length))
 
@@ -3072,8 +3984,7 @@ class AlignmentI(object):
         if not motifs:
             return None
 
-        for i, c in enumerate(counts):
-            counts[i] = c.tolist(motifs)
+        counts = _reordered_counts(counts, observed, motifs)
         return MotifCountsArray(counts, motifs, row_indices=self.names)
 
     def variable_positions(self, include_gap_motif=True):
@@ -3124,7 +4035,6 @@ class AlignmentI(object):
         if isinstance(self, klass) and (moltype is None or moltype == self.moltype):
             return self
 
-        data = self.to_dict()
         if moltype is None:
             # Alignment and ArrayAlignment have different default moltypes
             moltype_default = self.moltype == self.__class__.moltype
@@ -3132,10 +4042,55 @@ class AlignmentI(object):
                 moltype = ArrayAlignment.moltype if array_align else Alignment.moltype
             else:
                 moltype = self.moltype
+
+        if array_align:
+            new = self._to_array_alignment(moltype)
+            if new is not None:
+                return new
+
+        data = self.to_dict()
         new = klass(data=data, moltype=moltype, info=self.info, names=self.names)
         return new
 
-    def distance_matrix(self, calc="percent", show_progress=False, drop_invalid=False):
+    def _to_array_alignment(self, moltype):
+        """returns ArrayAlignment encoded directly from the character array,
+        or None if characters are not all valid for moltype"""
+        if isinstance(moltype, str):
+            from cogent3.core.moltype import get_moltype
+
+            moltype = get_moltype(moltype)
+
+        try:
+            alphabet = moltype.alphabets.degen_gapped
+        except AttributeError:
+            alphabet = moltype.alphabet
+
+        if not isinstance(alphabet, CharAlphabet):
+            return None
+
+        indices = _alphabet_byte_indices(alphabet).take(self._get_char_array())
+        if (indices < 0).any():
+            # the standard construction route raises the appropriate error
+            return None
+
+        return ArrayAlignment(
+            indices.astype(alphabet.array_type),
+            force_same_data=True,
+            moltype=moltype,
+            info=self.info,
+            names=self.names[:],
+        )
+
+    def distance_matrix(
+        self,
+        calc="percent",
+        show_progress=False,
+        drop_invalid=False,
+        out_path=None,
+        tile_size=1000,
+        parallel=False,
+        par_kw=None,
+    ):
         """Returns pairwise distances between sequences.
 
         Parameters
@@ -3149,9 +4104,41 @@ class AlignmentI(object):
             If True, sequences for which a pairwise distance could not be
             calculated are excluded. If False, an ArithmeticError is raised if
             a distance could not be computed on observed data.
+        out_path : str
+            if provided, distances are computed in tiles and written to this
+            directory, which an interrupted computation resumes from. The
+            returned matrix reads distances from disk. See
+            cogent3.evolve.blocked_distance.blocked_distances
+        tile_size : int
+            number of sequences in the row and column blocks of a tile, only
+            applies if out_path is provided
+        parallel : bool
+            if True and out_path is provided, tiles are computed in separate
+            processes
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
         """
         from cogent3.evolve.fast_distance import get_distance_calculator
 
+        if out_path is not None:
+            from cogent3.evolve.blocked_distance import blocked_distances
+
+            try:
+                result = blocked_distances(
+                    self,
+                    calc,
+                    out_path,
+                    tile_size=tile_size,
+                    invalid_raises=not drop_invalid,
+                    parallel=parallel,
+                    par_kw=par_kw,
+                    show_progress=show_progress,
+                )
+            except ArithmeticError:
+                msg = "not all pairwise distances could be computed, try drop_invalid=True"
+                raise ArithmeticError(msg)
+            return result.drop_invalid() if drop_invalid else result
+
         try:
             calculator = get_distance_calculator(
                 calc,
@@ -3552,6 +4539,29 @@ def aln_from_array_seqs(seqs, array_type=None, alphabet=None):
     return result, names
 
 
+def _seqs_to_index_array(seqs, alphabet, array_type=None):
+    """returns [seq, position] array of alphabet indices, or None if seqs are
+    not equal length strings (or Sequence objects) on a character alphabet"""
+    seqs = [getattr(s, "_seq", s) for s in seqs]
+    if (
+        not seqs
+        or getattr(alphabet, "_motiflen", None) != 1
+        or not all(isinstance(s, str) for s in seqs)
+    ):
+        return None
+
+    length = len(seqs[0])
+    if length == 0 or any(len(s) != length for s in seqs):
+        return None
+
+    indices = alphabet._to_index_array("".join(seqs))
+    if indices is None:
+        return None
+
+    indices = indices.reshape(len(seqs), length)
+    return indices.astype(array_type) if array_type else indices
+
+
 def aln_from_generic(data, array_type=None, alphabet=None):
     """Alignment from generic seq x pos data: sequence of sequences of chars.
 
@@ -3562,7 +4572,9 @@ def aln_from_generic(data, array_type=None, alphabet=None):
 
     WARNING: Data type of return array is not guaranteed -- check in caller!
     """
-    result = array(list(map(alphabet.to_indices, data)))
+    result = _seqs_to_index_array(data, alphabet)
+    if result is None:
+        result = array(list(map(alphabet.to_indices, data)))
     names = []
     for d in data:
         if hasattr(d, "name"):
@@ -3578,7 +4590,9 @@ def aln_from_collection(seqs, array_type=None, alphabet=None):
     """Alignment from SequenceCollection object, or its subclasses."""
     names = seqs.names
     data = [seqs.named_seqs[i] for i in names]
-    result = array(list(map(alphabet.to_indices, data)))
+    result = _seqs_to_index_array(data, alphabet)
+    if result is None:
+        result = array(list(map(alphabet.to_indices, data)))
     if array_type:
         result = result.astype(array_type)
     return result, names
@@ -3622,7 +4636,9 @@ def aln_from_dict(aln, array_type=None, alphabet=None):
     names, seqs = list(zip(*sorted(aln.items())))
     seqs = [bytes_to_string(s) for s in seqs]
     _one_length(seqs)
-    result = array(list(map(alphabet.to_indices, seqs)), array_type)
+    result = _seqs_to_index_array(seqs, alphabet, array_type)
+    if result is None:
+        result = array(list(map(alphabet.to_indices, seqs)), array_type)
     return result, list(names)
 
 
@@ -3637,7 +4653,9 @@ def aln_from_kv_pairs(aln, array_type=None, alphabet=None):
     names, seqs = list(zip(*aln))
     seqs = [bytes_to_string(s) for s in seqs]
     _one_length(seqs)
-    result = array(list(map(alphabet.to_indices, seqs)), array_type)
+    result = _seqs_to_index_array(seqs, alphabet, array_type)
+    if result is None:
+        result = array(list(map(alphabet.to_indices, seqs)), array_type)
     return result, list(names)
 
 
@@ -3892,6 +4910,14 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         """
         if alphabet is None:
             alphabet = self.moltype
+        chars = self._get_char_array()
+        alphabets = getattr(alphabet, "alphabets", None)
+        if alphabets is not None:
+            valid = _alphabet_byte_indices(alphabets.degen_gapped).take(chars) >= 0
+            if valid.all():
+                return _iupac_consensus(chars, alphabet)
+
+        # characters must be converted to the alphabet moltype
         consensus = []
         degen = alphabet.degenerate_from_seq
         for col in self.positions:
@@ -3980,19 +5006,18 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
             shaped = shaped[:, : num_motifs * motif_length]
 
         shaped = shaped.reshape((self.num_seqs, num_motifs, motif_length))
-        indices = []
-        elements = arange(motif_length)
-        for i in range(num_motifs):
-            if not predicate(shaped[:, i]):
-                continue
-
-            start = motif_length * i
-            indices.extend(elements + start)
-
-        if not indices:
+        keep = [predicate(shaped[:, i]) for i in range(num_motifs)]
+        return self._take_motif_columns(keep, motif_length)
+
+    def _take_motif_columns(self, keep, motif_length):
+        """returns alignment of the motif columns where keep is True, None if
+        there are none"""
+        keep = array(keep, dtype=bool)
+        if not keep.any():
             return None
 
-        positions = self.array_seqs.take(indices, axis=1)
+        indices = nonzero(keep)[0][:, None] * motif_length + arange(motif_length)
+        positions = self.array_seqs.take(indices.ravel(), axis=1)
         result = self.__class__(
             positions,
             force_same_data=True,
@@ -4002,6 +5027,13 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
         )
         return result
 
+    def _get_char_array(self):
+        """returns uint8 array [seqs, positions] of the aligned characters"""
+        if not isinstance(self.alphabet, CharAlphabet):
+            return super(ArrayAlignment, self)._get_char_array()
+        chars = self.alphabet._indices_nums_to_chars.view(uint8)
+        return chars.take(self.array_seqs)
+
     def get_gapped_seq(self, seq_name, recode_gaps=False, moltype=None):
         """Return a gapped Sequence object for the specified seqname.
 
@@ -4017,70 +5049,6 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
                 s = s.replace(gapchar, ambig)
         return s
 
-    def trim_stop_codons(self, gc=DEFAULT, allow_partial=False, **kwargs):
-        """Removes any terminal stop codons from the sequences
-
-        Parameters
-        ----------
-        gc
-            genetic code object
-        allow_partial
-            if True and the sequence length is not divisible
-            by 3, ignores the 3' terminal incomplete codon
-
-        """
-        gc = get_code(gc)
-        if len(self) % 3 != 0 and not allow_partial:
-            raise ValueError("alignment length not divisible by 3")
-
-        stops = gc["*"]
-        get_index = self.alphabet.degen.index
-        stop_indices = set(tuple(map(get_index, stop)) for stop in stops)
-        new_data = self.array_seqs.copy()
-
-        gap_indices = set(get_index(gap) for gap in self.moltype.gaps)
-        gap_index = get_index(self.moltype.gap)
-
-        trim_length = len(self)
-        seqs_with_stops = 0
-        for seq_num, seq in enumerate(new_data):
-            # reverse find first non-gap character
-            nondegen_index = None
-            for i in range(len(self) - 1, -1, -1):
-                e = seq[i]
-                if e not in gap_indices:
-                    nondegen_index = i + 1
-                    if nondegen_index % 3 != 0 and not allow_partial:
-                        raise ValueError(
-                            "'%s' length not divisible by 3" % self.names[seq_num]
-                        )
-                    break
-
-            if nondegen_index is None or nondegen_index - 3 < 0:
-                continue
-
-            # slice last three valid positions and see if stop
-            end_codon = tuple(seq[nondegen_index - 3 : nondegen_index])
-            if end_codon in stop_indices:
-                seqs_with_stops += 1
-                seq[nondegen_index - 3 : nondegen_index] = gap_index
-                trim_length = min([trim_length, nondegen_index - 3])
-
-        result = self.__class__(
-            new_data.T, moltype=self.moltype, names=self.names, info=self.info
-        )
-        # this is an ugly hack for rather odd standard behaviour
-        # we find the last alignment column to have not just gap chars
-        # and trim up to that
-        for i in range(len(result) - 1, -1, -1):
-            col = set(result.array_seqs[:, i])
-            if not col <= gap_indices:
-                break
-        if i != len(result):
-            result = result[: i + 1]
-
-        return result
-
     def get_degapped_relative_to(self, name):
         """Remove all columns with gaps in sequence with given name.
 
@@ -4247,56 +5215,22 @@ class ArrayAlignment(AlignmentI, _SequenceCollectionBase):
             )
             mask_degen = False
 
-        if not mask_degen:
-            seqs_names = list(zip(self.array_seqs.tolist(), self.names))
-            seqs_names.sort()
-            matched = None
-            dupes = defaultdict(set)
-            for i in range(self.num_seqs - 1):
-                if seqs_names[i][0] == seqs_names[i + 1][0]:
-                    matched = seqs_names[i][1] if matched is None else matched
-                    dupes[matched].update([seqs_names[i + 1][1], matched])
-                else:
-                    matched = None
-            identical_sets = list(dupes.values())
-            return identical_sets
-
-        # we get the indexes range for non-degenerate characters
-        indices = [self.alphabet.index(c) for c in self.moltype]
-        # make sure they're all consecutive
-        diffs = set([indices[i - 1] - indices[i] for i in range(1, len(indices))])
-        assert diffs == set([-1]), diffs
-        start, end = min(indices), max(indices)
-        # identify non-masked positions
-        degen_masks = {}
-        for i in range(self.num_seqs):
-            s1 = self.array_seqs[i]
-            degen_masks[i] = logical_or(s1 <= start, s1 <= end)
-
-        identical_sets = []
-        seen = set()
-        for i in range(self.num_seqs - 1):
-            if i in seen:
-                continue
-
-            s1 = self.array_seqs[i]
-            m1 = degen_masks[i]
-            group = set()
-            for j in range(i + 1, self.num_seqs):
-                if j in seen:
-                    continue
+        get_mask = None
+        if mask_degen:
+            # we get the indexes range for non-degenerate characters
+            indices = [self.alphabet.index(c) for c in self.moltype]
+            # make sure they're all consecutive
+            diffs = set([indices[i - 1] - indices[i] for i in range(1, len(indices))])
+            assert diffs == set([-1]), diffs
+            start, end = min(indices), max(indices)
 
-                s2 = self.array_seqs[j]
-                m2 = degen_masks[j]
-                valid_pos = logical_and(m1, m2)  # non-degen positions
-                if (s1[valid_pos] == s2[valid_pos]).all():
-                    seen.update([i, j])
-                    group.update([i, j])
+            def is_degen(seq):
+                return (seq < start) | (seq > end)
 
-            if group:
-                identical_sets.append(set(self.names[i] for i in group))
+            get_mask = is_degen
 
-        return identical_sets
+        identical_sets = _identical_sets(list(self.array_seqs), get_mask=get_mask)
+        return [set(self.names[i] for i in group) for group in identical_sets]
 
     def deepcopy(self, sliced=True):
         """Returns deep copy of self."""
@@ -4518,31 +5452,49 @@ class Alignment(_Annotatable, AlignmentI, SequenceCollection):
             raise ValueError(
                 "aligned length not divisible by " "motif_length=%d" % motif_length
             )
-        gv = []
-        kept = False
         seqs = [
             self.get_gapped_seq(n).get_in_motif_size(motif_length, **kwargs)
             for n in self.names
         ]
-
-        positions = list(zip(*seqs))
-        for (position, column) in enumerate(positions):
-            keep = predicate(column)
-            if kept != keep:
-                gv.append(position * motif_length)
-                kept = keep
-
-        if kept:
-            gv.append(len(positions) * motif_length)
-
-        if not gv:
+        keep = [predicate(column) for column in zip(*seqs)]
+        return self._take_motif_columns(keep, motif_length)
+
+    def _take_motif_columns(self, keep, motif_length):
+        """returns alignment of the motif columns where keep is True, None if
+        there are none"""
+        keep = array(keep, dtype=bool)
+        if not keep.any():
             return None
 
-        locations = [(gv[i], gv[i + 1]) for i in range(0, len(gv), 2)]
-
+        # the boundaries of runs of kept columns
+        changes = numpy.diff(numpy.concatenate([[False], keep, [False]]).astype(int))
+        starts = nonzero(changes == 1)[0] * motif_length
+        ends = nonzero(changes == -1)[0] * motif_length
+        locations = list(zip(starts.tolist(), ends.tolist()))
         keep = Map(locations, parent_length=len(self))
         return self.gapped_by_map(keep, info=self.info)
 
+    def _get_char_array(self):
+        """returns uint8 array [seqs, positions] of the aligned characters
+
+        Notes
+        -----
+        The array is computed once and cached, it is rebuilt if the names or
+        sequences of self have been changed.
+        """
+        seqs = [self.named_seqs[n] for n in self.names]
+        cached = getattr(self, "_char_array", None)
+        if (
+            cached is None
+            or len(cached[0]) != len(seqs)
+            or any(a is not b for a, b in zip(cached[0], seqs))
+        ):
+            data, _ = _seqs_to_buffer(s.get_gapped_seq() for s in seqs)
+            # the array is read-only, being a view of the bytes object
+            cached = (seqs, data.reshape(len(seqs), self.seq_len))
+            self._char_array = cached
+        return cached[1]
+
     def get_seq(self, seqname):
         """Return a ungapped Sequence object for the specified seqname.
 
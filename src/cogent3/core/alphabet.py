@@ -117,6 +117,39 @@ def _make_translation_tables(a):
     return str.maketrans(indices, chars), str.maketrans(chars, indices)
 
 
+def _make_byte_lookup(motifs, motif_len):
+    """returns arrays for converting strings of single byte characters into
+    indices of motifs, or None if motifs are not strings of length motif_len
+
+    Returns
+    -------
+    char_codes
+        256 element array, mapping bytes to indices of the distinct characters
+        in motifs, -1 for other bytes
+    num_chars
+        number of distinct characters
+    word_lookup
+        array mapping packed words, sum(char_code * num_chars ** position),
+        to the index of the motif, -1 for words not in motifs
+    """
+    if not motif_len or not all(isinstance(m, str) for m in motifs):
+        return None
+
+    chars = sorted(set("".join(motifs)))
+    if max(map(ord, chars)) > 255 or len(chars) ** motif_len > 2 ** 20:
+        return None
+
+    char_codes = numpy.full(256, -1, dtype=numpy.int64)
+    char_codes[[ord(c) for c in chars]] = arange(len(chars))
+    word_lookup = numpy.full(len(chars) ** motif_len, -1, dtype=numpy.int64)
+    for i, motif in enumerate(motifs):
+        code = 0
+        for c in motif:
+            code = code * len(chars) + char_codes[ord(c)]
+        word_lookup[code] = i
+    return char_codes, len(chars), word_lookup
+
+
 def _make_complement_array(a, complements):
     """Makes translation array between item indices and their complements."""
     comps = [complements.get(i, i) for i in a]
@@ -239,9 +272,47 @@ class Enumeration(tuple):
         would produce the result [1,1,2,0], returning the index of each
         element in the input.
         """
+        if self._motiflen == 1:
+            indices = self._to_index_array(getattr(data, "_seq", data))
+            if indices is not None:
+                return indices.tolist()
+
         result = [self._obj_to_index[e] for e in data]
         return result
 
+    def _to_index_array(self, data):
+        """returns array of indices of the consecutive motifs in the string
+        data, or None if data is not a string of single byte characters
+        composed of motifs"""
+        if not isinstance(data, str):
+            return None
+
+        if not hasattr(self, "_byte_lookup"):
+            self._byte_lookup = _make_byte_lookup(self, self._motiflen)
+        if self._byte_lookup is None:
+            return None
+
+        try:
+            data = data.encode("latin-1")
+        except UnicodeEncodeError:
+            return None
+
+        motif_len = self._motiflen
+        if len(data) % motif_len:
+            return None
+
+        char_codes, num_chars, word_lookup = self._byte_lookup
+        codes = char_codes.take(frombuffer(data, dtype=uint8))
+        if (codes < 0).any():
+            return None
+
+        if motif_len > 1:
+            codes = codes.reshape(-1, motif_len).dot(
+                num_chars ** arange(motif_len - 1, -1, -1)
+            )
+        indices = word_lookup.take(codes)
+        return None if (indices < 0).any() else indices
+
     def is_valid(self, seq):
         """Returns True if seq contains only items in self."""
         try:
@@ -263,6 +334,18 @@ class Enumeration(tuple):
         to each element in the input.
 
         """
+        if (
+            isinstance(data, numpy.ndarray)
+            and data.ndim == 1
+            and data.dtype.kind in "iu"
+        ):
+            if not hasattr(self, "_motif_array"):
+                motifs = numpy.empty(len(self), dtype=object)
+                for i, motif in enumerate(self):
+                    motifs[i] = motif
+                self._motif_array = motifs
+            return self._motif_array.take(data).tolist()
+
         # if it's a normal Python type, map will work
         try:
             return list(map(self.__getitem__, data))
@@ -601,6 +684,12 @@ class Alphabet(Enumeration):
         not do. It also requires the sequence to be a Sequence object rather
         than an arbitrary string, tuple, etc.
         """
+        data = getattr(sequence, "_seq", None)
+        if data:
+            indices = self._to_index_array(data)
+            if indices is not None:
+                return indices
+
         sequence = sequence.get_in_motif_size(self._motiflen)
         return array(list(map(self.index, sequence)))
 
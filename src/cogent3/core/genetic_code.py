@@ -5,10 +5,10 @@ NOTE: * is used to denote termination (as per NCBI standard).
 NOTE: Although the genetic code objects convert DNA to RNA and vice
 versa, lists of codons that they produce will be provided in DNA format.
 """
-import re
-
 from itertools import product
 
+import numpy
+
 from cogent3.util.table import Table
 
 
@@ -46,6 +46,46 @@ def _simple_rc(seq):
 
 _bases = "TCAG"
 
+# maps bytes to nucleotide indices, T/U, C, A, G (either case) are 0-3 and
+# any other character is 4
+_nucleotide_indices = numpy.full(256, 4, dtype=numpy.uint8)
+for _i, _chars in enumerate(("TtUu", "Cc", "Aa", "Gg")):
+    _nucleotide_indices[[ord(c) for c in _chars]] = _i
+
+# complements of nucleotide indices
+_complement_indices = numpy.array([2, 3, 0, 1, 4], dtype=numpy.uint8)
+
+
+def encode_nucleotides(seq):
+    """returns uint8 array of nucleotide indices for the characters in seq
+
+    T/U, C, A, G (either case) are 0-3, any other character is 4.
+    """
+    seq = numpy.frombuffer(str(seq).encode("utf-32-le"), dtype=numpy.uint32)
+    return _nucleotide_indices.take(numpy.minimum(seq, 255))
+
+
+def _codon_indices(nucs, start=0):
+    """returns codon indices for the complete codons of nucs beginning at start
+
+    The codon index is n1 * 25 + n2 * 5 + n3, where n is a nucleotide index
+    from encode_nucleotides(), giving 125 possible values.
+    """
+    num_codons = max((len(nucs) - start) // 3, 0)
+    codons = nucs[start : start + 3 * num_codons].reshape(num_codons, 3)
+    return codons.astype(numpy.int64).dot([25, 5, 1])
+
+
+def _frame_starts(offsets, frame):
+    """returns the start of every complete codon in frame, and the number of
+    codons per sequence, for sequences delimited by offsets"""
+    lengths = numpy.diff(offsets)
+    num_codons = numpy.maximum((lengths - frame) // 3, 0)
+    total = num_codons.sum()
+    first = numpy.cumsum(num_codons) - num_codons
+    starts = numpy.repeat(offsets[:-1] + frame - 3 * first, num_codons)
+    return starts + 3 * numpy.arange(total), num_codons
+
 
 class GeneticCode:
     """Holds codon to amino acid mapping, and vice versa.
@@ -114,6 +154,14 @@ class GeneticCode:
         for aa, codons in list(self.synonyms.items()):
             ac[aa] = list(map(_simple_rc, codons))
         self.anticodons = ac
+        # amino acids indexed by codon index (see _codon_indices), codons
+        # containing a non-nucleotide are translated as 'X'
+        aa_table = numpy.full(125, ord("X"), dtype=numpy.uint8)
+        for (i, j, k), aa in zip(product(range(4), repeat=3), code_sequence):
+            aa_table[i * 25 + j * 5 + k] = ord(aa)
+        aa_table.flags.writeable = False
+        self._aa_table = aa_table
+        self._stop_table = aa_table == ord("*")
 
     def _analyze_quartet(self, codons, aa):
         """Analyzes a quartet of codons and amino acids: returns list of lists.
@@ -257,26 +305,77 @@ class GeneticCode:
             return ""
         if start + 1 > len(dna):
             raise ValueError("Translation starts after end of RNA")
-        return "".join([self[dna[i : i + 3]] for i in range(start, len(dna) - 2, 3)])
+        return self._translate_indices(encode_nucleotides(dna), start)
+
+    def _translate_indices(self, nucs, start=0):
+        """returns translation of the nucleotide index array nucs"""
+        aa = self._aa_table.take(_codon_indices(nucs, start))
+        return aa.tobytes().decode("ascii")
 
     def get_stop_indices(self, dna, start=0):
         """returns indexes for stop codons in the specified frame"""
-        stops = self["*"]
-        stop_pattern = "(%s)" % "|".join(stops)
-        stop_pattern = re.compile(stop_pattern)
-        seq = str(dna)
-        found = [hit.start() for hit in stop_pattern.finditer(seq)]
-        found = [index for index in found if index % 3 == start]
-        return found
+        if start not in (0, 1, 2):
+            return []
+        codons = _codon_indices(encode_nucleotides(dna), start)
+        found = numpy.flatnonzero(self._stop_table.take(codons))
+        return (start + 3 * found).tolist()
 
     def sixframes(self, dna):
         """Returns six-frame translation as dict containing {frame:translation}
         """
-        reverse = dna.rc()
-        return [self.translate(dna, start) for start in range(3)] + [
-            self.translate(reverse, start) for start in range(3)
+        if dna and len(dna) < 3:
+            raise ValueError("Translation starts after end of RNA")
+        nucs = encode_nucleotides(dna)
+        reverse = _complement_indices.take(nucs[::-1])
+        return [self._translate_indices(nucs, start) for start in range(3)] + [
+            self._translate_indices(reverse, start) for start in range(3)
         ]
 
+    def sixframes_many(self, seqs):
+        """Returns six-frame translations of many sequences
+
+        Parameters
+        ----------
+        seqs
+            a sequence collection, or series of sequences or strings
+
+        Returns
+        -------
+        list of six-frame translations, as returned by sixframes(), in the
+        order of seqs. Frames beyond the end of sequences shorter than a codon
+        are empty strings.
+        """
+        if hasattr(seqs, "names") and hasattr(seqs, "named_seqs"):
+            seqs = [seqs.named_seqs[n] for n in seqs.names]
+        else:
+            seqs = list(seqs)
+
+        lengths = numpy.array([len(s) for s in seqs], dtype=numpy.int64)
+        offsets = numpy.zeros(len(seqs) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=offsets[1:])
+        nucs = encode_nucleotides("".join(str(s) for s in seqs))
+        # the reverse complement of the concatenated sequences holds the
+        # reverse complement of each sequence, in reverse order
+        reverse = _complement_indices.take(nucs[::-1])
+        rc_offsets = offsets[-1] - offsets[::-1]
+
+        translations = [[] for _ in seqs]
+        for data, bounds, order in (
+            (nucs, offsets, range(len(seqs))),
+            (reverse, rc_offsets, range(len(seqs) - 1, -1, -1)),
+        ):
+            for frame in range(3):
+                starts, num_codons = _frame_starts(bounds, frame)
+                codons = data[starts[:, None] + numpy.arange(3)]
+                codons = codons.astype(numpy.int64).dot([25, 5, 1])
+                aa = self._aa_table.take(codons).tobytes().decode("ascii")
+                ends = numpy.cumsum(num_codons).tolist()
+                begin = 0
+                for i, end in zip(order, ends):
+                    translations[i].append(aa[begin:end])
+                    begin = end
+        return translations
+
     def is_start(self, codon):
         """Returns True if codon is a start codon, False otherwise."""
         fixed_codon = codon.upper().replace("U", "T")
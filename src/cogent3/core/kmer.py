@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+"""Counting of overlapping k-mers in sequences.
+
+K-mers are represented by integer codes, the k-mer's alphabet indices packed
+as the digits of a base len(alphabet) number (2 bits per character for
+nucleic acids), the first character being the most significant. Code order
+is therefore lexicographic order, with characters ordered as in the
+alphabet. Codes for all k-mers of a sequence are computed with a rolling
+update over the sequence array, then counted with numpy.
+"""
+import numpy
+
+from numpy import int64, uint8, uint64
+
+from cogent3.core.profile import MotifCountsArray
+from cogent3.util import parallel as PAR
+from cogent3.util.dict_array import DictArrayTemplate
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+# maximum number of possible k-mers for dense counts
+_MAX_DENSE = 2 ** 24
+
+
+def _char_to_index(alphabet, gaps=""):
+    """returns array mapping byte values to alphabet indices
+
+    Characters not in the alphabet are assigned len(alphabet), gap characters
+    are assigned len(alphabet) + 1.
+    """
+    num_states = len(alphabet)
+    lookup = numpy.full(256, num_states, dtype=int64)
+    for i, char in enumerate(alphabet):
+        lookup[ord(char)] = i
+        lookup[ord(char.lower())] = i
+    for char in gaps:
+        lookup[ord(char)] = num_states + 1
+    return lookup
+
+
+def kmer_codes_per_pos(indices, k, num_states):
+    """returns integer codes of the k-mers starting at each position, and a
+    bool array that is False where the k-mer contains an invalid state
+
+    Parameters
+    ----------
+    indices
+        1D array of alphabet indices, values >= num_states are invalid
+    k : int
+        k-mer size
+    num_states : int
+        number of states in the alphabet
+    """
+    indices = numpy.asarray(indices, dtype=int64)
+    num_kmers = len(indices) - k + 1
+    if num_kmers <= 0:
+        return numpy.empty(0, dtype=uint64), numpy.empty(0, dtype=bool)
+
+    invalid = (indices >= num_states).astype(int64)
+    # windows containing an invalid state have a non-zero count
+    cumulative = numpy.concatenate([[0], invalid.cumsum()])
+    valid = (cumulative[k:] - cumulative[:-k]) == 0
+    codes = numpy.zeros(num_kmers, dtype=uint64)
+    states = uint64(num_states)
+    for i in range(k):
+        codes = codes * states + indices[i : i + num_kmers].astype(uint64)
+    return codes, valid
+
+
+def kmer_codes(indices, k, num_states):
+    """returns integer codes for all k-mers not containing an invalid state
+
+    Parameters
+    ----------
+    indices
+        1D array of alphabet indices, values >= num_states are invalid
+    k : int
+        k-mer size
+    num_states : int
+        number of states in the alphabet
+    """
+    codes, valid = kmer_codes_per_pos(indices, k, num_states)
+    return codes[valid]
+
+
+def reverse_complement_codes(codes, k, complement):
+    """returns the codes of the reverse complements of k-mers
+
+    Parameters
+    ----------
+    codes
+        k-mer codes
+    k : int
+        k-mer size
+    complement
+        array mapping each alphabet index to the index of its complement
+    """
+    complement = numpy.asarray(complement, dtype=uint64)
+    states = uint64(len(complement))
+    codes = numpy.array(codes, dtype=uint64)
+    result = numpy.zeros(len(codes), dtype=uint64)
+    # the last character of the k-mer is the first of its reverse complement
+    for _ in range(k):
+        result = result * states + complement.take((codes % states).astype(int64))
+        codes //= states
+    return result
+
+
+def codes_to_motifs(codes, k, alphabet):
+    """returns list of the k-mer strings corresponding to codes"""
+    chars = numpy.array(list(alphabet), dtype="U1")
+    codes = numpy.array(codes, dtype=uint64)
+    states = uint64(len(chars))
+    digits = numpy.empty((len(codes), k), dtype=int64)
+    for i in range(k - 1, -1, -1):
+        digits[:, i] = codes % states
+        codes //= states
+    return chars[digits].view(f"U{k}").ravel().tolist()
+
+
+def _complement_indices(moltype):
+    """returns array mapping alphabet indices to the index of the complement"""
+    if not moltype.complements:
+        raise TypeError("canonical k-mers require a moltype with complements")
+    alphabet = moltype.alphabet
+    return numpy.array(
+        [alphabet.index(moltype.complements[c]) for c in alphabet], dtype=int64
+    )
+
+
+class _KmerCoder:
+    """callable returning the observed k-mer codes of a sequence and their
+    counts. Holds only arrays so is cheap to send to worker processes."""
+
+    def __init__(self, k, moltype, canonical=False):
+        alphabet = moltype.alphabet
+        num_states = len(alphabet)
+        if num_states ** k >= 2 ** 64:
+            raise ValueError(f"k={k} too large for alphabet of {num_states}")
+
+        self.k = k
+        self.num_states = num_states
+        self.lookup = _char_to_index(alphabet, gaps="".join(moltype.gaps))
+        self.complement = _complement_indices(moltype) if canonical else None
+
+    def canonical(self, codes):
+        """returns the lesser of codes and their reverse complement codes"""
+        if self.complement is None:
+            return codes
+        return numpy.minimum(
+            codes, reverse_complement_codes(codes, self.k, self.complement)
+        )
+
+    def __call__(self, seq):
+        if isinstance(seq, numpy.ndarray):
+            data = seq.astype(uint8, copy=False)
+        else:
+            data = numpy.frombuffer(str(seq).encode("latin-1"), dtype=uint8)
+        indices = self.lookup.take(data)
+        # gaps are removed, other invalid characters interrupt k-mers
+        indices = indices[indices != self.num_states + 1]
+        codes = self.canonical(kmer_codes(indices, self.k, self.num_states))
+        # bincount is cheaper than sorting unless most k-mers are unobserved
+        if self.num_states ** self.k <= 4 * len(codes):
+            counts = numpy.bincount(codes.astype(int64))
+            observed = counts.nonzero()[0]
+            return observed.astype(uint64), counts[observed]
+
+        observed, counts = numpy.unique(codes, return_counts=True)
+        return observed, counts
+
+
+def _all_codes(coder):
+    """returns all k-mer codes, only canonical codes if coder is canonical"""
+    num_kmers = coder.num_states ** coder.k
+    if num_kmers > _MAX_DENSE:
+        raise ValueError(f"too many possible k-mers ({num_kmers}) for dense counts")
+    codes = numpy.arange(num_kmers, dtype=uint64)
+    return numpy.unique(coder.canonical(codes))
+
+
+def _make_counts_array(counts, motifs, k, row_indices=None):
+    """returns MotifCountsArray of counts, which can have no motifs or only
+    zero counts (e.g. sequences shorter than k)"""
+    if counts.any():
+        return MotifCountsArray(counts, motifs, row_indices=row_indices)
+
+    # the MotifCountsArray constructor rejects arrays without counts
+    if counts.ndim == 2:
+        template = DictArrayTemplate(row_indices, motifs)
+    else:
+        template = DictArrayTemplate(motifs)
+    result = MotifCountsArray.__new__(MotifCountsArray)
+    result.__dict__.update(template.wrap(counts).__dict__)
+    result.motifs = tuple(motifs)
+    result.motif_length = k
+    return result
+
+
+def kmer_counts_per_seq(
+    seqs,
+    k,
+    moltype,
+    names=None,
+    canonical=False,
+    dense=False,
+    parallel=False,
+    par_kw=None,
+):
+    """returns MotifCountsArray of overlapping k-mer counts per sequence
+
+    Parameters
+    ----------
+    seqs
+        dict of {name: seq}, sequences can be strings, sequence objects or
+        uint8 arrays of characters
+    k : int
+        k-mer size
+    moltype
+        MolType instance, only k-mers of characters in its alphabet are
+        counted. Gaps are removed, other characters (e.g. ambiguity codes)
+        are excluded from k-mers.
+    names
+        order of sequences, defaults to order in seqs
+    canonical : bool
+        if True, a k-mer and its reverse complement are counted as the same
+        k-mer, the one that is lexicographically first is reported
+    dense : bool
+        if True, all possible k-mers are included, otherwise only observed
+        k-mers are included
+    parallel : bool
+        if True, sequences are counted in separate processes
+    par_kw
+        dict of arguments for cogent3.util.parallel.imap
+
+    Notes
+    -----
+    k-mers are ordered lexicographically, with characters ordered as in
+    moltype.alphabet, e.g. TT, TC, TA, TG, CT, ... for DNA
+    """
+    names = list(names or seqs)
+    coder = _KmerCoder(k, moltype, canonical=canonical)
+    data = [seqs[n] for n in names]
+    if parallel:
+        par_kw = par_kw or {}
+        results = list(PAR.imap(coder, data, **par_kw))
+    else:
+        results = list(map(coder, data))
+
+    if dense:
+        columns = _all_codes(coder)
+    else:
+        columns = numpy.unique(
+            numpy.concatenate([numpy.empty(0, dtype=uint64)] + [c for c, _ in results])
+        )
+
+    counts = numpy.zeros((len(names), len(columns)), dtype=int64)
+    for i, (codes, num) in enumerate(results):
+        counts[i, numpy.searchsorted(columns, codes)] = num
+
+    motifs = codes_to_motifs(columns, k, moltype.alphabet)
+    return _make_counts_array(counts, motifs, k, row_indices=names)
+
+
+def kmer_counts(seq, k, moltype, canonical=False, dense=False):
+    """returns MotifCountsArray of overlapping k-mer counts in seq
+
+    Parameters
+    ----------
+    seq
+        string, sequence object or uint8 array of characters
+    k : int
+        k-mer size
+    moltype
+        MolType instance, only k-mers of characters in its alphabet are
+        counted. Gaps are removed, other characters (e.g. ambiguity codes)
+        are excluded from k-mers.
+    canonical : bool
+        if True, a k-mer and its reverse complement are counted as the same
+        k-mer, the one that is lexicographically first is reported
+    dense : bool
+        if True, all possible k-mers are included, otherwise only observed
+        k-mers are included. If no k-mers are observed, the result has no
+        motifs, or all zero counts if dense.
+    """
+    coder = _KmerCoder(k, moltype, canonical=canonical)
+    codes, num = coder(seq)
+    if dense:
+        columns = _all_codes(coder)
+        counts = numpy.zeros(len(columns), dtype=int64)
+        counts[numpy.searchsorted(columns, codes)] = num
+    else:
+        columns, counts = codes, num
+    motifs = codes_to_motifs(columns, k, moltype.alphabet)
+    return _make_counts_array(counts, motifs, k)
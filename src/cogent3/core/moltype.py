@@ -71,6 +71,7 @@ from cogent3.core.sequence import (
     ArraySequence,
     ByteSequence,
     DnaSequence,
+    LightSequence,
     NucleicAcidSequence,
     ProteinSequence,
     ProteinWithStopSequence,
@@ -305,6 +306,33 @@ PROTEIN_WITH_STOP_ambiguities = {
 }
 
 
+def _seq_as_bytes(seq):
+    """returns the characters of a string or Sequence as bytes, None if seq is
+    another type or has characters outside latin-1"""
+    seq = getattr(seq, "_seq", seq)
+    if not isinstance(seq, str):
+        return None
+    try:
+        return seq.encode("latin-1")
+    except UnicodeEncodeError:
+        return None
+
+
+def _byte_mask(chars):
+    """returns bool array of length 256, True for the single byte chars"""
+    mask = zeros(256, dtype=bool)
+    for char in chars:
+        if isinstance(char, str) and len(char) == 1 and ord(char) < 256:
+            mask[ord(char)] = True
+    return mask
+
+
+def _first_true(mask):
+    """returns index of the first True element of mask, or None"""
+    index = mask.argmax() if len(mask) else 0
+    return int(index) if len(mask) and mask[index] else None
+
+
 class FoundMatch(Exception):
     """Raised when a match is found in a deep loop to skip many levels"""
 
@@ -691,6 +719,7 @@ class MolType(object):
         self.strip_bad = FunctionWrapper(KeepChars("".join(self.All)))
         to_keep = set(self.alphabet) ^ set(self.degenerates) - set(self.gaps)
         self.strip_bad_and_gaps = FunctionWrapper(KeepChars("".join(to_keep)))
+        self._make_byte_tables(strict_gap + "".join(self.alphabet))
 
         # make inverse degenerates from degenerates
         # ensure that lowercase versions also exist if appropriate
@@ -785,6 +814,25 @@ class MolType(object):
             alphabet = self.alphabet
         return self._make_array_seq(seq, alphabet=alphabet, name=name, **kwargs)
 
+    def make_light_seq(self, seq, name=None, preserve_case=False):
+        """
+        creates a LightSequence, a minimal sequence that is not validated
+        and only becomes a full sequence if required
+
+        Parameters
+        ----------
+        seq
+            str, bytes or sequence object
+        name : str
+        preserve_case : bool
+            if False, characters are converted to upper case
+
+        Returns
+        -------
+        LightSequence
+        """
+        return LightSequence(seq, name=name, moltype=self, preserve_case=preserve_case)
+
     def verify_sequence(self, seq, gaps_allowed=True, wildcards_allowed=True):
         """Checks whether sequence is valid on the default alphabet.
 
@@ -894,6 +942,39 @@ class MolType(object):
                 "".join(list(self.complements.values())),
             )
 
+    def _make_byte_tables(self, strict_chars):
+        """Sets 256 element lookup tables used for operations on sequences of
+        single byte characters.
+
+        strict_chars are the characters retained by disambiguate(),
+        deletions mirror those made by self.strip_degenerate.
+        """
+        self._valid_bytes = _byte_mask(self.All)
+        self._gap_bytes = _byte_mask(self.gaps)
+        self._degen_bytes = _byte_mask(self.degenerates)
+        self._degen_gap_bytes = self._degen_bytes | _byte_mask([self.gap])
+        self._strict_bytes = _byte_mask(self.alphabet)
+        self._gap_chars = bytes(numpy.flatnonzero(self._gap_bytes).tolist())
+        keep = strict_chars.encode("utf-8")
+        self._non_strict_chars = bytes(c for c in range(256) if c not in keep)
+        self._complement_bytes = None
+        if self.complements:
+            table = bytearray(range(256))
+            for char, comp in self.complements.items():
+                if max(ord(char), ord(comp)) > 255:
+                    break
+                table[ord(char)] = ord(comp)
+            else:
+                self._complement_bytes = bytes(table)
+
+    def _mask_of(self, sequence, table):
+        """returns bool array from table for characters in sequence, None if
+        sequence is not a string or Sequence of single byte characters"""
+        data = _seq_as_bytes(sequence)
+        if data is None:
+            return None
+        return table.take(numpy.frombuffer(data, dtype=uint8))
+
     def complement(self, item):
         """Returns complement of item, using data from self.complements.
 
@@ -904,6 +985,9 @@ class MolType(object):
             raise TypeError(
                 "Tried to complement sequence using alphabet without complements."
             )
+        data = None if self._complement_bytes is None else _seq_as_bytes(item)
+        if data is not None:
+            return data.translate(self._complement_bytes).decode("latin-1")
         try:
             return item.translate(self.ComplementTable)
         except (AttributeError, TypeError):
@@ -916,7 +1000,10 @@ class MolType(object):
 
         Always returns same type as input.
         """
-        comp = list(self.complement(item))
+        comp = self.complement(item)
+        if isinstance(comp, str):
+            return item.__class__(comp[::-1])
+        comp = list(comp)
         comp.reverse()
         if isinstance(item, str):
             return item.__class__("".join(comp))
@@ -992,6 +1079,9 @@ class MolType(object):
 
     def first_gap(self, sequence):
         """Returns the index of the first gap in the sequence, or None."""
+        mask = self._mask_of(sequence, self._gap_bytes)
+        if mask is not None:
+            return _first_true(mask)
         gap = self.gaps
         for i, s in enumerate(sequence):
             if s in gap:
@@ -1000,6 +1090,9 @@ class MolType(object):
 
     def first_degenerate(self, sequence):
         """Returns the index of first degenerate symbol in sequence, or None."""
+        mask = self._mask_of(sequence, self._degen_bytes)
+        if mask is not None:
+            return _first_true(mask)
         degen = self.degenerates
         for i, s in enumerate(sequence):
             if s in degen:
@@ -1008,6 +1101,9 @@ class MolType(object):
 
     def first_invalid(self, sequence):
         """Returns the index of first invalid symbol in sequence, or None."""
+        mask = self._mask_of(sequence, ~self._valid_bytes)
+        if mask is not None:
+            return _first_true(mask)
         all = self.All
         for i, s in enumerate(sequence):
             if s not in all:
@@ -1016,6 +1112,9 @@ class MolType(object):
 
     def first_non_strict(self, sequence):
         """Returns the index of first non-strict symbol in sequence, or None."""
+        mask = self._mask_of(sequence, ~self._strict_bytes)
+        if mask is not None:
+            return _first_true(mask)
         monomers = self.alphabet
         for i, s in enumerate(sequence):
             if s not in monomers:
@@ -1030,6 +1129,10 @@ class MolType(object):
         frequencies).
         """
         if method == "strip":
+            data = _seq_as_bytes(sequence)
+            if data is not None:
+                data = data.translate(None, self._non_strict_chars)
+                return sequence.__class__(data.decode("latin-1"))
             try:
                 return sequence.__class__(self.strip_degenerate(sequence))
             except:
@@ -1042,6 +1145,13 @@ class MolType(object):
 
         elif method == "random":
             degen = self.degenerates
+            mask = self._mask_of(sequence, self._degen_bytes)
+            if mask is not None and isinstance(sequence, str):
+                result = list(sequence)
+                for i in numpy.flatnonzero(mask):
+                    result[i] = choice(degen[result[i]])
+                return sequence.__class__("".join(result))
+
             result = []
             for i in sequence:
                 if i in degen:
@@ -1057,6 +1167,10 @@ class MolType(object):
 
     def degap(self, sequence):
         """Deletes all gap characters from sequence."""
+        data = _seq_as_bytes(sequence)
+        if data is not None:
+            data = data.translate(None, self._gap_chars)
+            return sequence.__class__(data.decode("latin-1"))
         try:
             trans = dict([(i, None) for i in map(ord, self.gaps)])
             return sequence.__class__(sequence.translate(trans))
@@ -1070,11 +1184,17 @@ class MolType(object):
 
     def gap_indices(self, sequence):
         """Returns list of indices of all gaps in the sequence, or []."""
+        mask = self._mask_of(sequence, self._gap_bytes)
+        if mask is not None:
+            return numpy.flatnonzero(mask).tolist()
         gaps = self.gaps
         return [i for i, s in enumerate(sequence) if s in gaps]
 
     def gap_vector(self, sequence):
         """Returns list of bool indicating gap or non-gap in sequence."""
+        mask = self._mask_of(sequence, self._gap_bytes)
+        if mask is not None:
+            return mask.tolist()
         return list(map(self.is_gap, sequence))
 
     def gap_maps(self, sequence):
@@ -1103,12 +1223,20 @@ class MolType(object):
 
     def count_gaps(self, sequence):
         """Counts the gaps in the specified sequence."""
+        mask = self._mask_of(sequence, self._gap_bytes)
+        if mask is not None:
+            return int(mask.sum())
         gaps = self.gaps
         gap_count = sum(1 for s in sequence if s in gaps)
         return gap_count
 
     def get_degenerate_positions(self, sequence, include_gap=True):
         """returns indices matching degenerate characters"""
+        table = self._degen_gap_bytes if include_gap else self._degen_bytes
+        mask = self._mask_of(sequence, table)
+        if mask is not None:
+            return numpy.flatnonzero(mask).tolist()
+
         degen = list(self.degenerates)
         if include_gap:
             degen.append(self.gap)
@@ -1118,6 +1246,9 @@ class MolType(object):
 
     def count_degenerate(self, sequence):
         """Counts the degenerate bases in the specified sequence."""
+        mask = self._mask_of(sequence, self._degen_bytes)
+        if mask is not None:
+            return int(mask.sum())
         degen = self.degenerates
         degen_count = 0
         for s in sequence:
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+"""Searching sequences for IUPAC motifs on both strands.
+
+A MotifSearch compiles a set of patterns once and can then scan single
+sequences or whole collections. Each pattern is compiled to a table per
+position of the sequence bytes that match it. Candidate match positions are
+found from the most specific pattern position, then filtered by each of the
+remaining positions. Matches are returned as a MotifHits instance, which
+stores them in a compact structured array.
+"""
+from functools import lru_cache
+
+import numpy
+
+from numpy import int8, int32, int64, uint8
+
+from cogent3.util import parallel as PAR
+from cogent3.util.table import Table
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+HIT_DTYPE = numpy.dtype(
+    [
+        ("seq", int64),
+        ("start", int64),
+        ("end", int64),
+        ("strand", int8),
+        ("pattern", int32),
+    ]
+)
+
+
+@lru_cache(maxsize=1024)
+def _compile(pattern, moltype):
+    """returns [(position, matching bytes, 256 element bool array of matching
+    bytes), ...] ordered from the most to the least specific pattern position
+
+    Ambiguities are expanded as in MolType.to_regex.
+    """
+    from cogent3.core.moltype import get_moltype
+
+    moltype = get_moltype(moltype)
+    if not moltype.is_valid(pattern):
+        raise ValueError(f"'{pattern}' is invalid for this moltype")
+
+    degen = set(moltype.get_degenerate_positions(sequence=pattern, include_gap=False))
+    tables = []
+    for i, char in enumerate(pattern):
+        chars = moltype.ambiguities[char] if i in degen else char
+        allowed = numpy.array(sorted({ord(c) for c in chars}), dtype=uint8)
+        table = numpy.zeros(256, dtype=bool)
+        table[allowed] = True
+        tables.append((i, allowed, table))
+    tables.sort(key=lambda x: len(x[1]))
+    return tables
+
+
+def _matches(values, allowed, table):
+    """returns bool array, True where values are in allowed"""
+    if len(allowed) > 2:
+        return table[values]
+
+    # comparisons are much faster than a table lookup
+    result = values == allowed[0]
+    for value in allowed[1:]:
+        result |= values == value
+    return result
+
+
+class _ChunkScanner:
+    """callable returning hits to compiled patterns in a sequence chunk"""
+
+    def __init__(self, compiled):
+        # compiled is [(pattern index, strand, pattern length, tables), ...]
+        self.compiled = compiled
+
+    def __call__(self, chunk):
+        seq_index, offset, owned, data = chunk
+        data = numpy.frombuffer(data.encode("latin-1"), dtype=uint8)
+        hits = []
+        for pattern_index, strand, length, tables in self.compiled:
+            # matches starting in the overlap belong to the next chunk
+            num_starts = min(len(data) - length + 1, owned)
+            if num_starts <= 0:
+                continue
+
+            # the two most specific positions are checked at every start,
+            # remaining positions only at starts that match so far
+            starts = numpy.ones(num_starts, dtype=bool)
+            for pos, allowed, table in tables[:2]:
+                starts &= _matches(data[pos : pos + num_starts], allowed, table)
+            starts = starts.nonzero()[0]
+            for pos, allowed, table in tables[2:]:
+                if not len(starts):
+                    break
+                starts = starts[_matches(data.take(starts + pos), allowed, table)]
+
+            found = numpy.empty(len(starts), dtype=HIT_DTYPE)
+            found["seq"] = seq_index
+            found["start"] = starts + offset
+            found["end"] = starts + offset + length
+            found["strand"] = strand
+            found["pattern"] = pattern_index
+            hits.append(found)
+        return numpy.concatenate(hits) if hits else numpy.empty(0, dtype=HIT_DTYPE)
+
+
+def _chunks(seqs, chunk_size, overlap):
+    """yields (seq index, offset, owned length, sequence chunk)
+
+    Consecutive chunks overlap so that matches spanning a boundary are
+    found. Only matches starting within the owned length are reported.
+    """
+    for seq_index, seq in enumerate(seqs):
+        for offset in range(0, max(len(seq), 1), chunk_size):
+            yield (
+                seq_index,
+                offset,
+                chunk_size,
+                seq[offset : offset + chunk_size + overlap],
+            )
+
+
+class MotifSearch:
+    """searches sequences for IUPAC patterns, optionally on both strands"""
+
+    def __init__(self, patterns, moltype="dna", both_strands=True):
+        """
+        Parameters
+        ----------
+        patterns
+            a series of IUPAC patterns, or a dict of {name: pattern}
+        moltype
+            moltype label or instance, used to expand ambiguity codes
+        both_strands : bool
+            if True and the moltype has complements, the reverse complement
+            of each pattern is also searched for. Hits to these are reported
+            with strand -1. Palindromic patterns are only reported on the
+            plus strand.
+        """
+        from cogent3.core.moltype import get_moltype
+
+        moltype = get_moltype(moltype)
+        if not isinstance(patterns, dict):
+            patterns = {p: p for p in patterns}
+
+        if not patterns or not all(patterns.values()):
+            raise ValueError("patterns must be non-empty")
+
+        self.names = list(patterns)
+        self.patterns = [str(p) for p in patterns.values()]
+        self.moltype = moltype
+        both_strands = both_strands and bool(moltype.complements)
+        self.both_strands = both_strands
+
+        compiled = []
+        for i, pattern in enumerate(self.patterns):
+            compiled.append((i, 1, len(pattern), _compile(pattern, moltype.label)))
+            rc = moltype.rc(pattern) if both_strands else pattern
+            if rc != pattern:
+                compiled.append((i, -1, len(rc), _compile(rc, moltype.label)))
+        self._scanner = _ChunkScanner(compiled)
+        self._max_length = max(len(p) for p in self.patterns)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(num_patterns={len(self.patterns)}, "
+            f"moltype={self.moltype.label!r}, both_strands={self.both_strands})"
+        )
+
+    def search(self, seqs, parallel=False, par_kw=None, chunk_size=1000000):
+        """returns MotifHits of all matches to the patterns
+
+        Parameters
+        ----------
+        seqs
+            a sequence, dict of {name: seq} or sequence collection. Gaps are
+            removed from aligned sequences, hit coordinates are with respect
+            to the ungapped sequences.
+        parallel : bool
+            if True, sequence chunks are searched in separate processes
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
+        chunk_size : int
+            sequences are searched in chunks of this length
+        """
+        names, data = _as_named_strings(seqs)
+        overlap = self._max_length - 1
+        chunks = list(_chunks(data, chunk_size, overlap))
+        if parallel:
+            par_kw = par_kw or {}
+            results = list(PAR.imap(self._scanner, chunks, **par_kw))
+        else:
+            results = list(map(self._scanner, chunks))
+
+        hits = numpy.concatenate([numpy.empty(0, dtype=HIT_DTYPE)] + results)
+        hits.sort(order=["seq", "start", "pattern", "strand"])
+        return MotifHits(hits, names, self.names)
+
+
+def _as_named_strings(seqs):
+    """returns names, sequence strings. Aligned sequences are degapped."""
+    if isinstance(seqs, dict):
+        return list(seqs), [str(s) for s in seqs.values()]
+
+    if hasattr(seqs, "named_seqs"):
+        from cogent3.core.alignment import AlignmentI
+
+        if isinstance(seqs, AlignmentI):
+            seqs = seqs.degap()
+        data = seqs.to_dict()
+        return list(seqs.names), [data[n] for n in seqs.names]
+
+    return [getattr(seqs, "name", None)], [str(seqs)]
+
+
+class MotifHits:
+    """matches to patterns, stored as a structured numpy array with fields
+    seq, start, end, strand and pattern. seq and pattern are indices into
+    seq_names and pattern_names respectively."""
+
+    def __init__(self, hits, seq_names, pattern_names):
+        self.hits = hits
+        self.seq_names = list(seq_names)
+        self.pattern_names = list(pattern_names)
+
+    def __len__(self):
+        return len(self.hits)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(num_hits={len(self)}, "
+            f"num_seqs={len(self.seq_names)}, "
+            f"num_patterns={len(self.pattern_names)})"
+        )
+
+    def counts(self):
+        """returns array of the number of hits, [seq, pattern]"""
+        counts = numpy.zeros((len(self.seq_names), len(self.pattern_names)), int64)
+        numpy.add.at(counts, (self.hits["seq"], self.hits["pattern"]), 1)
+        return counts
+
+    def to_table(self):
+        """returns Table with a row per hit"""
+        header = ["seq", "start", "end", "strand", "pattern"]
+        seq_names = numpy.array(self.seq_names, dtype=object)
+        pattern_names = numpy.array(self.pattern_names, dtype=object)
+        columns = [
+            seq_names.take(self.hits["seq"]).tolist(),
+            self.hits["start"].tolist(),
+            self.hits["end"].tolist(),
+            self.hits["strand"].tolist(),
+            pattern_names.take(self.hits["pattern"]).tolist(),
+        ]
+        return Table(header=header, data=list(zip(*columns)))
+
+    def annotate(self, seqs, annot_type="motif"):
+        """adds a feature for each hit to the sequences
+
+        Parameters
+        ----------
+        seqs
+            the sequence or collection that was searched. For alignments,
+            features are added to the ungapped sequences. As ArrayAlignment
+            does not support annotations, these are ungapped copies of its
+            sequences.
+        annot_type : str
+            type of the features, the pattern name is the feature name
+
+        Returns
+        -------
+        list of the features
+        """
+        from cogent3.core.alignment import ArrayAlignment
+
+        if isinstance(seqs, ArrayAlignment):
+            seqs = seqs.degap()
+
+        if hasattr(seqs, "get_seq"):
+            seq_objs = [seqs.get_seq(n) for n in self.seq_names]
+        else:
+            seq_objs = [seqs]
+
+        features = []
+        for seq, start, end, strand, pattern in self.hits.tolist():
+            span = (start, end) if strand == 1 else (end, start)
+            features.append(
+                seq_objs[seq].add_feature(
+                    annot_type, self.pattern_names[pattern], [span]
+                )
+            )
+        return features
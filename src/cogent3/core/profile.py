@@ -4,6 +4,7 @@ from numpy import array, digitize
 from numpy.random import random
 
 from cogent3.maths.util import safe_log, safe_p_log_p, validate_freqs_array
+from cogent3.util import parallel as PAR
 from cogent3.util.dict_array import DictArray, DictArrayTemplate
 from cogent3.util.misc import extend_docstring_from
 
@@ -465,7 +466,6 @@ class PSSM(_MotifNumberArray):
             super(PSSM, self).__init__(
                 pssm, motifs, row_indices=row_indices, dtype=float
             )
-            self._indices = numpy.arange(self.shape[0])  # used for scoring
             return
 
         if not (data.min() < 0 < data.max()):
@@ -473,22 +473,12 @@ class PSSM(_MotifNumberArray):
 
         # we dealing with pssm data
         super(PSSM, self).__init__(data, motifs, row_indices=row_indices, dtype=float)
-        self._indices = numpy.arange(self.shape[0])  # used for scoring
 
     def get_indexed_seq(self, seq):
         """converts seq to numpy array of int
         characters in seq not present in motifs are assigned out-of-range index
         """
-        get_index = {c: i for i, c in enumerate(self.motifs)}.get
-        num_motifs = len(self.motifs)
-        if self.motif_length == 1:
-            indexed = [get_index(c, num_motifs) for c in seq]
-        else:
-            indexed = []
-            for i in range(0, self.shape[0] - self.motif_length + 1, self.motif_length):
-                indexed.append(get_index(seq[i : i + self.motif_length], num_motifs))
-        indexed = numpy.array(indexed)
-        return indexed
+        return _seq_to_indices(seq, self.motifs)
 
     def score_seq(self, seq):
         """return score for a sequence"""
@@ -497,21 +487,213 @@ class PSSM(_MotifNumberArray):
 
     def score_indexed_seq(self, indexed):
         """return score for a sequence already converted to integer indices"""
-        if len(indexed) < self.shape[1]:
-            msg = f"sequence length {len(indexed)} shorter than PSSM {self.shape[1]}"
+        if len(indexed) < self.shape[0]:
+            msg = f"sequence length {len(indexed)} shorter than PSSM {self.shape[0]}"
             raise ValueError(msg)
-        indexed = numpy.array(indexed)
-        num_motifs = len(self.motifs)
+        return self.score_indexed_seqs(numpy.array(indexed)).tolist()
+
+    def score_indexed_seqs(self, indexed):
+        """returns array of scores for every window of indexed sequences
+
+        Parameters
+        ----------
+        indexed
+            array of motif indices, positions are the last axis. Indices not
+            less than the number of motifs contribute 0 to a score.
+        """
+        return _window_scores(self._padded_array(), indexed)
+
+    def _padded_array(self):
+        """pssm with an extra column of 0 for out-of-range motif indices"""
+        if getattr(self, "_padded", None) is None:
+            self._padded = numpy.hstack([self.array, numpy.zeros((self.shape[0], 1))])
+        return self._padded
+
+
+def _seq_to_motif_indices(seq, motifs):
+    """returns array of indices of single character motifs in seq, characters
+    not in motifs are assigned len(motifs). None if seq has characters > 255.
+    """
+    try:
+        data = numpy.frombuffer(str(seq).encode("latin-1"), dtype=numpy.uint8)
+    except UnicodeEncodeError:
+        return None
+
+    lookup = numpy.full(256, len(motifs), dtype=int)
+    for i, motif in enumerate(motifs):
+        if ord(motif) < 256:
+            lookup[ord(motif)] = i
+    return lookup.take(data)
+
+
+def _seq_to_indices(seq, motifs):
+    """returns array of indices of consecutive, non-overlapping motifs in seq,
+    motifs not in motifs are assigned len(motifs)"""
+    motif_length = len(motifs[0])
+    if motif_length == 1:
+        indexed = _seq_to_motif_indices(seq, motifs)
+        if indexed is not None:
+            return indexed
+
+    get_index = {c: i for i, c in enumerate(motifs)}.get
+    num_motifs = len(motifs)
+    if motif_length == 1:
+        indexed = [get_index(c, num_motifs) for c in seq]
+    else:
+        indexed = []
+        for i in range(0, len(seq) - motif_length + 1, motif_length):
+            indexed.append(get_index(seq[i : i + motif_length], num_motifs))
+    return numpy.array(indexed, dtype=int)
+
+
+def _window_scores(padded, indexed):
+    """returns scores of every window along the last axis of indexed
+
+    Parameters
+    ----------
+    padded
+        [position, motif] pssm array with a final column of zeros
+    indexed
+        array of motif indices, values >= padded.shape[1] - 1 score 0
+    """
+    indexed = numpy.minimum(indexed, padded.shape[1] - 1)
+    width = padded.shape[0]
+    num_windows = max(indexed.shape[-1] - width + 1, 0)
+    scores = numpy.zeros(indexed.shape[:-1] + (num_windows,))
+    # each pssm position scores a shifted view of the sequences
+    for pos in range(width):
+        scores += padded[pos].take(indexed[..., pos : pos + num_windows])
+    return scores
+
+
+PSSM_HIT_DTYPE = numpy.dtype(
+    [
+        ("pssm", numpy.int32),
+        ("seq", numpy.int64),
+        ("start", numpy.int64),
+        ("score", float),
+    ]
+)
+
+
+class _PssmScanner:
+    """callable returning hits to PSSMs in a sequence"""
+
+    def __init__(self, pssms, threshold=None, top_k=None, chunk_size=100000):
+        # only arrays are kept, so instances are cheap to send to workers
+        self.motifs = [tuple(p.motifs) for p in pssms]
+        self.motif_lengths = [p.motif_length for p in pssms]
+        self.padded = [p._padded_array() for p in pssms]
+        self.threshold = threshold
+        self.top_k = top_k
+        self.chunk_size = chunk_size
+
+    def _scan(self, padded, indexed):
+        """returns starts and scores of hits to one pssm"""
+        width = padded.shape[0]
+        starts = []
         scores = []
+        for begin in range(0, max(len(indexed) - width + 1, 0), self.chunk_size):
+            chunk = indexed[begin : begin + self.chunk_size + width - 1]
+            chunk_scores = _window_scores(padded, chunk)
+            chunk_starts = numpy.arange(len(chunk_scores)) + begin
+            if self.threshold is not None:
+                keep = chunk_scores >= self.threshold
+                chunk_starts = chunk_starts[keep]
+                chunk_scores = chunk_scores[keep]
+            starts.append(chunk_starts)
+            scores.append(chunk_scores)
+            if self.top_k is not None:
+                starts, scores = _top_k(starts, scores, self.top_k)
+
+        if not starts:
+            return numpy.empty(0, dtype=int), numpy.empty(0)
+        return numpy.concatenate(starts), numpy.concatenate(scores)
+
+    def __call__(self, item):
+        seq_index, seq = item
+        indexed = {}
+        hits = []
+        for pssm_index, (motifs, padded) in enumerate(zip(self.motifs, self.padded)):
+            if motifs not in indexed:
+                indexed[motifs] = _seq_to_indices(seq, motifs)
+            starts, scores = self._scan(padded, indexed[motifs])
+            found = numpy.empty(len(starts), dtype=PSSM_HIT_DTYPE)
+            found["pssm"] = pssm_index
+            found["seq"] = seq_index
+            # windows are indexed by motif, starts are sequence positions
+            found["start"] = starts * self.motif_lengths[pssm_index]
+            found["score"] = scores
+            hits.append(found)
+        return numpy.concatenate(hits)
+
+
+def _top_k(starts, scores, k):
+    """returns [starts], [scores] of the k highest scores"""
+    starts = numpy.concatenate(starts)
+    scores = numpy.concatenate(scores)
+    if len(scores) > k:
+        keep = numpy.argpartition(-scores, k - 1)[:k]
+        keep.sort()
+        starts = starts[keep]
+        scores = scores[keep]
+    return [starts], [scores]
+
+
+def scan_pssms(
+    pssms,
+    seqs,
+    threshold=None,
+    top_k=None,
+    chunk_size=100000,
+    parallel=False,
+    par_kw=None,
+):
+    """scores windows of many sequences with many PSSMs
 
-        for i in range(0, indexed.shape[0] - self.shape[0] + 1):
-            segment = indexed[i : i + self.shape[0]]
-            un_ambig = segment < num_motifs
-            if not un_ambig.all():
-                pssm = self.array[un_ambig, :]
-                segment = segment[un_ambig]
-            else:
-                pssm = self.array
-            score = pssm[self._indices[: pssm.shape[0]], segment].sum()
-            scores.append(score)
-        return scores
+    Parameters
+    ----------
+    pssms
+        a PSSM or series of PSSM instances
+    seqs
+        series of strings or sequence objects. Characters not in a PSSM's
+        motifs (e.g. gaps, ambiguity codes) contribute 0 to a score.
+    threshold
+        only windows with a score >= threshold are returned
+    top_k : int
+        only the top_k highest scoring windows for each PSSM and sequence
+        are returned
+    chunk_size : int
+        number of windows scored at once. With threshold or top_k, only
+        scores for this many windows are held in memory per sequence.
+    parallel : bool
+        if True, sequences are scored in separate processes
+    par_kw
+        dict of arguments for cogent3.util.parallel.imap
+
+    Returns
+    -------
+    numpy structured array with fields pssm, seq (indices into pssms and
+    seqs), start and score, ordered by pssm, seq and start. If threshold and
+    top_k are both None, every window is included. For PSSMs of multiple
+    character motifs, windows begin at multiples of the motif length, as for
+    PSSM.score_seq, and start is the position in the sequence.
+    """
+    if isinstance(pssms, PSSM):
+        pssms = [pssms]
+    if top_k is not None and top_k < 1:
+        raise ValueError(f"top_k={top_k} must be >= 1")
+
+    scanner = _PssmScanner(
+        pssms, threshold=threshold, top_k=top_k, chunk_size=chunk_size
+    )
+    items = [(i, str(seq)) for i, seq in enumerate(seqs)]
+    if parallel:
+        par_kw = par_kw or {}
+        results = list(PAR.imap(scanner, items, **par_kw))
+    else:
+        results = list(map(scanner, items))
+
+    hits = numpy.concatenate([numpy.empty(0, dtype=PSSM_HIT_DTYPE)] + results)
+    hits.sort(order=["pssm", "seq", "start"])
+    return hits
@@ -39,6 +39,15 @@ from cogent3.core.alphabet import AlphabetError
 from cogent3.core.genetic_code import DEFAULT as DEFAULT_GENETIC_CODE
 from cogent3.core.genetic_code import GeneticCodes
 from cogent3.core.info import Info as InfoClass
+from cogent3.core.kmer import kmer_counts
+from cogent3.core.motif_search import MotifSearch
+from cogent3.core.window_stats import (
+    window_counts,
+    window_entropy,
+    window_gc,
+    window_skew,
+    window_strand_symmetry,
+)
 from cogent3.format.fasta import alignment_to_fasta
 from cogent3.maths.stats.contingency import CategoryCounts, TestResult
 from cogent3.maths.stats.number import CategoryCounter
@@ -228,6 +237,152 @@ class SequenceI(object):
 
         return counts
 
+    def kmer_counts(self, k, canonical=False, dense=False):
+        """returns MotifCountsArray of counts of overlapping k-mers
+
+        Parameters
+        ----------
+        k : int
+            k-mer size. Gaps are removed, k-mers containing characters not in
+            the moltype alphabet (e.g. ambiguity codes) are excluded.
+        canonical : bool
+            if True, a k-mer and its reverse complement are counted as the
+            same k-mer, the one that is lexicographically first (with
+            characters in alphabet order) is reported
+        dense : bool
+            if True, all possible k-mers are included, otherwise only
+            observed k-mers are included
+        """
+        return kmer_counts(str(self), k, self.moltype, canonical=canonical, dense=dense)
+
+    def find_motifs(
+        self,
+        patterns,
+        both_strands=True,
+        parallel=False,
+        par_kw=None,
+        chunk_size=1000000,
+    ):
+        """returns all, including overlapping, matches to IUPAC patterns
+
+        Parameters
+        ----------
+        patterns
+            a series of IUPAC patterns, or a dict of {name: pattern}
+        both_strands : bool
+            if True, the reverse complement of patterns are also searched for
+            on nucleic acid sequences
+        parallel : bool
+            if True, chunks of sequence are searched in separate processes
+        par_kw
+            dict of arguments for cogent3.util.parallel.imap
+        chunk_size : int
+            sequence is searched in chunks of this length
+
+        Returns
+        -------
+        MotifHits, use its annotate() method to add the hits as features
+        """
+        search = MotifSearch(patterns, moltype=self.moltype, both_strands=both_strands)
+        return search.search(
+            self, parallel=parallel, par_kw=par_kw, chunk_size=chunk_size
+        )
+
+    def window_counts(self, window, step, k=1, start=None, end=None, overlapping=True):
+        """returns DictArray of k-mer counts per window, [window start, k-mer]
+
+        Parameters
+        ----------
+        window
+            window length
+        step
+            interval between window starts
+        k : int
+            k-mer size. Only k-mers lying completely within a window, and not
+            containing gaps or ambiguity codes, are counted.
+        start, end
+            first and last window start positions, as for sliding_windows()
+        overlapping : bool
+            if False, only non-overlapping k-mers from the window start are
+            counted, as for counts()
+
+        Notes
+        -----
+        Counts are derived from cumulative sums, no window sequences are
+        created.
+        """
+        return window_counts(
+            self, window, step, k=k, start=start, end=end, overlapping=overlapping,
+        )
+
+    def window_gc(self, window, step, start=None, end=None):
+        """returns WindowValues of the GC fraction of canonical bases per window
+
+        Parameters
+        ----------
+        window
+            window length
+        step
+            interval between window starts
+        start, end
+            first and last window start positions, as for sliding_windows()
+        """
+        return window_gc(self, window, step, start=start, end=end)
+
+    def window_skew(self, window, step, motifs=("G", "C"), start=None, end=None):
+        """returns WindowValues of (a - b) / (a + b) per window
+
+        Parameters
+        ----------
+        window
+            window length
+        step
+            interval between window starts
+        motifs
+            the pair of bases, (a, b). Defaults to GC skew.
+        start, end
+            first and last window start positions, as for sliding_windows()
+        """
+        return window_skew(self, window, step, motifs=motifs, start=start, end=end)
+
+    def window_entropy(self, window, step, k=1, start=None, end=None):
+        """returns WindowValues of the Shannon entropy (bits) of k-mer
+        frequencies per window
+
+        Parameters
+        ----------
+        window
+            window length
+        step
+            interval between window starts
+        k : int
+            k-mer size, overlapping k-mers are counted
+        start, end
+            first and last window start positions, as for sliding_windows()
+        """
+        return window_entropy(self, window, step, k=k, start=start, end=end)
+
+    def window_strand_symmetry(
+        self, window, step, motif_length=1, start=None, end=None
+    ):
+        """returns WindowValues of the strand_symmetry() G statistic per window,
+        p-values are in the pvalues attribute
+
+        Parameters
+        ----------
+        window
+            window length
+        step
+            interval between window starts
+        motif_length
+            length of the non-overlapping motifs counted
+        start, end
+            first and last window start positions, as for sliding_windows()
+        """
+        return window_strand_symmetry(
+            self, window, step, motif_length=motif_length, start=start, end=end
+        )
+
     def __lt__(self, other):
         """compares based on the sequence string."""
         return self._seq < str(other)
@@ -681,6 +836,8 @@ class Sequence(_Annotatable, SequenceI):
         orig_seq = seq
         if isinstance(seq, Sequence):
             seq = seq._seq
+        elif isinstance(seq, LightSequence):
+            seq = orig_seq = str(seq)
         elif isinstance(seq, ArraySequence):
             seq = str(seq)
         elif isinstance(seq, bytes):
@@ -1322,6 +1479,152 @@ class ByteSequence(Sequence):
         )
 
 
+@total_ordering
+class LightSequence(object):
+    """Minimal sequence, for bulk handling of many sequences.
+
+    Holds only the name, moltype and sequence characters as bytes. Sequence
+    characters are not validated. Attributes that are not defined here, e.g.
+    annotations or rc(), are obtained from the corresponding Sequence object
+    which is created on first use (see to_sequence()). A SequenceCollection
+    stores LightSequence elements as is.
+    """
+
+    __slots__ = ("name", "moltype", "_data", "_promoted")
+
+    def __init__(self, seq, name=None, moltype=None, preserve_case=False):
+        """
+        Parameters
+        ----------
+        seq
+            str, bytes or sequence object. All characters must be < 256.
+        name
+            sequence name, defaults to seq.name if present
+        moltype
+            MolType instance or label, defaults to 'text'
+        preserve_case : bool
+            if False, characters are converted to upper case
+        """
+        if moltype is None or isinstance(moltype, str):
+            from cogent3.core.moltype import get_moltype
+
+            moltype = get_moltype(moltype or "text")
+
+        if isinstance(seq, LightSequence):
+            name = seq.name if name is None else name
+            data = seq._data
+        else:
+            if name is None:
+                name = getattr(seq, "name", None)
+            data = seq if isinstance(seq, bytes) else str(seq).encode("latin-1")
+
+        if not preserve_case and not data.isupper():
+            data = data.upper()
+
+        self.name = name
+        self.moltype = moltype
+        self._data = data
+        self._promoted = None
+
+    def __getattr__(self, attr):
+        # only called for attributes not defined on this class
+        if attr.startswith("__") or attr in LightSequence.__slots__:
+            raise AttributeError(attr)
+        return getattr(self.to_sequence(), attr)
+
+    def __setattr__(self, attr, value):
+        # as for getting, other attributes are set on the Sequence
+        if attr in LightSequence.__slots__:
+            object.__setattr__(self, attr, value)
+        else:
+            setattr(self.to_sequence(), attr, value)
+
+    def __getstate__(self):
+        from cogent3.core.moltype import moltypes
+
+        moltype = self.moltype
+        if moltypes.get(moltype.label) is moltype:
+            moltype = moltype.label
+        return self.name, moltype, self._data, self._promoted
+
+    def __setstate__(self, state):
+        from cogent3.core.moltype import get_moltype
+
+        name, moltype, self._data, self._promoted = state
+        self.name = name
+        self.moltype = get_moltype(moltype)
+
+    def to_sequence(self):
+        """returns the corresponding Sequence, created on the first call"""
+        if self._promoted is None:
+            self._promoted = self.moltype.make_seq(str(self), name=self.name)
+        self._promoted.name = self.name
+        return self._promoted
+
+    def to_array(self):
+        """returns sequence characters as a uint8 array"""
+        from numpy import frombuffer, uint8
+
+        return frombuffer(self._data, dtype=uint8)
+
+    def to_fasta(self, block_size=60):
+        """returns string of self in FASTA format, no trailing newline"""
+        label = self.name or "0"
+        return alignment_to_fasta({label: str(self)}, block_size=block_size)
+
+    def kmer_counts(self, k, canonical=False, dense=False):
+        """returns MotifCountsArray of counts of overlapping k-mers, see
+        Sequence.kmer_counts()"""
+        return kmer_counts(
+            self.to_array(), k, self.moltype, canonical=canonical, dense=dense
+        )
+
+    def copy(self):
+        """returns a copy of self, the data are shared"""
+        return self.__class__(self, moltype=self.moltype, preserve_case=True)
+
+    def __str__(self):
+        return self._data.decode("latin-1")
+
+    def __bytes__(self):
+        return self._data
+
+    def __repr__(self):
+        seq = str(self)
+        if len(seq) > 10:
+            seq = f"{seq[:7]}... {len(seq)}"
+        return f"{self.__class__.__name__}({seq})"
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __getitem__(self, index):
+        """returns a LightSequence for an int or slice index"""
+        if isinstance(index, slice):
+            data = self._data[index]
+        else:
+            data = bytes([self._data[index]])
+        return self.__class__(data, self.name, moltype=self.moltype, preserve_case=True)
+
+    def __contains__(self, other):
+        return str(other).encode("latin-1") in self._data
+
+    def __lt__(self, other):
+        return str(self) < str(other)
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __ne__(self, other):
+        return str(self) != str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+
 @total_ordering
 class ArraySequenceBase(object):
     """Holds the information for a non-degenerate sequence. Mutable.
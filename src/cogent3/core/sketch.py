@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""MinHash sketches of sequence k-mer content for rapid similarity searches.
+
+A MinHashIndex is built once from a sequence collection and can then be
+queried many times. Candidates are found via locality sensitive hashing of
+bands of the sketch, so a query only examines sequences that share at least
+one band with the target.
+"""
+import numpy
+
+from numpy import uint8, uint64
+
+from cogent3.core.kmer import _char_to_index, kmer_codes
+from cogent3.core.sequence import frac_same
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+_MAX_HASH = numpy.iinfo(uint64).max
+
+
+class MinHashIndex:
+    """MinHash sketches of the k-mers of sequences in a collection
+
+    Notes
+    -----
+    The fraction of sketch elements two sequences share estimates the Jaccard
+    similarity of their k-mer sets. Sketches are split into num_bands bands
+    and sequences whose band values are identical are candidates, so
+    sequences with Jaccard similarity above ~(1/num_bands)**(1/rows) (where
+    rows = num_hashes / num_bands) are very likely to be returned.
+    """
+
+    def __init__(self, seqs, k=8, num_hashes=64, num_bands=16, seed=0):
+        """
+        Parameters
+        ----------
+        seqs
+            a sequence collection or alignment, gaps are ignored
+        k : int
+            k-mer size. Characters not in the moltype alphabet, e.g.
+            ambiguity codes, are excluded from k-mers.
+        num_hashes : int
+            number of hash functions, the size of each sketch
+        num_bands : int
+            number of bands used to identify candidates. Must divide
+            num_hashes.
+        seed : int
+            seed for generating the hash functions
+        """
+        if num_hashes % num_bands:
+            raise ValueError(f"num_bands={num_bands} must divide {num_hashes}")
+
+        alphabet = seqs.moltype.alphabet
+        if len(alphabet) ** k >= 2 ** 64:
+            raise ValueError(f"k={k} too large for alphabet of {len(alphabet)}")
+
+        self._seqs = seqs
+        self.names = list(seqs.names)
+        self.k = k
+        self.num_hashes = num_hashes
+        self.num_bands = num_bands
+        self._num_states = len(alphabet)
+        self._lookup = _char_to_index(alphabet, gaps="".join(seqs.moltype.gaps))
+        rng = numpy.random.RandomState(seed)
+        # multiply-shift hashing requires odd multipliers
+        self._mult = rng.randint(1, 2 ** 62, size=num_hashes).astype(uint64) * 2 + 1
+        self._add = rng.randint(0, 2 ** 62, size=num_hashes).astype(uint64)
+
+        data = seqs.to_dict()
+        self.signatures = numpy.array(
+            [self.signature(data[n]) for n in self.names], dtype=uint64
+        )
+        self._empty = (self.signatures == _MAX_HASH).all(axis=1)
+        rows = num_hashes // num_bands
+        self._bands = []
+        for b in range(num_bands):
+            band = self.signatures[:, b * rows : (b + 1) * rows]
+            table = {}
+            for i in numpy.nonzero(~self._empty)[0]:
+                table.setdefault(band[i].tobytes(), []).append(i)
+            self._bands.append(table)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(num_seqs={len(self)}, k={self.k}, "
+            f"num_hashes={self.num_hashes}, num_bands={self.num_bands})"
+        )
+
+    def _encode(self, seq):
+        """returns alphabet indices of seq with gaps removed"""
+        seq = str(seq).encode("utf8")
+        indices = self._lookup.take(numpy.frombuffer(seq, dtype=uint8))
+        return indices[indices != self._num_states + 1]
+
+    def signature(self, seq):
+        """returns the MinHash sketch of seq
+
+        Parameters
+        ----------
+        seq
+            string or sequence object
+
+        Notes
+        -----
+        A sequence with no valid k-mers has all elements set to the maximum
+        uint64 value.
+        """
+        codes = kmer_codes(self._encode(seq), self.k, self._num_states)
+        if len(codes) == 0:
+            return numpy.full(self.num_hashes, _MAX_HASH, dtype=uint64)
+        codes = numpy.unique(codes)
+        hashed = numpy.multiply.outer(self._mult, codes) + self._add[:, None]
+        return hashed.min(axis=1)
+
+    def candidates(self, target, min_jaccard=0.0):
+        """returns [(name, estimated Jaccard similarity), ...] for sequences
+        sharing at least one band with target, ordered by decreasing similarity
+
+        Parameters
+        ----------
+        target
+            string or sequence object
+        min_jaccard : float
+            minimum estimated Jaccard similarity of k-mer sets
+        """
+        sig = self.signature(target)
+        if (sig == _MAX_HASH).all():
+            return []
+
+        rows = self.num_hashes // self.num_bands
+        found = set()
+        for b, table in enumerate(self._bands):
+            found.update(table.get(sig[b * rows : (b + 1) * rows].tobytes(), ()))
+
+        if not found:
+            return []
+
+        found = numpy.array(sorted(found))
+        similarity = (self.signatures[found] == sig).mean(axis=1)
+        order = numpy.argsort(-similarity, kind="stable")
+        return [
+            (self.names[found[i]], similarity[i])
+            for i in order
+            if similarity[i] >= min_jaccard
+        ]
+
+    def get_similar(
+        self,
+        target,
+        min_jaccard=0.0,
+        verify=False,
+        min_similarity=0.0,
+        max_similarity=1.0,
+        metric=frac_same,
+        transform=None,
+    ):
+        """Returns collection of sequences similar to target
+
+        Parameters
+        ----------
+        target
+            sequence object to compare to. Can be in the collection.
+        min_jaccard : float
+            minimum estimated Jaccard similarity of k-mer sets
+        verify : bool
+            if True, candidates are filtered by computing metric exactly, see
+            get_similar() on the collection for the meaning of the remaining
+            arguments
+        """
+        names = [n for n, _ in self.candidates(target, min_jaccard=min_jaccard)]
+        if verify and names:
+            if transform:
+                target = transform(target)
+            kept = []
+            for name in names:
+                seq = self._seqs.named_seqs[name]
+                seq = transform(seq) if transform else seq
+                if min_similarity <= metric(target, seq) <= max_similarity:
+                    kept.append(name)
+            names = kept
+
+        return self._seqs.take_seqs(names)
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+"""Statistics of sequence windows, computed without slicing the sequence.
+
+Motif counts at each position are accumulated once into cumulative sums
+evaluated only at window boundaries, the counts for every window are then
+differences of two rows. Statistics such as GC content, skew, entropy and
+strand symmetry are derived from these counts.
+"""
+import numpy
+
+from numpy import int64
+
+from cogent3.core.kmer import (
+    _MAX_DENSE,
+    _char_to_index,
+    codes_to_motifs,
+    kmer_codes_per_pos,
+)
+from cogent3.maths.stats.distribution import chi_high
+from cogent3.util.dict_array import DictArrayTemplate
+from cogent3.util.table import Table
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def window_starts(length, window, step, start=None, end=None):
+    """returns array of window start positions, as used by
+    Sequence.sliding_windows()
+
+    Parameters
+    ----------
+    length : int
+        sequence length
+    window : int
+        window length
+    step : int
+        interval between window starts
+    start
+        first window start position
+    end
+        last window start position
+    """
+    start = 0 if start is None else start
+    last = length - window + 1
+    end = last if end is None else min(last, end)
+    if start < end:
+        return numpy.arange(start, end, step, dtype=int64)
+    return numpy.empty(0, dtype=int64)
+
+
+def _motif_indices(seq, moltype):
+    """returns moltype alphabet index of each sequence position, positions
+    with other characters (gaps, ambiguities) are len(moltype.alphabet)"""
+    alphabet = list(moltype.alphabet)
+    num_states = len(alphabet)
+    data = getattr(seq, "_data", None)
+    if isinstance(data, numpy.ndarray) and list(seq.alphabet)[:num_states] == alphabet:
+        # ArraySequence indices are already in moltype alphabet order
+        return numpy.minimum(data.astype(int64), num_states)
+
+    data = str(seq).encode("latin-1")
+    return _char_to_index(alphabet).take(numpy.frombuffer(data, dtype=numpy.uint8))
+
+
+def _window_code_counts(codes, valid, num_codes, starts, width):
+    """returns counts [window, code] of the valid codes in
+    codes[start: start + width], for each start"""
+    num = len(codes)
+    result_shape = (len(starts), num_codes)
+    if width <= 0 or num == 0:
+        return numpy.zeros(result_shape, dtype=int64)
+
+    starts = numpy.minimum(starts, num)
+    ends = numpy.minimum(starts + width, num)
+    boundaries = numpy.unique(numpy.concatenate([starts, ends]))
+    # segment j is positions [boundaries[j - 1], boundaries[j])
+    lengths = numpy.diff(numpy.concatenate([[0], boundaries, [num]]))
+    segment = numpy.repeat(numpy.arange(len(lengths)), lengths)
+    keys = segment[valid] * num_codes + codes[valid].astype(int64)
+    counts = numpy.bincount(keys, minlength=len(lengths) * num_codes)
+    # row j is the counts of codes at positions < boundaries[j]
+    cumulative = counts.reshape(len(lengths), num_codes).cumsum(axis=0)
+    lo = numpy.searchsorted(boundaries, starts)
+    hi = numpy.searchsorted(boundaries, ends)
+    return cumulative[hi] - cumulative[lo]
+
+
+def _window_kmer_counts(seq, window, step, k, start, end, overlapping, moltype):
+    """returns window starts, counts [window, k-mer], k-mers"""
+    moltype = moltype or seq.moltype
+    num_states = len(moltype.alphabet)
+    num_codes = num_states ** k
+    if num_codes > _MAX_DENSE:
+        raise ValueError(f"too many possible k-mers ({num_codes})")
+
+    starts = window_starts(len(seq), window, step, start=start, end=end)
+    codes, valid = kmer_codes_per_pos(_motif_indices(seq, moltype), k, num_states)
+    # number of k-mer start positions within a window
+    width = window - k + 1
+    if overlapping or k == 1:
+        counts = _window_code_counts(codes, valid, num_codes, starts, width)
+    else:
+        # k-mers at start, start + k, ..., as Sequence.counts() for each window
+        counts = numpy.zeros((len(starts), num_codes), dtype=int64)
+        width = (width - 1) // k + 1
+        phases = starts % k
+        for phase in numpy.unique(phases):
+            selected = phases == phase
+            counts[selected] = _window_code_counts(
+                codes[phase::k],
+                valid[phase::k],
+                num_codes,
+                (starts[selected] - phase) // k,
+                width,
+            )
+
+    motifs = codes_to_motifs(numpy.arange(num_codes), k, moltype.alphabet)
+    return starts, counts, motifs
+
+
+def _check_nucleic(moltype):
+    if not moltype.complements:
+        raise TypeError("must be DNA or RNA moltype")
+
+
+def _ratio(numerator, denominator):
+    """returns numerator / denominator, nan where denominator is 0"""
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        result = numerator / denominator
+    return numpy.where(denominator == 0, numpy.nan, result)
+
+
+class WindowValues:
+    """values of a statistic for each window of a sequence"""
+
+    def __init__(self, starts, window, values, stat, seq_name=None, pvalues=None):
+        """
+        Parameters
+        ----------
+        starts
+            window start positions
+        window : int
+            window length
+        values
+            statistic value for each window, nan where undefined
+        stat : str
+            name of the statistic
+        seq_name
+            name of the sequence
+        pvalues
+            p-values for each window, if the statistic is a test statistic
+        """
+        self.starts = numpy.asarray(starts)
+        self.window = window
+        self.values = numpy.asarray(values, dtype=float)
+        self.stat = stat
+        self.seq_name = seq_name
+        self.pvalues = None if pvalues is None else numpy.asarray(pvalues)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(stat={self.stat!r}, "
+            f"window={self.window}, num_windows={len(self)})"
+        )
+
+    @property
+    def ends(self):
+        return self.starts + self.window
+
+    def to_table(self):
+        """returns Table with start, end and value columns"""
+        columns = [self.starts.tolist(), self.ends.tolist(), self.values.tolist()]
+        header = ["start", "end", self.stat]
+        if self.pvalues is not None:
+            columns.append(self.pvalues.tolist())
+            header.append("pvalue")
+        return Table(header=header, data=list(zip(*columns)), title=self.seq_name)
+
+    def to_bedgraph(self, chrom=None, digits=2, **kwargs):
+        """returns bedgraph formatted string, windows with undefined values
+        are omitted
+
+        Parameters
+        ----------
+        chrom
+            chromosome name, defaults to the sequence name
+        digits
+            adjacent windows with values equal to this precision are merged
+        kwargs
+            name, description, color and other arguments for
+            cogent3.format.bedgraph.bedgraph, defaults are derived from the
+            statistic and window size
+
+        Notes
+        -----
+        bedGraph records cannot overlap, so if windows overlap (step <
+        window) each window is represented by the interval between the
+        midpoints of it and its neighbouring windows. The first and last
+        intervals extend to the start of the first and end of the last window.
+        """
+        from cogent3.format.bedgraph import bedgraph
+
+        chrom = chrom or self.seq_name or "seq"
+        kwargs["name"] = kwargs.get("name", self.stat)
+        kwargs["description"] = kwargs.get(
+            "description", f"{self.stat} (window={self.window})"
+        )
+        kwargs["color"] = kwargs.get("color", (0, 0, 255))
+        starts, ends = self.starts, self.ends
+        if len(starts) > 1 and (numpy.diff(starts) < self.window).any():
+            mids = starts + self.window // 2
+            bounds = numpy.concatenate(
+                [starts[:1], (mids[:-1] + mids[1:]) // 2, ends[-1:]]
+            )
+            starts, ends = bounds[:-1], bounds[1:]
+
+        keep = ~numpy.isnan(self.values)
+        data = [
+            (chrom, s, e, v)
+            for s, e, v in zip(
+                starts[keep].tolist(), ends[keep].tolist(), self.values[keep].tolist()
+            )
+        ]
+        return bedgraph(data, digits=digits, **kwargs)
+
+    def draw(self, width=600, height=300):
+        """returns Drawable of values plotted at window midpoints"""
+        from cogent3.draw.drawable import Drawable
+        from cogent3.util.union_dict import UnionDict
+
+        trace = UnionDict(
+            type="scatter",
+            x=self.starts + self.window // 2,
+            y=self.values,
+            mode="lines",
+            name=self.stat,
+        )
+        draw = Drawable(
+            title=self.seq_name,
+            xtitle="Position",
+            ytitle=f"{self.stat} (window={self.window})",
+            width=width,
+            height=height,
+        )
+        draw.traces.append(trace)
+        return draw
+
+
+def window_counts(
+    seq, window, step, k=1, start=None, end=None, overlapping=True, moltype=None
+):
+    """returns DictArray of k-mer counts, [window start, k-mer]
+
+    Parameters
+    ----------
+    seq
+        Sequence or ArraySequence
+    window : int
+        window length
+    step : int
+        interval between window starts
+    k : int
+        k-mer size. Only k-mers lying completely within a window, and
+        containing only characters in the moltype alphabet, are counted.
+    start, end
+        first and last window start positions, as for sliding_windows()
+    overlapping : bool
+        if False, only k-mers at window start + multiples of k are counted,
+        as for Sequence.counts()
+    moltype
+        defaults to seq.moltype
+    """
+    starts, counts, motifs = _window_kmer_counts(
+        seq, window, step, k, start, end, overlapping, moltype
+    )
+    return DictArrayTemplate(starts.tolist(), motifs).wrap(counts)
+
+
+def window_gc(seq, window, step, start=None, end=None, moltype=None):
+    """returns WindowValues of the fraction of G + C among the canonical
+    bases of each window
+
+    Parameters
+    ----------
+    seq
+        a DNA or RNA Sequence or ArraySequence
+    window : int
+        window length
+    step : int
+        interval between window starts
+    start, end
+        first and last window start positions, as for sliding_windows()
+    moltype
+        defaults to seq.moltype
+    """
+    moltype = moltype or seq.moltype
+    _check_nucleic(moltype)
+    starts, counts, motifs = _window_kmer_counts(
+        seq, window, step, 1, start, end, True, moltype
+    )
+    gc = counts[:, motifs.index("G")] + counts[:, motifs.index("C")]
+    values = _ratio(gc, counts.sum(axis=1))
+    return WindowValues(starts, window, values, "GC", seq_name=seq.name)
+
+
+def window_skew(
+    seq, window, step, motifs=("G", "C"), start=None, end=None, moltype=None
+):
+    """returns WindowValues of the skew (a - b) / (a + b) of each window
+
+    Parameters
+    ----------
+    seq
+        a DNA or RNA Sequence or ArraySequence
+    window : int
+        window length
+    step : int
+        interval between window starts
+    motifs
+        the pair of bases, (a, b). Defaults to GC skew.
+    start, end
+        first and last window start positions, as for sliding_windows()
+    moltype
+        defaults to seq.moltype
+    """
+    moltype = moltype or seq.moltype
+    _check_nucleic(moltype)
+    a, b = motifs
+    starts, counts, all_motifs = _window_kmer_counts(
+        seq, window, step, 1, start, end, True, moltype
+    )
+    a = counts[:, all_motifs.index(a)]
+    b = counts[:, all_motifs.index(b)]
+    values = _ratio(a - b, a + b)
+    stat = f"{motifs[0]}{motifs[1]} skew"
+    return WindowValues(starts, window, values, stat, seq_name=seq.name)
+
+
+def window_entropy(seq, window, step, k=1, start=None, end=None, moltype=None):
+    """returns WindowValues of the Shannon entropy (bits) of the k-mer
+    frequencies of each window
+
+    Parameters
+    ----------
+    seq
+        Sequence or ArraySequence
+    window : int
+        window length
+    step : int
+        interval between window starts
+    k : int
+        k-mer size, overlapping k-mers are counted
+    start, end
+        first and last window start positions, as for sliding_windows()
+    moltype
+        defaults to seq.moltype
+    """
+    starts, counts, _ = _window_kmer_counts(
+        seq, window, step, k, start, end, True, moltype
+    )
+    total = counts.sum(axis=1)
+    freqs = _ratio(counts, total[:, None])
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        terms = numpy.where(counts > 0, -freqs * numpy.log2(freqs), 0)
+    values = terms.sum(axis=1)
+    values[total == 0] = numpy.nan
+    return WindowValues(starts, window, values, "entropy", seq_name=seq.name)
+
+
+def window_strand_symmetry(
+    seq, window, step, motif_length=1, start=None, end=None, moltype=None
+):
+    """returns WindowValues of the G-test statistic for strand symmetry of
+    each window, as computed by NucleicAcidSequence.strand_symmetry()
+
+    Parameters
+    ----------
+    seq
+        a DNA or RNA Sequence or ArraySequence
+    window : int
+        window length
+    step : int
+        interval between window starts
+    motif_length : int
+        non-overlapping motifs of this length are counted
+    start, end
+        first and last window start positions, as for sliding_windows()
+    moltype
+        defaults to seq.moltype
+
+    Notes
+    -----
+    The statistic and p-value are nan for windows where the test is
+    undefined, e.g. windows with no motifs on one strand.
+    """
+    moltype = moltype or seq.moltype
+    _check_nucleic(moltype)
+    starts, counts, motifs = _window_kmer_counts(
+        seq, window, step, motif_length, start, end, False, moltype
+    )
+    index = {m: i for i, m in enumerate(motifs)}
+    pairs = sorted(moltype.strand_symmetric_motifs(motif_length=motif_length))
+    plus = counts[:, [index[p] for p, _ in pairs]].astype(float)
+    minus = counts[:, [index[m] for _, m in pairs]].astype(float)
+
+    # expected counts are from the marginal totals of the pairs x strand table
+    row_sums = plus + minus
+    total = row_sums.sum(axis=1)
+    expect_plus = _ratio(row_sums * plus.sum(axis=1)[:, None], total[:, None])
+    expect_minus = _ratio(row_sums * minus.sum(axis=1)[:, None], total[:, None])
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        terms = numpy.where(plus > 0, plus * numpy.log(plus / expect_plus), 0)
+        terms += numpy.where(minus > 0, minus * numpy.log(minus / expect_minus), 0)
+    stats = 2 * terms.sum(axis=1)
+    # Williams correction, motifs missing from both strands are excluded
+    num_cells = 2 * (row_sums > 0).sum(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        stats /= 1 + (num_cells + 1) / (6 * total)
+
+    undefined = (total == 0) | (plus.sum(axis=1) == 0) | (minus.sum(axis=1) == 0)
+    stats[undefined] = numpy.nan
+    pvalues = numpy.full(len(stats), numpy.nan)
+    for i in numpy.nonzero(~undefined)[0]:
+        pvalues[i] = chi_high(max(stats[i], 0), num_cells[i] - 1)
+    return WindowValues(starts, window, stats, "G", seq_name=seq.name, pvalues=pvalues)
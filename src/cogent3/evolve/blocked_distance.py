@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+"""Pairwise distances for alignments too large for an in memory matrix.
+
+The pair space is divided into tiles of row x column sequence blocks. Tiles
+are computed, optionally in parallel processes, and written into an on disk
+condensed distance matrix. A record of completed tiles is kept so an
+interrupted computation resumes from where it stopped.
+
+The output directory contains
+
+- info.json, the sequence names and calculator settings
+- seqs.npy, the sequences as state indices, read by the workers
+- distances.npy, the condensed distances as float64
+- tiles.npy, True for completed tiles
+"""
+import json
+import os
+
+import numpy
+
+from numpy.lib.format import open_memmap
+
+from cogent3.evolve.fast_distance import (
+    DistanceMatrix,
+    Stats,
+    _condensed_index,
+    get_distance_calculator,
+)
+from cogent3.util import parallel as PAR
+from cogent3.util import progress_display as UI
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Alpha"
+
+_INFO = "info.json"
+_SEQS = "seqs.npy"
+_DISTS = "distances.npy"
+_TILES = "tiles.npy"
+
+
+def _tiles(num_seqs, tile_size):
+    """returns [(row start, row end, col start, col end), ...] for tiles on
+    and above the diagonal"""
+    bounds = [
+        (start, min(start + tile_size, num_seqs))
+        for start in range(0, num_seqs, tile_size)
+    ]
+    return [row + col for i, row in enumerate(bounds) for col in bounds[i:]]
+
+
+def _tile_pairs(tile):
+    """returns rows, cols of the pairs in a tile, indexed relative to the
+    concatenated row and column sequences, in condensed order"""
+    r0, r1, c0, c1 = tile
+    num_rows = r1 - r0
+    if r0 == c0:
+        return numpy.triu_indices(num_rows, 1)
+
+    num_cols = c1 - c0
+    rows = numpy.repeat(numpy.arange(num_rows, dtype=numpy.int64), num_cols)
+    cols = numpy.tile(numpy.arange(num_cols, dtype=numpy.int64), num_rows)
+    return rows, cols + num_rows
+
+
+class _TileDistances:
+    """callable returning the distances and invalid pairs of a tile"""
+
+    def __init__(self, calculator, seqs_path):
+        # calculator has no sequences, so is cheap to send to workers
+        self.calculator = calculator
+        self.seqs_path = seqs_path
+
+    def __call__(self, tile):
+        r0, r1, c0, c1 = tile
+        rows, cols = _tile_pairs(tile)
+        if not len(rows):
+            return tile, numpy.empty(0), numpy.empty(0, dtype=bool)
+
+        all_seqs = numpy.load(self.seqs_path, mmap_mode="r")
+        seqs = numpy.array(all_seqs[r0:r1])
+        if c0 != r0:
+            seqs = numpy.concatenate([seqs, all_seqs[c0:c1]])
+
+        calc = self.calculator
+        stats, _, diffs = calc._pair_stats(seqs, rows, cols, calc._pack(seqs))
+        dists = stats[Stats._fields.index(calc._dist_stat)]
+        # as for in memory distances, pairs without differences are 0 and
+        # invalid pairs have no valid statistics
+        identical = diffs == 0
+        invalid = numpy.isnan(stats[0]) & numpy.isnan(stats[2]) & ~identical
+        dists = numpy.where(identical, 0.0, dists)
+        return tile, dists, invalid
+
+
+def _write_tile(condensed, num_seqs, tile, dists):
+    """writes tile distances into the condensed array"""
+    r0, r1, c0, c1 = tile
+    offset = 0
+    for i in range(r0, r1):
+        start = max(c0, i + 1)
+        size = c1 - start
+        if size <= 0:
+            continue
+        index = _condensed_index(i, start, num_seqs)
+        condensed[index : index + size] = dists[offset : offset + size]
+        offset += size
+
+
+def _read_info(path):
+    with open(os.path.join(path, _INFO)) as infile:
+        return json.load(infile)
+
+
+def _open_store(path, info, seqs):
+    """returns the condensed distances and tile record memmaps, creating
+    them if they don't exist"""
+    num_seqs = len(info["names"])
+    num_tiles = len(_tiles(num_seqs, info["tile_size"]))
+    if os.path.exists(os.path.join(path, _INFO)):
+        existing = _read_info(path)
+        if existing != info:
+            raise ValueError(
+                f"{path!r} contains distances computed with different settings"
+            )
+        stored = numpy.load(os.path.join(path, _SEQS), mmap_mode="r")
+        if not numpy.array_equal(stored, seqs):
+            raise ValueError(f"{path!r} contains distances for different sequences")
+        condensed = numpy.load(os.path.join(path, _DISTS), mmap_mode="r+")
+        done = numpy.load(os.path.join(path, _TILES), mmap_mode="r+")
+        return condensed, done
+
+    os.makedirs(path, exist_ok=True)
+    numpy.save(os.path.join(path, _SEQS), seqs)
+    num_pairs = num_seqs * (num_seqs - 1) // 2
+    condensed = open_memmap(
+        os.path.join(path, _DISTS), mode="w+", dtype=numpy.float64, shape=(num_pairs,)
+    )
+    done = open_memmap(
+        os.path.join(path, _TILES), mode="w+", dtype=bool, shape=(num_tiles,)
+    )
+    # written last, its presence indicates the store is complete
+    with open(os.path.join(path, _INFO), "w") as outfile:
+        json.dump(info, outfile)
+    return condensed, done
+
+
+@UI.display_wrap
+def blocked_distances(
+    aln,
+    calc,
+    path,
+    tile_size=1000,
+    invalid_raises=False,
+    parallel=False,
+    par_kw=None,
+    ui=None,
+):
+    """computes pairwise distances tile by tile into an on disk matrix
+
+    Parameters
+    ----------
+    aln
+        an alignment
+    calc : str
+        name of a pairwise distance calculator, for options see
+        cogent3.evolve.fast_distance.available_distances
+    path : str
+        directory for the results. If it contains an incomplete computation
+        for the same alignment and settings, only the remaining tiles are
+        computed.
+    tile_size : int
+        number of sequences in the row and column blocks of a tile
+    invalid_raises : bool
+        if True, an ArithmeticError is raised if a distance could not be
+        computed
+    parallel : bool
+        if True, tiles are computed in separate processes
+    par_kw
+        dict of arguments for cogent3.util.parallel.imap
+
+    Returns
+    -------
+    DistanceMatrix that reads the distances from disk, see load_distances
+
+    Notes
+    -----
+    Names are sorted, as for in memory distances. Sequences with no
+    differences are not collapsed into one, so the distances of duplicated
+    sequences are computed individually.
+    """
+    calculator = get_distance_calculator(calc, moltype=aln.moltype)
+    calculator._convert_seqs_to_indices(aln)
+    names = sorted(aln.names)
+    position = {n: i for i, n in enumerate(calculator.names)}
+    order = [position[n] for n in names]
+    # state indices fit in int8, invalid states are negative
+    seqs = calculator.indexed_seqs.take(order, axis=0).astype(numpy.int8)
+    calculator.indexed_seqs = None
+    calculator.names = None
+
+    info = dict(
+        names=names,
+        calc=calc.lower(),
+        moltype=calculator.moltype.label,
+        tile_size=tile_size,
+    )
+    condensed, done = _open_store(path, info, seqs)
+    del seqs
+
+    tiles = _tiles(len(names), tile_size)
+    todo = [k for k in range(len(tiles)) if not done[k]]
+    tile_index = {tiles[k]: k for k in todo}
+    func = _TileDistances(calculator, os.path.join(path, _SEQS))
+    if parallel:
+        par_kw = par_kw or {}
+        results = PAR.imap(func, [tiles[k] for k in todo], **par_kw)
+    else:
+        results = map(func, [tiles[k] for k in todo])
+
+    for n, (tile, dists, invalid) in enumerate(results):
+        ui.display(f"{n} of {len(todo)} tiles", n / len(todo))
+        if invalid_raises and invalid.any():
+            r0, r1, c0, _ = tile
+            rows, cols = _tile_pairs(tile)
+            k = invalid.argmax()
+            # cols index the row sequences followed by the column sequences
+            i = r0 + rows[k]
+            j = r0 + cols[k] if r0 == c0 else c0 + cols[k] - (r1 - r0)
+            msg = f"distance could not be calculated for {names[i]} - {names[j]}"
+            raise ArithmeticError(msg)
+
+        _write_tile(condensed, len(names), tile, dists)
+        condensed.flush()
+        # marked done only after the distances are on disk
+        done[tile_index[tile]] = True
+        done.flush()
+
+    del condensed, done
+    return load_distances(path)
+
+
+def load_distances(path):
+    """returns a DistanceMatrix that reads distances written by
+    blocked_distances from disk
+
+    Raises
+    ------
+    ValueError if the computation is incomplete
+    """
+    info = _read_info(path)
+    done = numpy.load(os.path.join(path, _TILES))
+    if not done.all():
+        raise ValueError(
+            f"{path!r} is incomplete, {(~done).sum()} of {len(done)} tiles remain"
+        )
+    condensed = numpy.load(os.path.join(path, _DISTS), mmap_mode="r")
+    return DistanceMatrix.from_condensed(condensed, info["names"])
@@ -1,17 +1,31 @@
 from collections import defaultdict, namedtuple
-from numbers import Number
 
 import numpy
 
-from numpy import array, diag, dot, eye, float64, int32, log, sqrt, zeros
+from numpy import (
+    array,
+    diag,
+    dot,
+    eye,
+    float64,
+    frombuffer,
+    int32,
+    log,
+    sqrt,
+    uint32,
+    zeros,
+)
 from numpy.linalg import LinAlgError, det, inv, norm
 
 from cogent3 import DNA, RNA, get_moltype
-from cogent3.util.dict_array import DictArray
+from cogent3.util.dict_array import DictArray, DictArrayTemplate
 from cogent3.util.misc import get_object_provenance
 from cogent3.util.progress_display import display_wrap
 
-from .pairwise_distance_numba import fill_diversity_matrix
+from .pairwise_distance_numba import (
+    count_packed_differences,
+    fill_diversity_matrices,
+)
 
 
 __author__ = "Gavin Huttley, Yicheng Zhu and Ben Kaehler"
@@ -74,7 +88,11 @@ def get_moltype_index_array(moltype, invalid=-9):
 
 def seq_to_indices(seq, char_to_index):
     """returns an array with sequence characters replaced by their index"""
-    ords = list(map(ord, seq))
+    data = getattr(seq, "_seq", seq)
+    if isinstance(data, str):
+        ords = frombuffer(data.encode("utf-32-le"), dtype=uint32)
+    else:
+        ords = list(map(ord, seq))
     indices = char_to_index.take(ords)
     return indices
 
@@ -270,6 +288,235 @@ def _logdet(matrix, use_tk_adjustment=True):
     return total, p, d_xy, var
 
 
+def _totals_diffs(matrices):
+    """returns the totals and number of differences of a stack of
+    diversity matrices"""
+    total = matrices.sum(axis=(1, 2))
+    diffs = total - numpy.trace(matrices, axis1=1, axis2=2)
+    return total, diffs
+
+
+def _invalid_to_nan(invalid, *stats):
+    """returns stats arrays with invalid elements set to nan"""
+    return tuple(numpy.where(invalid, numpy.nan, stat) for stat in stats)
+
+
+def _hamming_stats(matrices):
+    """_hamming for a [pair, state, state] stack of diversity matrices,
+    returns arrays with invalid elements set to nan"""
+    return _hamming_from_counts(*_totals_diffs(matrices))
+
+
+def _hamming_from_counts(total, diffs):
+    """_hamming from arrays of the number of valid positions and the number
+    of differences, returns arrays with invalid elements set to nan"""
+    invalid = total == 0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        p = diffs / total
+    var = numpy.full(len(total), numpy.nan)
+    return _invalid_to_nan(invalid, total, p, diffs) + (var,)
+
+
+def _jc69_stats(matrices):
+    """_jc69_from_matrix for a [pair, state, state] stack of diversity
+    matrices, returns arrays with invalid elements set to nan"""
+    total, diffs = _totals_diffs(matrices)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        p = diffs / total
+        invalid = (total == 0) | (p >= 0.75)
+        factor = 1 - (4 / 3) * p
+        dist = -3.0 * log(factor) / 4
+        var = p * (1 - p) / (factor * factor * total)
+    return _invalid_to_nan(invalid, total, p, dist, var)
+
+
+def _tn93_stats(
+    matrices, freqs, pur_indices, pyr_indices, pur_coords, pyr_coords, tv_coords
+):
+    """_tn93_from_matrix for a [pair, state, state] stack of diversity
+    matrices, returns arrays with invalid elements set to nan"""
+    total = matrices.sum(axis=(1, 2))
+    flat = matrices.reshape(len(matrices), -1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        freqs = matrices.sum(axis=1) + matrices.sum(axis=2)
+        freqs /= 2 * total[:, None]
+        p = flat[:, pur_coords + pyr_coords + tv_coords].sum(axis=1) / total
+
+        freq_purs = freqs[:, pur_indices].sum(axis=1)
+        prod_purs = freqs[:, pur_indices].prod(axis=1)
+        freq_pyrs = freqs[:, pyr_indices].sum(axis=1)
+        prod_pyrs = freqs[:, pyr_indices].prod(axis=1)
+
+        pur_ts_diffs = flat[:, pur_coords].sum(axis=1) / total
+        pyr_ts_diffs = flat[:, pyr_coords].sum(axis=1) / total
+        tv_diffs = flat[:, tv_coords].sum(axis=1) / total
+
+        coeff1 = 2 * prod_purs / freq_purs
+        coeff2 = 2 * prod_pyrs / freq_pyrs
+        coeff3 = 2 * (
+            freq_purs * freq_pyrs
+            - (prod_purs * freq_pyrs / freq_purs)
+            - (prod_pyrs * freq_purs / freq_pyrs)
+        )
+
+        term1 = 1 - pur_ts_diffs / coeff1 - tv_diffs / (2 * freq_purs)
+        term2 = 1 - pyr_ts_diffs / coeff2 - tv_diffs / (2 * freq_pyrs)
+        term3 = 1 - tv_diffs / (2 * freq_purs * freq_pyrs)
+        invalid = (total == 0) | (term1 <= 0) | (term2 <= 0) | (term3 <= 0)
+
+        dist = -coeff1 * log(term1) - coeff2 * log(term2) - coeff3 * log(term3)
+        v1 = 1 / term1
+        v2 = 1 / term2
+        v3 = 1 / term3
+        v4 = (
+            (coeff1 * v1 / (2 * freq_purs))
+            + (coeff2 * v2 / (2 * freq_pyrs))
+            + (coeff3 * v3 / (2 * freq_purs * freq_pyrs))
+        )
+        var = (
+            v1 ** 2 * pur_ts_diffs
+            + v2 ** 2 * pyr_ts_diffs
+            + v4 ** 2 * tv_diffs
+            - (v1 * pur_ts_diffs + v2 * pyr_ts_diffs + v4 * tv_diffs) ** 2
+        )
+        var /= total
+
+    return _invalid_to_nan(invalid, total, p, dist, var)
+
+
+def _logdetcommon_stats(matrices):
+    """_logdetcommon for a [pair, state, state] stack of diversity matrices
+
+    Returns
+    -------
+    invalid, total, p, frequency, freqs, var_term, det(frequency) where all
+    but invalid include only the valid pairs
+    """
+    total, diffs = _totals_diffs(matrices)
+    invalid = (total == 0) | (diffs == 0)
+    selected = ~invalid
+    total = total[selected]
+    p = diffs[selected] / total
+
+    # we replace the missing diagonal states with a frequency of 0.5,
+    # then normalise
+    frequency = matrices[selected]
+    states = numpy.arange(matrices.shape[1])
+    diagonal = frequency[:, states, states]
+    diagonal[diagonal == 0] = 0.5
+    frequency[:, states, states] = diagonal
+    frequency /= frequency.sum(axis=(1, 2))[:, None, None]
+
+    determinant = det(frequency)
+    # not (det <= 0) so a nan det is retained, as for _logdetcommon
+    keep = ~(determinant <= 0)
+    invalid[selected] = ~keep
+    total, p, frequency, determinant = (
+        total[keep],
+        p[keep],
+        frequency[keep],
+        determinant[keep],
+    )
+
+    # the inverse matrix of frequency, every element is squared
+    M_matrix = inv(frequency) ** 2
+    freqs = [frequency.sum(axis=axis) for axis in (1, 2)]
+    var_term = numpy.trace(M_matrix @ frequency, axis1=1, axis2=2)
+
+    return invalid, total, p, frequency, freqs, var_term, determinant
+
+
+def _expand_valid(invalid, *stats):
+    """returns stats for valid elements expanded to length of invalid, with
+    invalid elements set to nan"""
+    result = []
+    for stat in stats:
+        expanded = numpy.full(len(invalid), numpy.nan)
+        if stat is not None:
+            expanded[~invalid] = stat
+        result.append(expanded)
+    return tuple(result)
+
+
+def _paralinear_stats(matrices):
+    """_paralinear for a [pair, state, state] stack of diversity matrices,
+    returns arrays with invalid elements set to nan"""
+    invalid, total, p, frequency, freqs, var_term, determinant = _logdetcommon_stats(
+        matrices
+    )
+    r = matrices.shape[1]
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        d_xy = -log(determinant / sqrt((freqs[0] * freqs[1]).prod(axis=1))) / r
+        var = (var_term - (1 / sqrt(freqs[0] * freqs[1])).sum(axis=1)) / (
+            r ** 2 * total
+        )
+    return _expand_valid(invalid, total, p, d_xy, var)
+
+
+def _logdet_stats(matrices, use_tk_adjustment=True):
+    """_logdet for a [pair, state, state] stack of diversity matrices,
+    returns arrays with invalid elements set to nan"""
+    invalid, total, p, frequency, freqs, var_term, determinant = _logdetcommon_stats(
+        matrices
+    )
+    r = matrices.shape[1]
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        if use_tk_adjustment:
+            coeff = (((freqs[0] + freqs[1]) ** 2).sum(axis=1) / 4 - 1) / (r - 1)
+            d_xy = coeff * log(determinant / sqrt((freqs[0] * freqs[1]).prod(axis=1)))
+            var = None
+        else:
+            d_xy = -log(determinant) / r - log(r)
+            var = (var_term / r ** 2 - 1) / total
+
+    return _expand_valid(invalid, total, p, d_xy, var)
+
+
+def _pack_seqs(seqs, dim):
+    """returns bit packed representations of [seq, position] state indices
+
+    Returns
+    -------
+    valid
+        [seq, word] uint64 array with bits set where the state is valid
+        (non-negative), i.e. not a gap or ambiguity
+    planes
+        [seq, bit, word] uint64 array of the bits of the state indices, 2 bits
+        for nucleic acids, 5 bits for protein
+    """
+    num_seqs, length = seqs.shape
+    num_bits = max(1, int(dim - 1).bit_length())
+    width = -(-length // 64) * 64
+
+    def pack(bits):
+        padded = zeros((num_seqs, width), dtype=bool)
+        padded[:, :length] = bits
+        return numpy.packbits(padded, axis=1).view(numpy.uint64)
+
+    valid = pack(seqs >= 0)
+    planes = [pack((seqs >> b) & 1) for b in range(num_bits)]
+    return valid, numpy.ascontiguousarray(numpy.stack(planes, axis=1))
+
+
+def _pair_blocks(num_seqs, max_pairs):
+    """yields (rows, cols) of the upper triangle pairs, in row order, with
+    complete rows in each block of at most ~max_pairs pairs"""
+    rows = []
+    cols = []
+    num_pairs = 0
+    for i in range(num_seqs - 1):
+        rows.append(numpy.full(num_seqs - i - 1, i, dtype=numpy.int64))
+        cols.append(numpy.arange(i + 1, num_seqs, dtype=numpy.int64))
+        num_pairs += num_seqs - i - 1
+        if num_pairs >= max_pairs:
+            yield numpy.concatenate(rows), numpy.concatenate(cols)
+            rows = []
+            cols = []
+            num_pairs = 0
+    if rows:
+        yield numpy.concatenate(rows), numpy.concatenate(cols)
+
+
 def _number_formatter(template):
     """flexible number formatter"""
 
@@ -312,6 +559,13 @@ class _PairwiseDistance(object):
     """base class for computing pairwise distances"""
 
     valid_moltypes = ()
+    # func applied to a [pair, state, state] stack of diversity matrices
+    _array_func = None
+    # if True, only the number of valid positions and differences are
+    # required, these are counted from bit packed sequences
+    _packed_counts = False
+    # the Stats field returned as the distance
+    _dist_stat = "dist"
 
     def __init__(self, moltype, invalid=-9, alignment=None, invalid_raises=False):
         super(_PairwiseDistance, self).__init__()
@@ -327,7 +581,9 @@ class _PairwiseDistance(object):
         self.moltype = moltype
         self.char_to_indices = get_moltype_index_array(moltype, invalid=invalid)
         self._dim = len(list(moltype))
-        self._dists = None
+        self._stats = None
+        self._representative = None
+        self._dist_dict = None
         self._dupes = None
         self._duped = None
         self._invalid_raises = invalid_raises
@@ -347,13 +603,8 @@ class _PairwiseDistance(object):
 
         self._dists = {}
         self.names = alignment.names[:]
-        indexed_seqs = []
-        for name in self.names:
-            seq = alignment.get_gapped_seq(name)
-            indexed = seq_to_indices(str(seq), self.char_to_indices)
-            indexed_seqs.append(indexed)
-
-        self.indexed_seqs = array(indexed_seqs)
+        # the alignment caches its characters as a [seqs, positions] array
+        self.indexed_seqs = self.char_to_indices.take(alignment._get_char_array())
 
     @property
     def duplicated(self):
@@ -365,71 +616,136 @@ class _PairwiseDistance(object):
     def func():
         pass  # over ride in subclasses
 
+    @property
+    def _dists(self):
+        """{(name1, name2): Stats, ...} for the unique sequences, created from
+        the stats arrays on first use"""
+        if self._dist_dict is None and self._stats is not None:
+            unique = [i for i, r in enumerate(self._representative) if r == i]
+            dists = {}
+            for a, i in enumerate(unique[:-1]):
+                name_1 = self.names[i]
+                for j in unique[a + 1 :]:
+                    name_2 = self.names[j]
+                    result = Stats(
+                        *[
+                            None if numpy.isnan(v[i, j]) else v[i, j]
+                            for v in self._stats
+                        ]
+                    )
+                    dists[(name_1, name_2)] = dists[(name_2, name_1)] = result
+            self._dist_dict = dists
+        return self._dist_dict
+
+    @_dists.setter
+    def _dists(self, value):
+        self._dist_dict = value
+        self._stats = None
+
+    def _apply_func(self, matrices, *args):
+        """applies the single pair func to each diversity matrix, returns
+        arrays with invalid elements set to nan"""
+        stats = [self.func(matrix, *args) for matrix in matrices]
+        stats = [[numpy.nan if v is None else v for v in stat] for stat in stats]
+        return tuple(array(stats, dtype=float64).reshape(len(matrices), 4).T)
+
+    @property
+    def _max_pairs(self):
+        """number of pairs computed at a time"""
+        if self._packed_counts:
+            return 2 ** 22
+        return max(1, 2 ** 22 // (self._dim * self._dim))
+
+    def _pack(self, seqs):
+        """returns bit packed seqs if used for computing stats, else None"""
+        return _pack_seqs(seqs, self._dim) if self._packed_counts else None
+
+    def _pair_stats(self, seqs, rows, cols, packed=None):
+        """returns the stats arrays, number of valid positions and number of
+        differences for the sequence pairs seqs[rows[k]], seqs[cols[k]]
+
+        Parameters
+        ----------
+        seqs
+            [seq, position] array of state indices, invalid states negative
+        rows, cols
+            int64 arrays of sequence indices
+        packed
+            result of self._pack(seqs)
+        """
+        if self._packed_counts:
+            valid, planes = packed
+            total = zeros(len(rows), float64)
+            diffs = zeros(len(rows), float64)
+            count_packed_differences(valid, planes, rows, cols, total, diffs)
+            return _hamming_from_counts(total, diffs), total, diffs
+
+        stats_func = self._array_func or self._apply_func
+        matrices = zeros((len(rows), self._dim, self._dim), float64)
+        fill_diversity_matrices(matrices, seqs, rows, cols)
+        block_stats = stats_func(matrices, *self._func_args)
+        total, diffs = _totals_diffs(matrices)
+        return block_stats, total, diffs
+
     @display_wrap
     def run(self, alignment=None, ui=None):
-        """computes the pairwise distances"""
+        """computes the pairwise distances
+
+        Diversity matrices for blocks of sequence pairs are computed in
+        parallel, and statistics are computed from each block as arrays.
+        """
         self._dupes = None
         self._duped = None
 
-        dupes = set()
-        duped = defaultdict(list)
-
         if alignment is not None:
             self._convert_seqs_to_indices(alignment)
 
         names = self.names[:]
-        matrix = zeros((self._dim, self._dim), float64)
-        off_diag = [
-            (i, j) for i in range(self._dim) for j in range(self._dim) if i != j
-        ]
-        off_diag = tuple([tuple(a) for a in zip(*off_diag)])
-
-        done = 0.0
-        to_do = (len(names) * len(names) - 1) / 2
-        for i in range(len(names) - 1):
-            if i in dupes:
-                continue
-
-            name_1 = names[i]
-            s1 = self.indexed_seqs[i]
-            for j in range(i + 1, len(names)):
-                if j in dupes:
-                    continue
+        num_seqs = len(names)
+        seqs = numpy.ascontiguousarray(self.indexed_seqs)
+        packed = self._pack(seqs)
+        # stats, [seq, seq], are nan where invalid or not computed
+        stats = [numpy.full((num_seqs, num_seqs), numpy.nan) for _ in Stats._fields]
+        # the index of the sequence that each sequence is a duplicate of
+        representative = numpy.arange(num_seqs)
+        duped = defaultdict(list)
 
-                name_2 = names[j]
-                ui.display("%s vs %s" % (name_1, name_2), done / to_do)
-                done += 1
-                matrix.fill(0)
-                s2 = self.indexed_seqs[j]
-                fill_diversity_matrix(matrix, s1, s2)
-                if not (matrix[off_diag] > 0).any():
-                    # j is a duplicate of i
-                    dupes.update([j])
+        done = 0
+        to_do = num_seqs * (num_seqs - 1) // 2
+        for rows, cols in _pair_blocks(num_seqs, self._max_pairs):
+            ui.display(f"{done} of {to_do} pairs", done / to_do)
+            done += len(rows)
+            block_stats, total, diffs = self._pair_stats(seqs, rows, cols, packed)
+            for stat, values in zip(stats, block_stats):
+                stat[rows, cols] = stat[cols, rows] = values
+
+            # sequences with no differences, j is a duplicate of the first
+            # unique sequence i
+            identical = diffs == 0
+            for i, j in zip(rows[identical].tolist(), cols[identical].tolist()):
+                if representative[i] == i and representative[j] == j:
+                    representative[j] = i
                     duped[i].append(j)
-                    continue
 
-                total, p, dist, var = self.func(matrix, *self._func_args)
-                if self._invalid_raises and not isinstance(dist, Number):
+            if self._invalid_raises:
+                # nan distances from a valid pair are numbers, as for func
+                invalid = numpy.isnan(block_stats[0]) & numpy.isnan(block_stats[2])
+                unique = (representative[rows] == rows) & (representative[cols] == cols)
+                invalid = numpy.flatnonzero(invalid & unique & ~identical)
+                if len(invalid):
+                    name_1 = names[rows[invalid[0]]]
+                    name_2 = names[cols[invalid[0]]]
                     msg = f"distance could not be calculated for {name_1} - {name_2}"
                     raise ArithmeticError(msg)
-                result = Stats(total, p, dist, var)
-                self._dists[(name_1, name_2)] = result
-                self._dists[(name_2, name_1)] = result
 
-        self._dupes = [names[i] for i in dupes] or None
+        self._stats = Stats(*stats)
+        self._representative = representative
+        self._dist_dict = None
+        self._dupes = [names[i] for i in sorted(set().union(*duped.values()))] or None
         if duped:
-            self._duped = {}
-            for k, v in duped.items():
-                key = names[k]
-                vals = [names[i] for i in v]
-                self._duped[key] = vals
-
-            # clean the distances so only unique seqs included
-            remove = set(self._dupes)
-            keys = list(self._dists.keys())
-            for key in keys:
-                if set(key) & remove:
-                    del self._dists[key]
+            self._duped = {
+                names[k]: [names[i] for i in v] for k, v in sorted(duped.items())
+            }
 
     __call__ = run
 
@@ -442,15 +758,34 @@ class _PairwiseDistance(object):
             all seqs included in the distances, otherwise only unique sequences
             are included.
         """
-        if self._dists is None:
-            return None
+        if self._stats is None:
+            if self._dists is None:
+                return None
 
-        dists = {k: self._dists[k].dist for k in self._dists}
-        if include_duplicates:
-            dists = self._expand(dists)
+            dists = {k: getattr(self._dists[k], self._dist_stat) for k in self._dists}
+            if include_duplicates:
+                dists = self._expand(dists)
+            return DistanceMatrix(dists)
 
-        result = DistanceMatrix(dists)
-        return result
+        return self._stat_matrix(self._dist_stat, include_duplicates)
+
+    def _stat_matrix(self, stat, include_duplicates):
+        """returns DistanceMatrix of the named statistic, with names sorted"""
+        representative = self._representative
+        if include_duplicates:
+            indices = numpy.arange(len(self.names))
+        else:
+            indices = numpy.flatnonzero(representative == numpy.arange(len(self.names)))
+
+        names = [self.names[i] for i in indices]
+        order = sorted(range(len(names)), key=names.__getitem__)
+        indices = indices[order]
+        names = [names[i] for i in order]
+        # duplicates take the values of the sequence they duplicate
+        indices = representative[indices]
+        values = getattr(self._stats, stat)[numpy.ix_(indices, indices)]
+        values[indices[:, None] == indices[None, :]] = 0
+        return DistanceMatrix(values, names=names)
 
     def _expand(self, pwise):
         """returns a pwise statistic dict that includes duplicates"""
@@ -478,9 +813,6 @@ class _PairwiseDistance(object):
 
     @property
     def dists(self):
-        if self._dists is None:
-            return None
-
         return self.get_pairwise_distances(include_duplicates=True)
 
     @property
@@ -540,36 +872,22 @@ class HammingPair(_PairwiseDistance):
         """states: the valid sequence states"""
         super(HammingPair, self).__init__(moltype, *args, **kwargs)
         self.func = _hamming
+        self._array_func = _hamming_stats
+        self._packed_counts = True
 
 
 class PercentIdentityPair(_PairwiseDistance):
     """Percent identity distance calculator for pairwise alignments"""
 
     valid_moltypes = ("dna", "rna", "protein", "text")
+    _dist_stat = "fraction_variable"
 
     def __init__(self, moltype="text", *args, **kwargs):
         """states: the valid sequence states"""
         super(PercentIdentityPair, self).__init__(moltype, *args, **kwargs)
         self.func = _hamming
-
-    def get_pairwise_distances(self, include_duplicates=True):
-        """returns a matrix of pairwise distances.
-
-        Parameters
-        ----------
-        include_duplicates : bool
-            all seqs included in the distances, otherwise only unique sequences
-            are included.
-        """
-        if self._dists is None:
-            return None
-
-        dists = {k: self._dists[k].fraction_variable for k in self._dists}
-        if include_duplicates:
-            dists = self._expand(dists)
-
-        result = DistanceMatrix(dists)
-        return result
+        self._array_func = _hamming_stats
+        self._packed_counts = True
 
 
 class _NucleicSeqPair(_PairwiseDistance):
@@ -592,6 +910,7 @@ class JC69Pair(_NucleicSeqPair):
         """states: the valid sequence states"""
         super(JC69Pair, self).__init__(moltype, *args, **kwargs)
         self.func = _jc69_from_matrix
+        self._array_func = _jc69_stats
 
 
 class TN93Pair(_NucleicSeqPair):
@@ -618,6 +937,7 @@ class TN93Pair(_NucleicSeqPair):
         self.tv_coords = [i * 4 + j for i, j in self.tv_coords]
 
         self.func = _tn93_from_matrix
+        self._array_func = _tn93_stats
         self._func_args = [
             self._freqs,
             self.pur_indices,
@@ -640,6 +960,7 @@ class LogDetPair(_PairwiseDistance):
         """
         super(LogDetPair, self).__init__(moltype, *args, **kwargs)
         self.func = _logdet
+        self._array_func = _logdet_stats
         self._func_args = [use_tk_adjustment]
 
     def run(self, use_tk_adjustment=None, *args, **kwargs):
@@ -657,6 +978,7 @@ class ParalinearPair(_PairwiseDistance):
     def __init__(self, moltype="dna", *args, **kwargs):
         super(ParalinearPair, self).__init__(moltype, *args, **kwargs)
         self.func = _paralinear
+        self._array_func = _paralinear_stats
 
 
 _calculators = {
@@ -707,14 +1029,117 @@ def available_distances():
     return table
 
 
+def _condensed_index(i, j, num):
+    """returns index of the pair i < j in the condensed form of a num x num
+    matrix, i and j can be arrays"""
+    return num * i - i * (i + 1) // 2 + j - i - 1
+
+
+def _condensed_to_square(condensed, num):
+    """returns square symmetric array from a 1D upper triangle"""
+    if len(condensed) != num * (num - 1) // 2:
+        raise ValueError(
+            f"{len(condensed)} condensed distances does not match {num} names"
+        )
+    result = numpy.zeros((num, num), dtype=float)
+    offset = 0
+    for i in range(num - 1):
+        row = condensed[offset : offset + num - i - 1]
+        result[i, i + 1 :] = row
+        result[i + 1 :, i] = row
+        offset += num - i - 1
+    return result
+
+
 class DistanceMatrix(DictArray):
-    """pairwise distance matrix"""
+    """pairwise distance matrix
+
+    Distances are stored as a dense square numpy array, with the row / column
+    index of each name given by the template ordinals. A matrix created by
+    from_condensed reads distances from the condensed form until the square
+    array is required.
+    """
 
-    def __init__(self, dists, invalid=None):
-        super(DistanceMatrix, self).__init__(dists, dtype=float)
+    # condensed distances, only set for matrices without a square array
+    _condensed = None
+
+    def __init__(self, dists, invalid=None, names=None):
+        """
+        Parameters
+        ----------
+        dists
+            a dict of {(name1, name2): distance, ...}, a DictArray, or a
+            numpy array. An array must be square, or a 1D condensed upper
+            triangle ordered as d[0, 1], d[0, 2], ..., d[1, 2], ...
+        invalid
+            value indicating invalid distances
+        names
+            names corresponding to the rows / columns of an array
+        """
+        if isinstance(dists, DictArray):
+            self.array = numpy.asarray(dists.array, dtype=float)
+            self.template = dists.template
+            self.shape = self.array.shape
+        elif isinstance(dists, dict):
+            super(DistanceMatrix, self).__init__(dists, dtype=float)
+        else:
+            if names is None:
+                raise ValueError("names required for array data")
+            names = list(names)
+            dists = numpy.asarray(dists, dtype=float)
+            if dists.ndim == 1:
+                dists = _condensed_to_square(dists, len(names))
+            if dists.shape != (len(names), len(names)):
+                raise ValueError(
+                    f"shape {dists.shape} does not match number of names "
+                    f"{len(names)}"
+                )
+            template = DictArrayTemplate(names, names)
+            super(DistanceMatrix, self).__init__(dists, template)
 
         self._invalid = invalid
 
+    @classmethod
+    def from_condensed(cls, condensed, names, invalid=None):
+        """returns a DistanceMatrix whose distances are read from condensed
+
+        Parameters
+        ----------
+        condensed
+            1D array, e.g. a numpy.memmap, of the upper triangle ordered as
+            d[0, 1], d[0, 2], ..., d[1, 2], ...
+        names
+            names corresponding to the rows / columns
+
+        Notes
+        -----
+        Looking up distances between two names, take_dists, drop_invalid and
+        to_condensed use condensed directly. Anything else that uses the array
+        attribute creates the square array.
+        """
+        names = list(names)
+        num = len(names)
+        if len(condensed) != num * (num - 1) // 2:
+            raise ValueError(
+                f"{len(condensed)} condensed distances does not match {num} names"
+            )
+        result = cls.__new__(cls)
+        result.template = DictArrayTemplate(names, names)
+        result.shape = (num, num)
+        result._condensed = condensed
+        result._invalid = invalid
+        return result
+
+    def __getattr__(self, name):
+        # the square array is created on first use
+        if name != "array" or self._condensed is None:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            )
+        self.array = _condensed_to_square(self._condensed, self.shape[0])
+        self._condensed = None
+        return self.array
+
     def __setitem__(self, names, value):
         (index, remaining) = self.template.interpret_index(names)
         self.array[index] = value
@@ -722,17 +1147,37 @@ class DistanceMatrix(DictArray):
 
     def __getitem__(self, names):
         (index, remaining) = self.template.interpret_index(names)
+        if self._condensed is not None and remaining is None:
+            num = self.shape[0]
+            i, j = sorted(k % num for k in index)
+            return 0.0 if i == j else self._condensed[_condensed_index(i, j, num)]
+
         result = self.array[index]
         if remaining is not None:
-            result = self.__class__(result, remaining)
-            self.template.names = array(self.template.names)[index]
-            result.template = self.template
+            result = self.__class__(DictArray(result, remaining))
         return result
 
     @property
     def names(self):
         return self.template.names[0]
 
+    def name_indices(self, names):
+        """returns numpy array of the row / column indices of names"""
+        ordinals = self.template.ordinals[0]
+        return numpy.array([ordinals[n] for n in names], dtype=int)
+
+    def to_condensed(self):
+        """returns the upper triangle as a 1D array, ordered as
+        d[0, 1], d[0, 2], ..., d[1, 2], ..."""
+        if self._condensed is not None:
+            return self._condensed
+
+        num = self.shape[0]
+        rows = [self.array[i, i + 1 :] for i in range(num - 1)]
+        if not rows:
+            return numpy.empty(0, dtype=float)
+        return numpy.concatenate(rows)
+
     def to_table(self):
         """converted to a Table"""
         from cogent3.util.table import Table
@@ -775,31 +1220,58 @@ class DistanceMatrix(DictArray):
             if True, elements in names will be excluded
         Returns
         -------
-        DistanceMatrix for names x names
+        DistanceMatrix for names x names, None if fewer than 2 names remain
         """
         if type(names) == str:
             names = [names]
 
-        current_names = array(self.names)
-        if negate:
-            keep = [i for i, n in enumerate(current_names) if n not in names]
-        else:
-            keep = [i for i, n in enumerate(current_names) if n in names]
-
-        data = self.array.take(keep, axis=0)
-        data = data.take(keep, axis=1)
-        names = current_names.take(keep)
-        dists = {
-            (names[i], names[j]): data[i, j]
-            for i in range(len(names))
-            for j in range(len(names))
-            if i != j
-        }
-        if not dists:
-            result = None
+        names = set(names)
+        keep = numpy.array([(n in names) != negate for n in self.names], dtype=bool)
+        return self._take_mask(keep)
+
+    def _take_mask(self, keep):
+        """returns DistanceMatrix of rows / columns where keep is True"""
+        if keep.sum() < 2:
+            return None
+
+        if self._condensed is not None:
+            if keep.all():
+                return self
+            return self._take_condensed(keep.nonzero()[0])
+
+        if keep.all():
+            data = self.array.copy()
         else:
-            result = self.__class__(dists)
-        return result
+            indices = keep.nonzero()[0]
+            data = self.array.take(indices, axis=0).take(indices, axis=1)
+        numpy.fill_diagonal(data, 0)
+        names = [n for n, k in zip(self.names, keep) if k]
+        return self.__class__(data, invalid=self._invalid, names=names)
+
+    def _take_condensed(self, indices):
+        """returns DistanceMatrix of indices x indices read from the
+        condensed distances"""
+        num = self.shape[0]
+        data = numpy.zeros((len(indices), len(indices)), dtype=float)
+        for a, i in enumerate(indices[:-1]):
+            row = self._condensed[_condensed_index(i, indices[a + 1 :], num)]
+            data[a, a + 1 :] = row
+            data[a + 1 :, a] = row
+        names = [self.names[i] for i in indices]
+        return self.__class__(data, invalid=self._invalid, names=names)
+
+    def _condensed_invalid(self):
+        """returns bool array, True for names with an invalid condensed
+        distance"""
+        num = self.shape[0]
+        invalid = numpy.zeros(num, dtype=bool)
+        for i in range(num - 1):
+            start = _condensed_index(i, i + 1, num)
+            nans = numpy.isnan(self._condensed[start : start + num - i - 1])
+            if nans.any():
+                invalid[i] = True
+                invalid[i + 1 :] |= nans
+        return invalid
 
     def drop_invalid(self):
         """drops all rows / columns with an invalid entry"""
@@ -808,16 +1280,13 @@ class DistanceMatrix(DictArray):
             or self.template.names[0] != self.template.names[1]
         ):
             raise RuntimeError("Must be a square matrix")
-        names = array(self.names)
         # NaN is an invalid value
-        cols = numpy.isnan(self.array).sum(axis=0)
-        exclude = names[cols != 0].tolist()
-        rows = numpy.isnan(self.array).sum(axis=1)
-        exclude += names[rows != 0].tolist()
-        exclude = set(exclude)
-        keep = set(names) ^ exclude
-        result = self.take_dists(keep)
-        return result
+        if self._condensed is not None:
+            return self._take_mask(~self._condensed_invalid())
+
+        invalid = numpy.isnan(self.array)
+        keep = ~(invalid.any(axis=0) | invalid.any(axis=1))
+        return self._take_mask(keep)
 
     def quick_tree(self, show_progress=False):
         """returns a neighbour joining tree
@@ -826,10 +1295,9 @@ class DistanceMatrix(DictArray):
         an estimated Neighbour Joining Tree, note that invalid distances are dropped
         prior to building the tree
         """
-        from cogent3.phylo.nj import nj
+        from cogent3.phylo.nj import fast_nj
 
         dists = self.drop_invalid()
         if not dists or dists.shape[0] == 1:
             raise ValueError("Too few distances to build a treenj")
-        dists = dists.to_dict()
-        return nj(dists, show_progress=show_progress)
+        return fast_nj(dists, show_progress=show_progress)
@@ -56,13 +56,15 @@ class _LikelihoodTreeEdge(object):
                         )
                     a.append(u)
                 assignments.append(a)
-        (uniq, counts, self.index) = _indexed(list(zip(*assignments)))
+        columns = numpy.array(assignments, self.integer_type).T
+        (first, counts, self.index) = _indexed_array(columns)
+        counts = counts.tolist()
 
         # extra column for gap
-        uniq.append(tuple([len(c.uniq) - 1 for c in children]))
+        gap = [len(c.uniq) - 1 for c in children]
         counts.append(0)
 
-        self.uniq = numpy.asarray(uniq, self.integer_type)
+        self.uniq = numpy.vstack([columns[first], gap]).astype(self.integer_type)
 
         # For faster math, a contiguous index array for each child
         self.indexes = numpy.ascontiguousarray(
@@ -221,6 +223,52 @@ def _indexed(values):
     return unique, counts, index
 
 
+def _indexed_array(values):
+    """vectorised _indexed() for an integer array, rows of a 2D array are
+    the values
+
+    Returns
+    -------
+    positions of the first occurrence of each unique value, in order of
+    occurrence, their counts and the index of each value's unique value
+    """
+    if len(values) == 0:
+        return (
+            numpy.zeros(0, INTEGER_TYPE),
+            numpy.zeros(0, INTEGER_TYPE),
+            numpy.zeros(0, INTEGER_TYPE),
+        )
+
+    axis = 0 if values.ndim > 1 else None
+    _, first, inverse, counts = numpy.unique(
+        values, return_index=True, return_inverse=True, return_counts=True, axis=axis
+    )
+    # numpy.unique orders by value, we need order of first occurrence
+    order = numpy.argsort(first)
+    rank = numpy.empty(len(order), INTEGER_TYPE)
+    rank[order] = numpy.arange(len(order))
+    return first[order], counts[order], rank[inverse.ravel()]
+
+
+def _motif_codes(motifs, motif_len):
+    """returns uint8 array of motif characters, one row per motif if
+    motif_len > 1, or None if motifs are not single byte characters"""
+    if isinstance(motifs, list) and all(isinstance(m, str) for m in motifs):
+        data = "".join(motifs)
+        if len(data) != len(motifs) * motif_len:
+            return None
+    elif isinstance(motifs, str) and motif_len == 1:
+        data = motifs
+    else:
+        return None
+
+    try:
+        data = numpy.frombuffer(data.encode("latin-1"), dtype=numpy.uint8)
+    except UnicodeEncodeError:
+        return None
+    return data.reshape(-1, motif_len) if motif_len > 1 else data
+
+
 def make_likelihood_tree_leaf(sequence, alphabet=None, seq_name=None):
     if alphabet is None:
         alphabet = sequence.moltype.alphabet
@@ -231,7 +279,13 @@ def make_likelihood_tree_leaf(sequence, alphabet=None, seq_name=None):
     sequence2 = sequence.get_in_motif_size(motif_len)
 
     # Convert sequence to indexed list of unique motifs
-    (uniq_motifs, counts, index) = _indexed(sequence2)
+    codes = _motif_codes(sequence2, motif_len)
+    if codes is None:
+        (uniq_motifs, counts, index) = _indexed(sequence2)
+    else:
+        (first, counts, index) = _indexed_array(codes)
+        uniq_motifs = [sequence2[i] for i in first]
+        counts = counts.tolist()
 
     # extra column for gap
     uniq_motifs.append("?" * motif_len)
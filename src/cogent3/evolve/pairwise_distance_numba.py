@@ -1,4 +1,6 @@
-from numba import njit
+import numpy
+
+from numba import njit, prange
 
 
 __author__ = "Gavin Huttley, Yicheng Zhu and Ben Kaehler"
@@ -24,3 +26,70 @@ def fill_diversity_matrix(matrix, seq1, seq2):
         if seq1[i] < 0 or seq2[i] < 0:
             continue
         matrix[seq1[i], seq2[i]] += 1.0
+
+
+@njit(parallel=True, cache=True)
+def fill_diversity_matrices(matrices, seqs, rows, cols):
+    """fills matrices[k] with the diversity matrix of seqs[rows[k]] and
+    seqs[cols[k]], pairs are processed in parallel.
+
+    Assumes the provided sequences have been converted to indices with
+    invalid characters being negative numbers, and matrices are zeroed."""
+
+    for k in prange(len(rows)):
+        seq1 = seqs[rows[k]]
+        seq2 = seqs[cols[k]]
+        matrix = matrices[k]
+        for i in range(len(seq1)):
+            if seq1[i] < 0 or seq2[i] < 0:
+                continue
+            matrix[seq1[i], seq2[i]] += 1.0
+
+
+# constants for counting set bits in 64-bit words
+_M1 = numpy.uint64(0x5555555555555555)
+_M2 = numpy.uint64(0x3333333333333333)
+_M4 = numpy.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = numpy.uint64(0x0101010101010101)
+_ZERO = numpy.uint64(0)
+_ONE = numpy.uint64(1)
+_TWO = numpy.uint64(2)
+_FOUR = numpy.uint64(4)
+_FIFTY_SIX = numpy.uint64(56)
+
+
+@njit(cache=True)
+def popcount(x):
+    """number of set bits in the uint64 x"""
+    x = x - ((x >> _ONE) & _M1)
+    x = (x & _M2) + ((x >> _TWO) & _M2)
+    x = (x + (x >> _FOUR)) & _M4
+    return (x * _H01) >> _FIFTY_SIX
+
+
+@njit(parallel=True, cache=True)
+def count_packed_differences(valid, planes, rows, cols, totals, diffs):
+    """fills totals[k] and diffs[k] with the number of positions valid in
+    both, and the number of those that differ, for the sequences rows[k] and
+    cols[k]. Pairs are processed in parallel.
+
+    valid is a [seq, word] array of bits set at valid positions, planes is a
+    [seq, bit, word] array of the bits of each state index."""
+    num_words = valid.shape[1]
+    num_planes = planes.shape[1]
+    for k in prange(len(rows)):
+        i = rows[k]
+        j = cols[k]
+        total = _ZERO
+        diff = _ZERO
+        for w in range(num_words):
+            both = valid[i, w] & valid[j, w]
+            if both == 0:
+                continue
+            differ = planes[i, 0, w] ^ planes[j, 0, w]
+            for b in range(1, num_planes):
+                differ |= planes[i, b, w] ^ planes[j, b, w]
+            total += popcount(both)
+            diff += popcount(differ & both)
+        totals[k] = total
+        diffs[k] = diff
@@ -168,6 +168,24 @@ def FastaParser(infile, seq_maker=None, info_maker=MinimalInfo, strict=True):
                 continue
 
 
+def LightFastaParser(infile, moltype=ASCII, strict=True, label_to_name=str):
+    """Yields successive sequences from infile as (name, LightSequence) tuples.
+
+    LightSequence instances are not validated and have no info or
+    annotations, making this much faster than FastaParser for large files.
+
+    If strict is True (default), raises RecordError when label or seq missing.
+    """
+    if type(moltype) == str:
+        moltype = cogent3.get_moltype(moltype)
+
+    make_seq = moltype.make_light_seq
+    for name, seq in MinimalFastaParser(
+        infile, strict=strict, label_to_name=label_to_name
+    ):
+        yield name, make_seq(seq, name=name)
+
+
 # labeled fields in the NCBI FASTA records
 NcbiLabels = {"dbj": "DDBJ", "emb": "EMBL", "gb": "GenBank", "ref": "RefSeq"}
 
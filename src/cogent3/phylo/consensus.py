@@ -1,13 +1,21 @@
 #! /usr/bin/env python
-"""This module implements methods for generating consensus trees from a list of trees"""
+"""This module implements methods for generating consensus trees from a list of trees
+
+Splits and clades are encoded as integer bitsets, bit i set if the i-th tip
+is included, which are cheap to hash, compare and combine for large trees.
+"""
 import warnings
 
 from collections import defaultdict
-from itertools import product
+
+import numpy
 
 from cogent3 import make_tree
 from cogent3.core.tree import TreeBuilder
+from cogent3.phylo.consensus_numba import fill_split_differences
+from cogent3.util import parallel as PAR
 from cogent3.util.misc import extend_docstring_from
+from cogent3.util.table import Table
 
 
 __author__ = "Matthew Wakefield"
@@ -87,127 +95,352 @@ def weighted_majority_rule(
 
 @extend_docstring_from(weighted_majority_rule)
 def weighted_rooted_majority_rule(weighted_trees, strict=False, attr="support"):
-    cladecounts = {}
-    edgelengths = {}
-    total = 0
-    for (weight, tree) in weighted_trees:
-        total += weight
-        edges = tree.get_edge_vector()
-        for edge in edges:
-            tips = edge.get_tip_names(includeself=True)
-            tips = frozenset(tips)
-            if tips not in cladecounts:
-                cladecounts[tips] = 0
-            cladecounts[tips] += weight
-            length = edge.length and edge.length * weight
-            if edgelengths.get(tips, None):
-                edgelengths[tips] += length
-            else:
-                edgelengths[tips] = length
-    cladecounts = [(count, clade) for (clade, count) in list(cladecounts.items())]
-    cladecounts.sort()
-    cladecounts.reverse()
-
-    if strict:
-        # Remove any with support < 50%
-        for index, (count, clade) in enumerate(cladecounts):
-            if count <= 0.5 * total:
-                cladecounts = cladecounts[:index]
-                break
-
-    # Remove conflicts
-    accepted_clades = set()
-    counts = {}
-    for (count, clade) in cladecounts:
-        for accepted_clade in accepted_clades:
-            if clade.intersection(accepted_clade) and not (
-                clade.issubset(accepted_clade) or clade.issuperset(accepted_clade)
-            ):
-                break
-        else:
-            accepted_clades.add(clade)
-            counts[clade] = count
-            weighted_length = edgelengths[clade]
-            edgelengths[clade] = weighted_length and weighted_length / count
-
-    nodes = {}
-    queue = []
-    tree_build = TreeBuilder().create_edge
-    for clade in accepted_clades:
-        if len(clade) == 1:
-            tip_name = next(iter(clade))
-            params = {"length": edgelengths[clade], attr: counts[clade]}
-            nodes[tip_name] = tree_build([], tip_name, params)
-        else:
-            queue.append(((len(clade), clade)))
-
-    while queue:
-        queue.sort()
-        (size, clade) = queue.pop(0)
-        new_queue = []
-        for (size2, ancestor) in queue:
-            if clade.issubset(ancestor):
-                new_ancestor = (ancestor - clade) | frozenset([clade])
-                counts[new_ancestor] = counts.pop(ancestor)
-                edgelengths[new_ancestor] = edgelengths.pop(ancestor)
-                ancestor = new_ancestor
-            new_queue.append((len(ancestor), ancestor))
-        children = [nodes.pop(c) for c in clade]
-        assert len([children])
-        nodes[clade] = tree_build(
-            children, None, {attr: counts[clade], "length": edgelengths[clade]}
-        )
-        queue = new_queue
-
-    for root in list(nodes.values()):
-        root.name = "root"  # Yuk
-
-    return [root for root in list(nodes.values())]
+    support = SplitSupport(weighted_trees, rooted=True)
+    return support.consensus_trees(strict=strict, attr=attr)
 
 
 @extend_docstring_from(weighted_majority_rule)
 def weighted_unrooted_majority_rule(weighted_trees, strict=False, attr="support"):
-    # Calculate raw split lengths and weights
-    split_weights = defaultdict(float)
-    split_lengths = defaultdict(float)
-    tips = None
-    for (weight, tree) in weighted_trees:
-        for split, params in list(get_splits(tree).items()):
-            split_weights[split] += weight
-            if params["length"] is None:
-                split_lengths[split] = None
-            else:
-                split_lengths[split] += weight * params["length"]
-        # Check that all trees have the same taxa
-        if tips is None:
-            tips = frozenset.union(*split)
-        elif tips != frozenset.union(*split):
-            raise NotImplementedError("all trees must have the same taxa")
-
-    # Normalise split lengths by split weight and split weights by total weight
-    for split in split_lengths:
-        if not split_lengths[split] is None:
-            split_lengths[split] /= split_weights[split]
-    total_weight = sum(w for w, t in weighted_trees[::-1])
-    weighted_splits = [(w / total_weight, s) for s, w in list(split_weights.items())]
-    weighted_splits.sort(reverse=True)
-
-    # Remove conflicts and any with support < 50% if strict
-    accepted_splits = {}
-    for weight, split in weighted_splits:
-        if strict and weight <= 0.5:
-            break
-
-        for accepted_split in accepted_splits:
-            for s, a in product(split, accepted_split):
-                if s.isdisjoint(a):
-                    break
+    support = SplitSupport(weighted_trees, rooted=False)
+    return support.consensus_trees(strict=strict, attr=attr)
+
+
+def bits_to_names(bits, names):
+    """returns the names corresponding to set bits"""
+    return [names[i] for i, bit in enumerate(reversed(bin(bits)[2:])) if bit == "1"]
+
+
+def get_clade_bits(tree, tip_bits):
+    """returns [(clade, edge), ...] for every edge of tree, in postorder
+
+    Parameters
+    ----------
+    tree
+        a tree
+    tip_bits : dict
+        maps tip names to a unique power of 2
+    """
+    clades = {}
+    result = []
+    for edge in tree.postorder():
+        if edge.children:
+            bits = 0
+            for child in edge.children:
+                bits |= clades[id(child)]
+        else:
+            bits = tip_bits[edge.name]
+        clades[id(edge)] = bits
+        result.append((bits, edge))
+    return result
+
+
+def get_split_bits(tree, tip_bits):
+    """returns {split: length, ...} for the unrooted splits of tree, including
+    those of tips
+
+    Parameters
+    ----------
+    tree
+        a tree
+    tip_bits : dict
+        maps tip names to a unique power of 2
+
+    Notes
+    -----
+    A split is represented by the tips on the side excluding the tip with
+    bit 1, so each split has one encoding regardless of the tree root. The
+    lengths of the 2 edges of a bifurcating root are added.
+    """
+    clades = get_clade_bits(tree, tip_bits)
+    all_tips = clades[-1][0]
+    splits = {}
+    for bits, edge in clades[:-1]:
+        if bits & 1:
+            bits = all_tips ^ bits
+        length = edge.length
+        if bits in splits:
+            # the other edge of a bifurcating root
+            previous = splits[bits]
+            length = None if None in (length, previous) else length + previous
+        splits[bits] = length
+    return splits
+
+
+def _compatible(bits, accepted):
+    """whether bits is compatible with all accepted splits or clades"""
+    for other in accepted:
+        common = bits & other
+        if not common or common == bits or common == other:
+            continue
+        return False
+    return True
+
+
+def _distinct(nodes):
+    """nodes without repeats, in order"""
+    seen = set()
+    result = []
+    for node in nodes:
+        if id(node) not in seen:
+            seen.add(id(node))
+            result.append(node)
+    return result
+
+
+class SplitSupport:
+    """weighted frequencies and mean lengths of the splits, or clades, of a
+    collection of trees"""
+
+    def __init__(self, weighted_trees, rooted=False):
+        """
+        Parameters
+        ----------
+        weighted_trees
+            series of (weight, tree). Trees are visited once.
+        rooted : bool
+            if True, clades of the rooted trees are counted, otherwise
+            unrooted splits. For unrooted, all trees must have the same tips.
+        """
+        self.rooted = rooted
+        self.tip_bits = {}
+        self.weights = defaultdict(int)
+        self.lengths = {}
+        self.total = 0
+        all_tips = None
+        for (weight, tree) in weighted_trees:
+            self.total += weight
+            for name in tree.get_tip_names():
+                if name not in self.tip_bits:
+                    self.tip_bits[name] = 1 << len(self.tip_bits)
+
+            if rooted:
+                splits = [
+                    (bits, edge.length)
+                    for bits, edge in get_clade_bits(tree, self.tip_bits)
+                ]
             else:
+                splits = get_split_bits(tree, self.tip_bits).items()
+                tips = sum(self.tip_bits[n] for n in tree.get_tip_names())
+                if all_tips is None:
+                    all_tips = tips
+                elif tips != all_tips:
+                    raise NotImplementedError("all trees must have the same taxa")
+
+            for bits, length in splits:
+                self.weights[bits] += weight
+                total_length = self.lengths.get(bits, 0.0)
+                if length is None or total_length is None:
+                    self.lengths[bits] = None
+                else:
+                    self.lengths[bits] = total_length + weight * length
+
+        self.names = sorted(self.tip_bits, key=self.tip_bits.get)
+
+    def support(self, bits):
+        """the weight of bits, as a fraction of the total for unrooted"""
+        weight = self.weights[bits]
+        return weight if self.rooted else weight / self.total
+
+    def length(self, bits):
+        """the weighted mean length of bits"""
+        length = self.lengths[bits]
+        return length and length / self.weights[bits]
+
+    def _ordered(self):
+        """splits ordered by decreasing support"""
+        return sorted(self.weights, key=lambda b: (self.weights[b], b), reverse=True)
+
+    def to_table(self, include_tips=False):
+        """returns a Table of the support and mean length of each split
+
+        Parameters
+        ----------
+        include_tips : bool
+            include the splits, or clades, of single tips
+
+        Notes
+        -----
+        For unrooted splits, the smaller side is listed.
+        """
+        all_tips = (1 << len(self.names)) - 1
+        rows = []
+        for bits in self._ordered():
+            side = bits
+            if not self.rooted and 2 * bin(bits).count("1") > len(self.names):
+                side = all_tips ^ bits
+            if not include_tips and bin(side).count("1") == 1:
+                continue
+            rows.append(
+                [
+                    ",".join(bits_to_names(side, self.names)),
+                    self.support(bits),
+                    self.length(bits),
+                ]
+            )
+
+        header = ["clade" if self.rooted else "split", "support", "length"]
+        return Table(header=header, data=rows, title="Split support")
+
+    def consensus_trees(self, strict=False, attr="support"):
+        """Calculate a greedy consensus tree in the sense of Bryant (2003),
+        with branch lengths as per Holland (2006).
+
+        Parameters
+        ----------
+        strict : bool
+            Discard splits or clades with consensus weight <= 0.5.
+        attr : str
+            Edge parameter in which to store consensus weight.
+
+        Returns
+        -------
+        list of trees, which always has length one if unrooted
+        """
+        num_tips = len(self.names)
+        # number of clades, or splits, of a fully resolved tree
+        max_accepted = 2 * num_tips - (1 if self.rooted else 3)
+        accepted = []
+        for bits in self._ordered():
+            if strict and self.weights[bits] <= 0.5 * self.total:
+                break
+            if len(accepted) == max_accepted:
                 break
+            if _compatible(bits, accepted):
+                accepted.append(bits)
+
+        params = {
+            bits: {attr: self.support(bits), "length": self.length(bits)}
+            for bits in accepted
+        }
+        if self.rooted:
+            return self._build(accepted, params)
+
+        tree = self._build(accepted, params, unrooted=True)[0]
+        # Balance the tree for the sake of reproducibility
+        return [tree.balanced()]
+
+    def _build(self, accepted, params, unrooted=False):
+        """returns the trees formed by nesting accepted clades"""
+        edge = TreeBuilder().create_edge
+        all_tips = (1 << len(self.names)) - 1
+        # the current top node containing each tip
+        owners = [None] * len(self.names)
+        for i, name in enumerate(self.names):
+            bits = 1 << i
+            if unrooted and i == 0:
+                bits = all_tips ^ 1
+            owners[i] = edge([], name, params.get(bits, {}))
+
+        for bits in sorted(accepted, key=lambda b: bin(b).count("1")):
+            if bin(bits).count("1") == 1 or (unrooted and bits == all_tips ^ 1):
+                continue
+            indices = [i for i in range(len(self.names)) if bits >> i & 1]
+            node = edge(_distinct([owners[i] for i in indices]), None, params[bits])
+            for i in indices:
+                owners[i] = node
+
+        roots = _distinct(owners)
+        if unrooted:
+            return [edge(roots, "root", {})]
+
+        for root in roots:
+            root.name = "root"  # Yuk
+        return roots
+
+
+class _NontrivialSplits:
+    """callable returning the splits, or clades, of a tree excluding those of
+    single tips"""
+
+    def __init__(self, tip_bits, rooted):
+        self.tip_bits = tip_bits
+        self.rooted = rooted
+
+    def __call__(self, tree):
+        if set(tree.get_tip_names()) != set(self.tip_bits):
+            raise ValueError("trees must have the same tips")
+
+        if self.rooted:
+            splits = {bits for bits, edge in get_clade_bits(tree, self.tip_bits)}
         else:
-            accepted_splits[split] = {attr: weight, "length": split_lengths[split]}
+            splits = get_split_bits(tree, self.tip_bits)
+        # for unrooted, the complement of the first tip is also excluded
+        max_size = len(self.tip_bits) - (not self.rooted)
+        return [b for b in splits if 1 < bin(b).count("1") < max_size]
+
+
+def robinson_foulds(tree1, tree2, rooted=False):
+    """returns the Robinson-Foulds distance between two trees with the same
+    tips, the number of splits, or clades if rooted, found in only one tree
+
+    Splits of single tips are excluded.
+    """
+    tip_bits = {n: 1 << i for i, n in enumerate(sorted(tree1.get_tip_names()))}
+    encode = _NontrivialSplits(tip_bits, rooted)
+    return len(set(encode(tree1)) ^ set(encode(tree2)))
+
 
-    return [get_tree(accepted_splits)]
+def robinson_foulds_matrix(
+    trees, names=None, rooted=False, parallel=False, par_kw=None
+):
+    """returns the Robinson-Foulds distances between all pairs of trees
+
+    Parameters
+    ----------
+    trees
+        series of at least 2 trees with the same tips
+    names
+        names for the trees, defaults to their index as a string
+    rooted : bool
+        if True, compares clades of the rooted trees, otherwise unrooted
+        splits
+    parallel : bool
+        if True, trees are encoded in separate processes
+    par_kw
+        dict of arguments for cogent3.util.parallel.map
+
+    Returns
+    -------
+    DistanceMatrix
+
+    Notes
+    -----
+    The splits of each tree are encoded once, as sorted integers from an
+    index shared by all trees. Pairs are compared by merging these in a
+    compiled function, so memory use is proportional to the number of
+    trees and splits.
+    """
+    from cogent3.evolve.fast_distance import DistanceMatrix
+
+    trees = list(trees)
+    if len(trees) < 2:
+        raise ValueError("at least 2 trees are required")
+    if names is None:
+        names = [str(i) for i in range(len(trees))]
+    if len(names) != len(trees):
+        raise ValueError("number of names does not match the number of trees")
+
+    tip_names = sorted(trees[0].get_tip_names())
+    encode = _NontrivialSplits({n: 1 << i for i, n in enumerate(tip_names)}, rooted)
+    if parallel:
+        par_kw = par_kw or {}
+        tree_splits = PAR.map(encode, trees, **par_kw)
+    else:
+        tree_splits = map(encode, trees)
+
+    index = {}
+    split_ids = []
+    offsets = [0]
+    for splits in tree_splits:
+        ids = sorted(index.setdefault(bits, len(index)) for bits in splits)
+        split_ids.extend(ids)
+        offsets.append(len(split_ids))
+
+    offsets = numpy.array(offsets, dtype=numpy.int64)
+    split_ids = numpy.array(split_ids, dtype=numpy.int64)
+    result = numpy.zeros((len(trees), len(trees)), dtype=float)
+    fill_split_differences(offsets, split_ids, result)
+    return DistanceMatrix(result, names=names)
 
 
 def get_splits(tree):
@@ -0,0 +1,48 @@
+from numba import njit, prange
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Alpha"
+
+
+@njit(cache=True, parallel=True)
+def fill_split_differences(offsets, split_ids, result):
+    """fills result with the number of splits found in only one of each
+    pair of trees
+
+    Parameters
+    ----------
+    offsets
+        the splits of tree i are split_ids[offsets[i]:offsets[i + 1]]
+    split_ids
+        integer split identifiers, sorted within each tree
+    result
+        square array, modified in place
+    """
+    num = len(offsets) - 1
+    for i in prange(num):
+        start_i = offsets[i]
+        end_i = offsets[i + 1]
+        for j in range(i + 1, num):
+            x = start_i
+            y = offsets[j]
+            end_j = offsets[j + 1]
+            shared = 0
+            while x < end_i and y < end_j:
+                if split_ids[x] == split_ids[y]:
+                    shared += 1
+                    x += 1
+                    y += 1
+                elif split_ids[x] < split_ids[y]:
+                    x += 1
+                else:
+                    y += 1
+            diff = end_i - start_i + end_j - offsets[j] - 2 * shared
+            result[i, j] = diff
+            result[j, i] = diff
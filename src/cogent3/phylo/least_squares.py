@@ -3,12 +3,8 @@ import numpy
 
 from numpy.linalg import solve as solve_linear_equations
 
-from .tree_space import TreeEvaluator, ancestry2tree
-from .util import (
-    distance_dict_and_names_to_1D,
-    distance_dict_to_1D,
-    triangular_order,
-)
+from .tree_space import TreeEvaluator, ancestry2tree, grown
+from .util import distance_dict_and_names_to_1D, distance_dict_to_1D
 
 
 __author__ = "Peter Maxwell"
@@ -33,17 +29,24 @@ def _ancestry2paths(A):
     split metric matrix.  The paths will be in the same triangular matrix order
     as produced by distance_dict_and_names_to_1D, provided that the tips appear in
     the correct order in A"""
-    tips = [i for i in range(A.shape[0]) if sum(A[:, i]) == 1]
-    paths = []
-    for (tip1, tip2) in triangular_order(tips):
-        path = A[tip1] ^ A[tip2]
-        paths.append(path)
-    return numpy.array(paths)
+    tips = numpy.flatnonzero(A.sum(axis=0) == 1)
+    # row > column, in row major order, is the triangular order
+    (second, first) = numpy.tril_indices(len(tips), -1)
+    return A[tips[first]] ^ A[tips[second]]
+
+
+def _solve_lengths(X, y):
+    """non-negative lengths from stacked normal equations"""
+    lengths = solve_linear_equations(X, y[..., None])[..., 0]
+    return numpy.maximum(lengths, 0.0)
 
 
 class WLS(TreeEvaluator):
     """(err, best_tree) = WLS(dists).trex()"""
 
+    # trees grown from the same tree are scored together
+    _batch_grown = True
+
     def __init__(self, dists, weights=None):
         """Arguments:
             - dists: a dict with structure (seq1, seq2): distance
@@ -91,6 +94,85 @@ class WLS(TreeEvaluator):
 
         return evaluate
 
+    def make_batch_scorer(self, names):
+        """returns a function scoring a series of ancestry matrices of the
+        same size, as [(err, lengths), ...], in one set of array operations"""
+        dists = distance_dict_and_names_to_1D(self.dists, names)
+        weights = distance_dict_and_names_to_1D(self.weights, names)
+        weights_dists = weights * dists
+
+        def evaluate_batch(ancestries):
+            A = numpy.array([_ancestry2paths(ancestry) for ancestry in ancestries])
+            At = A.transpose(0, 2, 1)
+            X = (At * weights) @ A
+            y = At @ weights_dists
+            lengths = _solve_lengths(X, y)
+            diffs = (A @ lengths[..., None])[..., 0] - dists
+            err = (diffs ** 2).sum(axis=1)
+            return list(zip(err, lengths))
+
+        return evaluate_batch
+
+    def make_grown_scorer(self, names):
+        """returns a function scoring the trees made by adding the last of
+        names to a tree of the others at each of a series of edges.
+
+        The normal equations of a grown tree are those of the tree it was
+        grown from, with the column of the split edge duplicated for the new
+        edge above it, plus the paths to the new tip. So the paths of the
+        original tree are computed once for all edges."""
+        dists = distance_dict_and_names_to_1D(self.dists, names)
+        weights = distance_dict_and_names_to_1D(self.weights, names)
+        # paths to the new tip are last in triangular order
+        num_old = len(dists) - (len(names) - 1)
+        (old_dists, new_dists) = (dists[:num_old], dists[num_old:])
+        (old_weights, new_weights) = (weights[:num_old], weights[num_old:])
+
+        def evaluate_grown(old_ancestry, split_edges):
+            S = _ancestry2paths(old_ancestry)
+            G = numpy.dot(old_weights * S.T, S)
+            h = numpy.dot(S.T, old_weights * old_dists)
+
+            # edge indices of the new tip and its parent, as for grown()
+            num_edges = len(old_ancestry)
+            (sibling, parent) = (num_edges, num_edges + 1)
+            edges = numpy.array(split_edges)
+            rows = numpy.arange(len(edges))
+            tips = old_ancestry[numpy.flatnonzero(old_ancestry.sum(axis=0) == 1)]
+            below = tips[:, edges].T
+
+            # R[r, k] is the path from old tip k to the new tip when grown at
+            # edges[r], which excludes the split edge unless k is below it
+            R = numpy.zeros((len(edges), len(tips), num_edges + 2))
+            R[:, :, :num_edges] = tips[None] ^ old_ancestry[edges][:, None, :]
+            R[rows, :, edges] = below
+            R[:, :, sibling] = 1
+            R[:, :, parent] = 1 - below
+
+            X = numpy.zeros((len(edges), num_edges + 2, num_edges + 2))
+            X[:, :num_edges, :num_edges] = G
+            X[:, parent, :num_edges] = G[edges]
+            X[:, :num_edges, parent] = G[edges]
+            X[:, parent, parent] = G[edges, edges]
+            Rt = R.transpose(0, 2, 1)
+            X += (Rt * new_weights) @ R
+            y = numpy.zeros((len(edges), num_edges + 2))
+            y[:, :num_edges] = h
+            y[:, parent] = h[edges]
+            y += Rt @ (new_weights * new_dists)
+            lengths = _solve_lengths(X, y)
+
+            # paths between old tips include the parent edge if they include
+            # the split edge
+            old_lengths = lengths[:, :num_edges].copy()
+            old_lengths[rows, edges] += lengths[:, parent]
+            err = ((old_lengths @ S.T - old_dists) ** 2).sum(axis=1)
+            err += (((R @ lengths[..., None])[..., 0] - new_dists) ** 2).sum(axis=1)
+            ancestries = [grown(old_ancestry, edge) for edge in split_edges]
+            return list(zip(err, lengths, ancestries))
+
+        return evaluate_grown
+
     def result2output(self, err, ancestry, lengths, names):
         return (err, ancestry2tree(ancestry, lengths, names))
 
@@ -17,6 +17,14 @@ __email__ = "pm67nz@gmail.com"
 __status__ = "Production"
 
 
+def _no_lengths(ancestry):
+    return (None, None)
+
+
+def _no_wls_scorer(names):
+    return _no_lengths
+
+
 class ML(TreeEvaluator):
     """(err, best_tree) = ML(model, alignment, [dists]).trex()
 
@@ -29,15 +37,15 @@ class ML(TreeEvaluator):
         self.opt_args = opt_args
         self.names = alignment.names
         self.alignment = alignment
+        # no lambdas, so candidates can be evaluated in other processes
         if hasattr(model, "make_likelihood_function"):
-            self.lf_factory = lambda tree: model.make_likelihood_function(tree)
+            self.lf_factory = model.make_likelihood_function
         else:
             self.lf_factory = model
         if dists:
             self.wlsMakeTreeScorer = WLS(dists).make_tree_scorer
         else:
-            fake_wls = lambda a: (None, None)
-            self.wlsMakeTreeScorer = lambda n: fake_wls
+            self.wlsMakeTreeScorer = _no_wls_scorer
 
     def evaluate_tree(self, tree):
         names = tree.get_tip_names()
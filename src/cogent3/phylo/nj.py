@@ -7,6 +7,8 @@ This is based on the algorithm of Studier and Keppler, as described in the book
 Biological sequence analysis by Durbin et al
 
 Generalised as described by Pearson, Robins & Zhang, 1999.
+
+fast_nj is a single tree implementation for large numbers of taxa.
 """
 
 
@@ -15,6 +17,7 @@ from collections import deque
 import numpy
 
 from cogent3.core.tree import TreeBuilder
+from cogent3.phylo.nj_numba import min_join_pair
 from cogent3.phylo.tree_collection import ScoredTreeCollection
 from cogent3.phylo.util import distance_dict_to_2D
 from cogent3.util import progress_display as UI
@@ -174,7 +177,7 @@ def uniq_neighbour_joins(trees, encode_partition):
 @UI.display_wrap
 def gnj(dists, keep=None, dkeep=0, ui=None):
     """Arguments:
-        - dists: dict of (name1, name2): distance
+        - dists: dict of (name1, name2): distance, or a DistanceMatrix
         - keep: number of best partial trees to keep at each iteration,
           and therefore to return.  Same as Q parameter in original GNJ paper.
         - dkeep: number of diverse partial trees to keep at each iteration,
@@ -182,11 +185,6 @@ def gnj(dists, keep=None, dkeep=0, ui=None):
     Result:
         - a sorted list of (tree length, tree) tuples
     """
-    try:
-        dists = dists.to_dict()
-    except AttributeError:
-        pass
-
     (names, d) = distance_dict_to_2D(dists)
 
     if keep is None:
@@ -285,8 +283,76 @@ def gnj(dists, keep=None, dkeep=0, ui=None):
 
 def nj(dists, show_progress=True):
     """Arguments:
-        - dists: dict of (name1, name2): distance
+        - dists: dict of (name1, name2): distance, or a DistanceMatrix
     """
     (result,) = gnj(dists, keep=1, show_progress=show_progress)
     (score, tree) = result
     return tree
+
+
+@UI.display_wrap
+def fast_nj(dists, ui=None):
+    """neighbour joining tree, equivalent to nj but faster for many taxa
+
+    Parameters
+    ----------
+    dists
+        dict of (name1, name2): distance, or a DistanceMatrix
+
+    Returns
+    -------
+    PhyloNode
+
+    Notes
+    -----
+    Only a single tree is built, so the distance matrix is updated in place
+    and the best join is found by a compiled search of the matrix. Branch
+    lengths and topology are those of nj. If several joins are equally
+    good, nj picks one arbitrarily while fast_nj picks the first in
+    row major order.
+    """
+    (names, d) = distance_dict_to_2D(dists)
+    if len(names) < 3:
+        raise ValueError("at least 3 taxa are required for a neighbour joining tree")
+
+    d = numpy.array(d, dtype=float)
+    constructor = TreeBuilder().create_edge
+    nodes = [constructor([], name, {}) for name in names]
+    num = len(names)
+    r = numpy.sum(d, axis=0)
+    for L in range(num, 3, -1):
+        if L % 100 == 0:
+            ui.display(msg=f" size {L}/{num}", progress=(num - L) / num)
+
+        # operations as for PartialTree.join, on the leading L x L block
+        current = d[:L, :L]
+        r = r[:L]
+        i, j = min_join_pair(current, r, L)
+        ij_dist_diff = (r[i] - r[j]) / (L - 2.0)
+        nodes[i].length = max(0.0, 0.5 * (current[i, j] + ij_dist_diff))
+        nodes[j].length = max(0.0, 0.5 * (current[i, j] - ij_dist_diff))
+
+        # store new node at i
+        new_dists = 0.5 * (current[i] + current[j] - current[i, j])
+        # row sums are updated rather than recomputed
+        r += new_dists - current[i] - current[j]
+        r[i] = numpy.sum(new_dists)
+        current[:, i] = new_dists
+        current[i, :] = new_dists
+        current[i, i] = 0.0
+        nodes[i] = constructor([nodes[i], nodes[j]], None, {})
+
+        # eliminate j
+        current[j, :] = current[L - 1, :]
+        current[:, j] = current[:, L - 1]
+        r[j] = r[L - 1]
+        nodes[j] = nodes[L - 1]
+        nodes.pop()
+
+    current = d[:3, :3]
+    lengths = numpy.sum(current, axis=0) - numpy.sum(current) / 4
+    for node, length in zip(nodes, lengths):
+        node.length = max(0.0, length)
+    tree = constructor(nodes, None, {})
+    tree.name = "root"
+    return tree
@@ -0,0 +1,54 @@
+import numpy
+
+from numba import njit, prange
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Alpha"
+
+
+@njit(cache=True, parallel=True)
+def min_join_pair(d, r, size):
+    """returns i, j (i < j) minimising the neighbour joining criterion
+
+    Parameters
+    ----------
+    d
+        distance matrix, only the leading size x size block is used
+    r
+        row sums of that block
+    size
+        number of current nodes
+
+    Notes
+    -----
+    The criterion is d[i, j] - (r[i] + r[j]) / (size - 2). Of equal values,
+    the first in row major order is returned.
+    """
+    denom = size - 2.0
+    # best of each row, so rows can be searched in parallel
+    row_best = numpy.empty(size - 1)
+    row_col = numpy.empty(size - 1, dtype=numpy.int64)
+    for i in prange(size - 1):
+        r_i = r[i]
+        best = d[i, i + 1] - (r_i + r[i + 1]) / denom
+        best_j = i + 1
+        for j in range(i + 2, size):
+            q = d[i, j] - (r_i + r[j]) / denom
+            if q < best:
+                best = q
+                best_j = j
+        row_best[i] = best
+        row_col[i] = best_j
+
+    best_i = 0
+    for i in range(1, size - 1):
+        if row_best[i] < row_best[best_i]:
+            best_i = i
+    return best_i, row_col[best_i]
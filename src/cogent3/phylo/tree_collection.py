@@ -46,6 +46,18 @@ class ScoredTreeCollection(_UserList):
             strict = True
         return consensus.weighted_majority_rule(self, strict, method=method)
 
+    def get_rf_distances(self, rooted=False, parallel=False, par_kw=None):
+        """returns a DistanceMatrix of the Robinson-Foulds distances between
+        all pairs of trees, named by their index in the collection.
+
+        See consensus.robinson_foulds_matrix."""
+        return consensus.robinson_foulds_matrix(
+            [tree for (score, tree) in self],
+            rooted=rooted,
+            parallel=parallel,
+            par_kw=par_kw,
+        )
+
 
 class UsefullyScoredTreeCollection(ScoredTreeCollection):
     def scored_tree_format(self, tree, score):
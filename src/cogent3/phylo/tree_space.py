@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import heapq
 import itertools
 
 import numpy
@@ -7,6 +8,7 @@ import numpy
 from cogent3.core.tree import TreeBuilder
 from cogent3.phylo.tree_collection import ScoredTreeCollection
 from cogent3.util import checkpointing
+from cogent3.util import parallel as PAR
 from cogent3.util import progress_display as UI
 
 
@@ -125,12 +127,87 @@ def grown(B, split_edge):
     return A
 
 
+class _CandidateScorer:
+    """picklable callable returning the scores of trees grown from one tree,
+    so candidates can be evaluated in other processes"""
+
+    def __init__(self, evaluator, names):
+        self.evaluator = evaluator
+        self.names = names
+        self._evaluate = None
+
+    def __getstate__(self):
+        # the scorer is remade in each process
+        state = self.__dict__.copy()
+        state["_evaluate"] = None
+        return state
+
+    def __call__(self, spec):
+        if self._evaluate is None:
+            self._evaluate = self.evaluator.make_grown_scorer(self.names)
+        (tree_ordinal, old_ancestry, split_edges) = spec
+        results = self._evaluate(old_ancestry, split_edges)
+        return [
+            (err, tree_ordinal, split_edge, lengths, ancestry)
+            for (split_edge, (err, lengths, ancestry)) in zip(split_edges, results)
+        ]
+
+
+def _pruned(ui, scorer, specs, bounds, k, parallel=False, par_kw=None, **kw):
+    """generator of scored candidates, skipping those grown from trees whose
+    score, in bounds, is no better than the k-th best candidate so far.
+
+    In parallel, specs are submitted to one pool as results are received, so
+    specs already submitted when the k-th best improves are still evaluated."""
+    kept = []  # negated errors of the k best, as a max heap
+
+    def include(spec):
+        bound = bounds[spec[0]]
+        return len(kept) < k or bound is None or bound < -kept[0]
+
+    if parallel:
+        par_kw = dict(par_kw or {})
+        # specs are submitted one at a time
+        par_kw.pop("chunksize", None)
+        results = PAR.imap_lazy(scorer, specs, include=include, **par_kw)
+    else:
+        results = (scorer(spec) for spec in specs if include(spec))
+
+    results = ui.series(results, count=len(specs), **kw)
+    for result in itertools.chain.from_iterable(results):
+        if len(kept) < k:
+            heapq.heappush(kept, -result[0])
+        elif result[0] < -kept[0]:
+            heapq.heapreplace(kept, -result[0])
+        yield result
+
+
 class TreeEvaluator(object):
     """Subclass must provide make_tree_scorer and result2output"""
 
+    # if True, all trees grown from a tree are scored in one call of the
+    # function from make_grown_scorer, otherwise one call per tree
+    _batch_grown = False
+
     def results2output(self, results):
         return ScoredTreeCollection(results)
 
+    def make_grown_scorer(self, names):
+        """returns a function scoring the trees made by adding the last of
+        names to a tree of the others at each of a series of edges, as
+        [(err, lengths, ancestry), ...]"""
+        evaluate = self.make_tree_scorer(names)
+
+        def evaluate_grown(old_ancestry, split_edges):
+            results = []
+            for split_edge in split_edges:
+                ancestry = grown(old_ancestry, split_edge)
+                (err, lengths) = evaluate(ancestry)
+                results.append((err, lengths, ancestry))
+            return results
+
+        return evaluate_grown
+
     def evaluate_topology(self, tree):
         """Optimal (score, tree) for the one topology 'tree'"""
         (ancestry, names, lengths) = tree2ancestry(tree)
@@ -171,6 +248,9 @@ class TreeEvaluator(object):
         return_all=False,
         filename=None,
         interval=None,
+        parallel=False,
+        par_kw=None,
+        prune=False,
         show_progress=False,
         ui=None,
     ):
@@ -180,6 +260,16 @@ class TreeEvaluator(object):
         'start' is an optional list of initial trees.  Each of the trees must
         contain the same tips.
         'filename' and 'interval' control checkpointing.
+        'parallel' evaluates candidate trees in separate processes, 'par_kw'
+        is a dict of arguments for cogent3.util.parallel.imap. Results are
+        the same as for serial evaluation.
+        'prune' skips candidates grown from a tree which scores no better
+        than the k-th best candidate so far. This assumes adding a tip
+        cannot improve a score, which holds for exact optima but not
+        necessarily for fitted lengths, so the result may differ from that
+        without pruning. With 'parallel', trees are submitted to one pool
+        per tree size as results arrive, so a few more may be evaluated
+        than in serial.
 
         Advanced step-wise addition algorithm
         M. J. Wolf, S. Easteal, M. Kahn, B. D. McKay, and L. S. Jermiin.
@@ -243,28 +333,34 @@ class TreeEvaluator(object):
 
         # For each tree size, grow at each edge of each tree. Keep best k.
         for n in range(init_tree_size + 1, tree_size + 1):
-            evaluate = self.make_tree_scorer(names[:n])
-
-            def grown_tree(spec):
-                (tree_ordinal, tree, split_edge) = spec
-                (old_err, old_lengths, old_ancestry) = tree
-                ancestry = grown(old_ancestry, split_edge)
-                (err, lengths) = evaluate(ancestry)
-                return (err, tree_ordinal, split_edge, lengths, ancestry)
-
-            specs = [
-                (i, tree, edge)
-                for (i, tree) in enumerate(trees)
-                for edge in range(n * 2 - 5)
-            ]
-
-            candidates = ui.imap(
-                grown_tree,
-                specs,
+            grown_tree = _CandidateScorer(self, names[:n])
+
+            # ties in score are resolved by tree and edge order, so results
+            # do not depend on the order of evaluation
+            if self._batch_grown:
+                specs = [
+                    (i, ancestry, list(range(n * 2 - 5)))
+                    for (i, (err, lengths, ancestry)) in enumerate(trees)
+                ]
+            else:
+                specs = [
+                    (i, ancestry, [edge])
+                    for (i, (err, lengths, ancestry)) in enumerate(trees)
+                    for edge in range(n * 2 - 5)
+                ]
+            imap_kw = dict(
+                parallel=parallel,
+                par_kw=par_kw,
                 noun=("%s leaf tree" % n),
                 start=work_done[n - 1] / total_work,
                 end=work_done[n] / total_work,
             )
+            if prune:
+                bounds = [err for (err, lengths, ancestry) in trees]
+                candidates = _pruned(ui, grown_tree, specs, bounds, k, **imap_kw)
+            else:
+                candidates = ui.imap(grown_tree, specs, **imap_kw)
+                candidates = itertools.chain.from_iterable(candidates)
 
             best = ismallest(candidates, k)
 
@@ -4,9 +4,9 @@ import numpy
 
 
 Float = numpy.core.numerictypes.sctype2char(float)
-# Distance matricies are presently represented as simple dictionaries, which
-# need to be converted into numpy arrays before being fed into phylogenetic
-# reconstruction algorithms.
+# Distance matricies are represented as simple dictionaries or as a
+# DistanceMatrix, which need to be converted into numpy arrays before being fed
+# into phylogenetic reconstruction algorithms.
 
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2020, The Cogent Project"
@@ -49,9 +49,41 @@ def lookup_symmetric_dict(dists, a, b):
         raise ValueError("d[%s,%s] != d[%s,%s]" % (a, b, b, a))
 
 
+def distance_matrix_to_2D(dists):
+    """(names, dists). The square array of a DistanceMatrix, which is
+    symmetrised and given a zero diagonal only if needed.
+
+    As for dicts, a distance missing (NaN) in one triangle is taken from the
+    other, and contradictory distances raise a ValueError."""
+    names = list(dists.template.names[0])
+    d = numpy.asarray(dists.array, dtype=Float)
+    diag = d.diagonal()
+    if diag.any() or numpy.isnan(diag).any():
+        d = d.copy()
+        numpy.fill_diagonal(d, 0.0)
+
+    missing = numpy.isnan(d)
+    if missing.any():
+        d = numpy.where(missing, d.T, d)
+        missing = numpy.isnan(d)
+        if missing.any():
+            i, j = numpy.argwhere(missing)[0]
+            raise KeyError((names[i], names[j]))
+
+    contradict = d != d.T
+    if contradict.any():
+        i, j = numpy.argwhere(contradict)[0]
+        a, b = names[i], names[j]
+        raise ValueError("d[%s,%s] != d[%s,%s]" % (a, b, b, a))
+    return (names, d)
+
+
 def distance_dict_to_2D(dists):
     """(names, dists).  Distances converted into a straightforward distance
-    matrix"""
+    matrix. dists can also be a DistanceMatrix, see distance_matrix_to_2D"""
+    if hasattr(dists, "template"):
+        return distance_matrix_to_2D(dists)
+
     names = names_from_distance_dict(dists)
     L = len(names)
     d = numpy.zeros([L, L], Float)
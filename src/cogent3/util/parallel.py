@@ -10,6 +10,8 @@ import threading
 import time
 import warnings
 
+from collections import deque
+
 import numpy
 
 from cogent3.util.misc import extend_docstring_from
@@ -97,31 +99,8 @@ def set_default_chunksize(s, max_workers):
     return chunksize
 
 
-def imap(f, s, max_workers=None, use_mpi=False, if_serial="raise", chunksize=None):
-    """
-    Parameters
-    ----------
-    f : callable
-        function that operates on values in s
-    s : iterable
-        series of inputs to f
-    max_workers : int or None
-        maximum number of workers. Defaults to 1-maximum available.
-    use_mpi : bool
-        use MPI for parallel execution
-    if_serial : str
-        action to take if conditions will result in serial execution. Valid
-        values are 'raise', 'ignore', 'warn'. Defaults to 'raise'.
-    chunksize : int or None
-        Size of data chunks executed by worker processes. Defaults to None
-        where stable chunksize is determined by set_default_chunksize()
-
-    Returns
-    -------
-    imap is a generator yielding result of f(s[i]), map returns the result
-    series
-    """
-
+def _get_executor(max_workers, use_mpi, if_serial):
+    """returns the executor and number of workers for imap"""
     if_serial = if_serial.lower()
     assert if_serial in ("ignore", "raise", "warn"), f"invalid choice '{if_serial}'"
 
@@ -149,26 +128,99 @@ def imap(f, s, max_workers=None, use_mpi=False, if_serial="raise", chunksize=Non
             )
 
         max_workers = min(max_workers, COMM.Get_attr(MPI.UNIVERSE_SIZE) - 1)
+        return MPIfutures.MPIPoolExecutor(max_workers=max_workers), max_workers
 
-        if not chunksize:
-            chunksize = set_default_chunksize(s, max_workers)
+    if not max_workers:
+        max_workers = multiprocessing.cpu_count() - 1
+    assert max_workers < multiprocessing.cpu_count()
+    return concurrentfutures.ProcessPoolExecutor(max_workers), max_workers
 
-        with MPIfutures.MPIPoolExecutor(max_workers=max_workers) as executor:
-            for result in executor.map(f, s, chunksize=chunksize):
-                yield result
-    else:
-        if not max_workers:
-            max_workers = multiprocessing.cpu_count() - 1
-        assert max_workers < multiprocessing.cpu_count()
 
-        if not chunksize:
-            chunksize = set_default_chunksize(s, max_workers)
+def imap(f, s, max_workers=None, use_mpi=False, if_serial="raise", chunksize=None):
+    """
+    Parameters
+    ----------
+    f : callable
+        function that operates on values in s
+    s : iterable
+        series of inputs to f
+    max_workers : int or None
+        maximum number of workers. Defaults to 1-maximum available.
+    use_mpi : bool
+        use MPI for parallel execution
+    if_serial : str
+        action to take if conditions will result in serial execution. Valid
+        values are 'raise', 'ignore', 'warn'. Defaults to 'raise'.
+    chunksize : int or None
+        Size of data chunks executed by worker processes. Defaults to None
+        where stable chunksize is determined by set_default_chunksize()
+
+    Returns
+    -------
+    imap is a generator yielding result of f(s[i]), map returns the result
+    series
+    """
+
+    executor, max_workers = _get_executor(max_workers, use_mpi, if_serial)
+    if not chunksize:
+        chunksize = set_default_chunksize(s, max_workers)
+
+    if not use_mpi:
+        f = PicklableAndCallable(f)
+
+    with executor:
+        for result in executor.map(f, s, chunksize=chunksize):
+            yield result
+
 
+def imap_lazy(f, s, include=None, max_workers=None, use_mpi=False, if_serial="raise"):
+    """
+    Parameters
+    ----------
+    f : callable
+        function that operates on values in s
+    s : iterable
+        series of inputs to f
+    include : callable or None
+        called with each value of s just before it is submitted to the
+        workers, the value is skipped if this returns False
+    max_workers : int or None
+        maximum number of workers. Defaults to 1-maximum available.
+    use_mpi : bool
+        use MPI for parallel execution
+    if_serial : str
+        action to take if conditions will result in serial execution. Valid
+        values are 'raise', 'ignore', 'warn'. Defaults to 'raise'.
+
+    Returns
+    -------
+    generator yielding result of f(s[i]) for included values, in order
+
+    Notes
+    -----
+    Unlike imap, values are submitted only as results are consumed, keeping
+    about twice as many values as workers in progress. include can therefore
+    depend on the results consumed so far, e.g. to skip values that can no
+    longer affect a result.
+    """
+    executor, max_workers = _get_executor(max_workers, use_mpi, if_serial)
+    if not use_mpi:
         f = PicklableAndCallable(f)
 
-        with concurrentfutures.ProcessPoolExecutor(max_workers) as executor:
-            for result in executor.map(f, s, chunksize=chunksize):
-                yield result
+    max_pending = 2 * max(max_workers, 1)
+    values = iter(s)
+    pending = deque()
+    with executor:
+        while True:
+            for value in values:
+                if include is None or include(value):
+                    pending.append(executor.submit(f, value))
+                if len(pending) >= max_pending:
+                    break
+
+            if not pending:
+                break
+            yield pending.popleft().result()
 
 
 @extend_docstring_from(imap)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""throughput of converting sequences to alphabet indices"""
+import time
+
+import numpy
+
+from cogent3 import DNA
+from cogent3.core.alignment import ArrayAlignment
+from cogent3.evolve.likelihood_tree import make_likelihood_tree_leaf
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def _random_seqs(num_seqs, length, seed=0):
+    rng = numpy.random.RandomState(seed)
+    chars = numpy.array(list("TCAG"))
+    return {
+        f"s{i}": "".join(chars[rng.randint(0, 4, size=length)]) for i in range(num_seqs)
+    }
+
+
+def _rate(func, num_bases, repeats=3):
+    """returns millions of bases per second, best of repeats"""
+    best = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return num_bases / best / 1e6
+
+
+def construction(num_seqs, length):
+    data = _random_seqs(num_seqs, length)
+    return _rate(lambda: ArrayAlignment(data, moltype=DNA), num_seqs * length)
+
+
+def to_indices(length):
+    seq = _random_seqs(1, length)["s0"]
+    return _rate(lambda: DNA.alphabet.to_indices(seq), length)
+
+
+def from_seq_to_array(length, word_length=1):
+    alpha = DNA.alphabet.get_word_alphabet(word_length)
+    seq = DNA.make_seq(_random_seqs(1, length)["s0"])
+    return _rate(lambda: alpha.from_seq_to_array(seq), length)
+
+
+def likelihood_leaf(length, word_length=1):
+    alpha = DNA.alphabet.get_word_alphabet(word_length)
+    seq = DNA.make_seq(_random_seqs(1, length)["s0"])
+    return _rate(lambda: make_likelihood_tree_leaf(seq, alpha, "s0"), length)
+
+
+if __name__ == "__main__":
+    template = "%-28s %10s %12s"
+    print("millions of bases per second")
+    print(template % ("task", "length", "rate"))
+    for length in [999, 9999, 99999]:
+        print(
+            template
+            % ("ArrayAlignment(50 seqs)", length, "%.2f" % construction(50, length))
+        )
+        print(template % ("to_indices", length, "%.2f" % to_indices(length)))
+        print(
+            template
+            % (
+                "from_seq_to_array(codon)",
+                length,
+                "%.2f" % from_seq_to_array(length, 3),
+            )
+        )
+        print(template % ("likelihood leaf", length, "%.2f" % likelihood_leaf(length)))
@@ -4,7 +4,7 @@ from unittest import TestCase, main
 
 from numpy.testing import assert_allclose
 
-from cogent3 import DNA, PROTEIN, make_unaligned_seqs
+from cogent3 import DNA, PROTEIN, make_aligned_seqs, make_unaligned_seqs
 from cogent3.app import align
 from cogent3.app import dist as dist_app
 from cogent3.app import io, sample
@@ -116,6 +116,45 @@ class FastSlowDistTests(TestCase):
         with self.assertRaises(ValueError):
             fast_slow_dist = dist_app.fast_slow_dist(fast_calc="GTR")
 
+    def test_out_dir(self):
+        """fast distances written to disk in tiles"""
+        from tempfile import TemporaryDirectory
+
+        data = {
+            "Human": "GCCAGCTCATTACAGCATGAGAACAG",
+            "Bandicoot": "NACTCATTAATGCTTGAAACCAGCAG",
+            "Rhesus": "GCCAGCTCATTACAGCATGAGAACAG",
+            "FlyingFox": "GCCAGCTCTTTACAGCATGAGAACAG",
+            "Mouse": "GCCAGCTCTTTACAGAATGAGATCAG",
+        }
+        aln = make_aligned_seqs(data, moltype=DNA, source="a/brca1.fa")
+        with TemporaryDirectory() as dirname:
+            app = dist_app.fast_slow_dist(
+                fast_calc="tn93", moltype="dna", out_dir=dirname, tile_size=2
+            )
+            got = app(aln)
+            self.assertTrue(os.path.exists(os.path.join(dirname, "brca1")))
+            expect = dist_app.fast_slow_dist(fast_calc="tn93", moltype="dna")(aln)
+            self.assertEqual(got.names, expect.names)
+            assert_allclose(got.to_condensed(), expect.to_condensed())
+
+            # without a source, alignments are written to distinct directories
+            del data["Bandicoot"]
+            for aln in (
+                make_aligned_seqs(data, moltype=DNA),
+                make_aligned_seqs(data, moltype=DNA)[:20],
+            ):
+                got = app(aln)
+                expect = dist_app.fast_slow_dist(fast_calc="tn93", moltype="dna")(aln)
+                assert_allclose(got.to_condensed(), expect.to_condensed())
+            self.assertEqual(len(os.listdir(dirname)), 3)
+            # the same sequences are reused
+            app(make_aligned_seqs(data, moltype=DNA))
+            self.assertEqual(len(os.listdir(dirname)), 3)
+
+        with self.assertRaises(ValueError):
+            dist_app.fast_slow_dist(distance="TN93", out_dir="somewhere")
+
     def test_composable_apps(self):
         """tests two composable apps"""
         composable_apps = _get_all_composable_apps()
@@ -449,6 +449,23 @@ class TranslateTests(TestCase):
         expect = {"seq1": "AAATTTCCC", "seq2": "AAATTT"}
         self.assertEqual(got.to_dict(), expect)
 
+    def test_consensus(self):
+        """consensus app returns majority or IUPAC consensus sequence"""
+        data = {"s1": "ACGTA-", "s2": "ACCTAA", "s3": "ATGTA-"}
+        for array_align in (True, False):
+            aln = make_aligned_seqs(data=data, moltype="dna", array_align=array_align)
+            aln.info.source = "blah"
+            got = sample.consensus()(aln)
+            self.assertEqual(str(got), "ACGTA-")
+            self.assertEqual(got.name, "blah")
+            self.assertEqual(got.moltype.label, "dna")
+            got = sample.consensus(method="iupac", name="cons")(aln)
+            self.assertEqual(str(got), "AYSTA?")
+            self.assertEqual(got.name, "cons")
+
+        with self.assertRaises(AssertionError):
+            sample.consensus(method="mode")
+
 
 if __name__ == "__main__":
     main()
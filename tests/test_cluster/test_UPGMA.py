@@ -12,6 +12,7 @@ from cogent3.cluster.UPGMA import (
     condense_node_order,
     find_smallest_index,
     inputs_from_dict_array,
+    pgma,
     upgma,
 )
 from cogent3.core.tree import PhyloNode
@@ -98,6 +99,46 @@ class UPGMATests(TestCase):
         )
         self.assertTrue(cluster.same_topology(expect))
 
+    def test_pgma(self):
+        """pgma matches upgma, and weights by cluster size if not weighted"""
+        from cogent3.evolve.fast_distance import DistanceMatrix
+
+        expect = upgma(self.pairwise_distances)
+        got = pgma(self.pairwise_distances)
+        self.assertEqual(
+            got.get_newick(with_distances=True, with_node_names=True),
+            expect.get_newick(with_distances=True, with_node_names=True),
+        )
+        dmat = DistanceMatrix(self.pairwise_distances)
+        self.assertEqual(str(pgma(dmat)), str(expect))
+
+        # distance between abc and de is the mean of the 6 pairs, 18
+        got = pgma(self.pairwise_distances, weighted=False)
+        self.assertEqual(
+            str(got),
+            "(((a:0.5,b:0.5)edge.1:1.75,c:2.25)edge.0:6.75,"
+            "(d:1.0,e:1.0)edge.2:8.0)root;",
+        )
+
+        # many equal distances
+        rng = numpy.random.RandomState(3)
+        names = [f"s{i:02d}" for i in range(40)]
+        data = rng.randint(1, 5, size=(40, 40)).astype(float)
+        data = data + data.T
+        dists = {
+            (a, b): data[i, j]
+            for i, a in enumerate(names)
+            for j, b in enumerate(names)
+            if i != j
+        }
+        self.assertEqual(
+            pgma(dists).get_newick(with_distances=True),
+            upgma(dists).get_newick(with_distances=True),
+        )
+
+        with self.assertRaises(ValueError):
+            pgma({("a", "b"): numpy.nan, ("b", "a"): numpy.nan})
+
     def test_find_smallest_index(self):
         """find_smallest_index returns the index of smallest value in array
         """
@@ -23,6 +23,7 @@ from cogent3.core.alignment import (
     Aligned,
     Alignment,
     ArrayAlignment,
+    CompactSequenceCollection,
     DataError,
     SequenceCollection,
     _SequenceCollectionBase,
@@ -627,6 +628,27 @@ class SequenceCollectionBaseTests(object):
         got = frozenset(frozenset(s) for s in got)
         self.assertEqual(got, expect)
 
+    def test_get_identical_sets_many(self):
+        """masked identical sets match brute force pairwise comparison"""
+        data = {
+            "a": "ACGTACGTNN",
+            "b": "ACGTACGTAC",
+            "c": "ACGTACGTAC",
+            "d": "ACGTNCGTAG",
+            "e": "RCGTACGTAG",
+            "f": "TTTTTTTTTT",
+            "g": "TTTTTTTTTT",
+            "h": "TTTTT-TTTT",
+            "i": "GGGGGGGGGG",
+        }
+        seqs = self.Class(data=data, moltype=DNA)
+        got = seqs.get_identical_sets(mask_degen=True)
+        got = frozenset(frozenset(s) for s in got)
+        # grouping is greedy, b and d differ but both match a
+        expect = [{"a", "b", "c", "d", "e"}, {"f", "g", "h"}]
+        expect = frozenset(frozenset(s) for s in expect)
+        self.assertEqual(got, expect)
+
     def test_get_similar(self):
         """SequenceCollection get_similar should get all sequences close to target seq"""
         aln = self.many
@@ -1321,6 +1343,27 @@ class SequenceCollectionBaseTests(object):
             for seq in new.seqs:
                 self.assertFalse("-" in str(seq.data))
 
+    def test_scan_pssms(self):
+        """scan_pssms scores match apply_pssm"""
+        from cogent3.parse import jaspar
+
+        _, pwm = jaspar.read("data/sample.jaspar")
+        pssm = pwm.to_pssm()
+        data = {
+            "a": "GCCAGGGGGGAAAGGGAGAA",
+            "b": "GCCCTTCAAATTTGGTTTCT",
+            "c": "AGCGAGTATNCACGCACAGA",
+        }
+        seqs = self.Class(data=data, moltype=DNA)
+        expect = seqs.apply_pssm(pssm=pssm, show_progress=False)
+        hits = seqs.scan_pssms([pssm, pssm], top_k=1, names=["c", "a"])
+        self.assertEqual(hits["pssm"].tolist(), [0, 0, 1, 1])
+        self.assertEqual(hits["seq"].tolist(), [0, 1, 0, 1])
+        assert_allclose(hits["score"][:2], expect[[2, 0]].max(axis=1))
+        self.assertEqual(
+            hits["start"][:2].tolist(), expect[[2, 0]].argmax(axis=1).tolist()
+        )
+
     def test_apply_pssm(self):
         """should successfully produce pssm scores"""
         from cogent3.parse import jaspar, cisbp
@@ -1429,6 +1472,55 @@ class SequenceCollectionTests(SequenceCollectionBaseTests, TestCase):
     Should not test alignment-specific features.
     """
 
+    def test_counts_per_seq_matches_seq_counts(self):
+        """counts per seq are the same as from individual sequences"""
+        data = {
+            "a": "ACGTNNRY-?ACG",
+            "b": "AC--GGRTTAAC",
+            "c": "G",
+            "d": "TTTTGGCCAAGGTT",
+        }
+        coll = self.Class(data=data, moltype="dna")
+        for motif_length in (1, 2, 3):
+            for include_ambiguity in (False, True):
+                for allow_gap in (False, True):
+                    kwargs = dict(
+                        motif_length=motif_length,
+                        include_ambiguity=include_ambiguity,
+                        allow_gap=allow_gap,
+                    )
+                    got = coll.counts_per_seq(**kwargs).to_dict()
+                    for name in coll.names:
+                        expect = coll.get_seq(name).counts(**kwargs)
+                        got_seq = {m: c for m, c in got[name].items() if c}
+                        self.assertEqual(got_seq, dict(expect))
+
+    def test_kmer_counts_per_seq(self):
+        """k-mer counts per seq are the same as from individual sequences"""
+        data = {"a": "ACGTNNRY-?ACG", "b": "AC--GGRTTAAC", "c": "TTTTGGCCAAGGTT"}
+        coll = self.Class(data=data, moltype="dna")
+        got = coll.kmer_counts_per_seq(2, canonical=True)
+        self.assertEqual(got.template.names[0], coll.names)
+        for name in coll.names:
+            expect = coll.get_seq(name).kmer_counts(2, canonical=True).to_dict()
+            self.assertEqual(
+                {m: c for m, c in got[name].to_dict().items() if c}, expect
+            )
+        compact = CompactSequenceCollection(coll)
+        self.assertEqual(
+            compact.kmer_counts_per_seq(2, canonical=True).to_dict(), got.to_dict()
+        )
+
+    def test_get_identical_sets_unequal_length(self):
+        """positions beyond the end of a sequence only match degenerates"""
+        data = {"a": "ACGT", "b": "ACGTNN", "c": "ACGTAN", "d": "AC", "e": "ACGT"}
+        seqs = self.Class(data=data, moltype=DNA)
+        got = seqs.get_identical_sets(mask_degen=False)
+        self.assertEqual(got, [{"a", "e"}])
+        got = seqs.get_identical_sets(mask_degen=True)
+        got = frozenset(frozenset(s) for s in got)
+        self.assertEqual(got, frozenset([frozenset(["a", "b", "e"])]))
+
     def setUp(self):
         """Adds self.ragged for ragged collection tests."""
         self.ragged = SequenceCollection({"a": "AAAAAA", "b": "AAA", "c": "AAAA"})
@@ -1842,6 +1934,16 @@ class AlignmentBaseTests(SequenceCollectionBaseTests):
         self.assertEqual(len(got3), len(got1))
         self.assertEqual(got3.to_dict(), got1.to_dict())
 
+    def test_omit_gap_pos_remainder(self):
+        """a trailing partial motif is dropped with a warning"""
+        aln = self.Class({"a": "ACG-TAC-", "b": "ACGGTACG"}, moltype=DNA)
+        with self.assertWarns(UserWarning):
+            got = aln.omit_gap_pos(motif_length=3)
+        self.assertEqual(got.to_dict(), {"a": "ACG-TA", "b": "ACGGTA"})
+        with self.assertWarns(UserWarning):
+            got = aln.omit_gap_pos(allowed_gap_frac=0, motif_length=3)
+        self.assertEqual(got.to_dict(), {"a": "ACG", "b": "ACG"})
+
     def test_omit_bad_seqs(self):
         """omit_bad_seqs should return alignment w/o seqs causing most gaps"""
         data = {
@@ -1959,6 +2061,11 @@ class AlignmentBaseTests(SequenceCollectionBaseTests):
         # Check the exact strings expected from string transform
         self.assertEqual(self.sequences.majority_consensus(), "UCAG")
 
+    def test_majority_consensus_ties(self):
+        """majority_consensus resolves ties using the largest character"""
+        aln = self.Class({"a": "AC-T", "b": "CA-G", "c": "TTAG"}, moltype=DNA)
+        self.assertEqual(str(aln.majority_consensus()), "TT-G")
+
     def test_uncertainties(self):
         """SequenceCollection.uncertainties should match hand-calculated values"""
         aln = self.Class(["ABC", "AXC"])
@@ -2594,6 +2701,42 @@ class ArrayAlignmentTests(AlignmentBaseTests, TestCase):
 class AlignmentTests(AlignmentBaseTests, TestCase):
     Class = Alignment
 
+    def test_iupac_consensus_many_states(self):
+        """iupac_consensus correct when columns have many distinct states"""
+        import string
+
+        chars = string.ascii_letters + string.digits + string.punctuation
+        seqs = [chars[i:] + chars[:i] for i in range(0, len(chars), 7)]
+        aln = self.Class(seqs, moltype=BYTES)
+        expect = "".join(BYTES.degenerate_from_seq("".join(c)) for c in zip(*seqs))
+        self.assertEqual(aln.iupac_consensus(), expect)
+
+    def test_char_array_cached(self):
+        """character array is computed once and invalidated by changes"""
+        aln = self.Class({"a": "AC-GT", "b": "ACCGT"}, moltype=DNA)
+        chars = aln._get_char_array()
+        self.assertEqual(chars.tobytes(), b"AC-GTACCGT")
+        self.assertIs(aln._get_char_array(), chars)
+        # results from methods sharing the cache are unchanged
+        got = aln.omit_gap_pos(allowed_gap_frac=0)
+        self.assertEqual(got.to_dict(), {"a": "ACGT", "b": "ACGT"})
+        self.assertIs(aln._get_char_array(), chars)
+        # changing name order or sequences rebuilds the array
+        aln.names = ["b", "a"]
+        self.assertEqual(aln._get_char_array().tobytes(), b"ACCGTAC-GT")
+        other = self.Class({"a": "TTTTT"}, moltype=DNA)
+        aln.named_seqs["a"] = other.named_seqs["a"]
+        self.assertEqual(aln._get_char_array().tobytes(), b"ACCGTTTTTT")
+        self.assertEqual(aln.counts_per_seq().to_dict()["a"]["T"], 5)
+
+    def test_to_type_invalid_chars(self):
+        """conversion to ArrayAlignment raises for invalid characters"""
+        aln = self.Class({"a": "ACGX", "b": "ACGT"}, moltype="text")
+        with self.assertRaises(KeyError):
+            aln.to_type(array_align=True, moltype=DNA)
+        got = aln.to_type(array_align=True, moltype=PROTEIN)
+        self.assertEqual(got.to_dict(), aln.to_dict())
+
     def test_sliced_deepcopy(self):
         """correctly deep copy aligned objects in an alignment"""
 
@@ -3224,6 +3367,115 @@ class ArrayAlignmentSpecificTests(TestCase):
         self.assertEqual(coevo.template.names[0], [4, 5, 11, 12])
 
 
+class CompactSequenceCollectionTests(TestCase):
+    """CompactSequenceCollection matches SequenceCollection"""
+
+    def setUp(self):
+        self.data = {
+            "a": "ACGTNN-ACG",
+            "b": "AC--GGRTT",
+            "c": "",
+            "d": "ACGTACGTACGTT?",
+        }
+        self.seqs = SequenceCollection(data=self.data, moltype=DNA)
+        self.compact = CompactSequenceCollection(self.data, moltype="dna")
+
+    def test_construction(self):
+        """constructs from different input types"""
+        self.assertEqual(self.compact.names, list(self.data))
+        self.assertEqual(self.compact.num_seqs, 4)
+        self.assertEqual(len(self.compact), 14)
+        self.assertEqual(self.compact.to_dict(), self.data)
+        for data in (
+            self.seqs,
+            list(self.data.items()),
+            list(self.seqs.iter_seqs()),
+        ):
+            got = CompactSequenceCollection(data, moltype=DNA)
+            self.assertEqual(got.to_dict(), self.data)
+        got = CompactSequenceCollection(self.data, names=["d", "a"])
+        self.assertEqual(got.names, ["d", "a"])
+        self.assertEqual(CompactSequenceCollection(self.seqs).moltype, DNA)
+        with self.assertRaises(ValueError):
+            CompactSequenceCollection([("a", "ACG"), ("a", "ACG")])
+
+    def test_lower_case(self):
+        """lower case input is converted as by SequenceCollection"""
+        data = {k: v.lower() for k, v in self.data.items()}
+        compact = CompactSequenceCollection(data, moltype="dna")
+        self.assertEqual(compact.to_dict(), self.data)
+        self.assertEqual(
+            compact.get_lengths().to_dict(), self.seqs.get_lengths().to_dict()
+        )
+        self.assertEqual(
+            compact.counts_per_seq().to_dict(), self.seqs.counts_per_seq().to_dict()
+        )
+        # case is preserved for bytes
+        compact = CompactSequenceCollection({"x": "acgtn"}, moltype="bytes")
+        self.assertEqual(compact.to_dict(), {"x": "acgtn"})
+
+    def test_get_seq(self):
+        """sequences created on access"""
+        seq = self.compact.get_seq("b")
+        self.assertEqual(seq, self.seqs.get_seq("b"))
+        self.assertEqual(seq.name, "b")
+        self.assertIs(seq.moltype, DNA)
+        got = [s.name for s in self.compact.iter_seqs(seq_order=["d", "b"])]
+        self.assertEqual(got, ["d", "b"])
+        self.assertEqual(self.compact.to_collection().to_dict(), self.data)
+
+    def test_take_seqs(self):
+        """selects sequences from buffer"""
+        got = self.compact.take_seqs(["d", "a"])
+        self.assertEqual(got.to_dict(), {"d": self.data["d"], "a": self.data["a"]})
+        got = self.compact.take_seqs(["d", "a"], negate=True)
+        self.assertEqual(got.names, ["b", "c"])
+        self.assertEqual(got.to_dict(), {"b": self.data["b"], "c": self.data["c"]})
+
+    def test_degap(self):
+        """removes gaps"""
+        self.assertEqual(self.compact.degap().to_dict(), self.seqs.degap().to_dict())
+
+    def test_to_fasta(self):
+        """same as SequenceCollection"""
+        self.assertEqual(self.compact.to_fasta(), self.seqs.to_fasta())
+
+    def test_counts_per_seq(self):
+        """same as SequenceCollection"""
+        for kwargs in (
+            {},
+            dict(include_ambiguity=True),
+            dict(allow_gap=True),
+            dict(include_ambiguity=True, allow_gap=True),
+        ):
+            for motif_length in (1, 2, 3):
+                expect = self.seqs.counts_per_seq(motif_length=motif_length, **kwargs)
+                got = self.compact.counts_per_seq(motif_length=motif_length, **kwargs)
+                self.assertEqual(got.motifs, expect.motifs)
+                assert_allclose(got.array, expect.array)
+
+            expect = self.seqs.get_lengths(**kwargs)
+            got = self.compact.get_lengths(**kwargs)
+            self.assertEqual(got.to_dict(), expect.to_dict())
+
+    def test_trim_stop_codons(self):
+        """same as SequenceCollection"""
+        data = {"a": "ACGTAA", "b": "ACGAC", "c": "", "d": "TAG"}
+        seqs = SequenceCollection(data=data, moltype=DNA)
+        compact = CompactSequenceCollection(data, moltype="dna")
+        with self.assertRaises(ValueError):
+            compact.has_terminal_stops()
+        with self.assertRaises(ValueError):
+            compact.trim_stop_codons()
+        self.assertTrue(compact.has_terminal_stops(allow_partial=True))
+        got = compact.trim_stop_codons(allow_partial=True)
+        self.assertIsInstance(got, CompactSequenceCollection)
+        expect = seqs.trim_stop_codons(allow_partial=True)
+        self.assertEqual(got.to_dict(), expect.to_dict())
+        self.assertEqual(got.to_dict(), {"a": "ACG", "b": "ACGAC", "c": "", "d": ""})
+        self.assertFalse(got.has_terminal_stops(allow_partial=True))
+
+
 class IntegrationTests(TestCase):
     """Test for integration between regular and model seqs and alns"""
 
@@ -126,6 +126,9 @@ class EnumerationTests(TestCase):
         a = Enumeration("bca")
         self.assertEqual(a.to_indices(""), [])
         self.assertEqual(a.to_indices("ccabac"), [1, 1, 2, 0, 2, 1])
+        self.assertEqual(a.to_indices(list("ccabac")), [1, 1, 2, 0, 2, 1])
+        with self.assertRaises(KeyError):
+            a.to_indices("ccdbac")
 
     def test_is_valid(self):
         """Enumeration is_valid should return True for valid sequence"""
@@ -143,6 +146,11 @@ class EnumerationTests(TestCase):
         a = Enumeration("bca")
         self.assertEqual(a.from_indices([]), [])
         self.assertEqual(a.from_indices([1, 1, 2, 0, 2, 1]), list("ccabac"))
+        self.assertEqual(
+            a.from_indices(array([1, 1, 2, 0, 2, 1], dtype=uint8)), list("ccabac")
+        )
+        with self.assertRaises(IndexError):
+            a.from_indices(array([1, 3]))
 
     def test_pow(self):
         """Enumeration pow should produce JointEnumeration with n copies"""
@@ -252,6 +260,18 @@ class CharAlphabetTests(TestCase):
         got = r.from_array(array(["UUC", "UGA"], "c"))
         self.assertEqual(got, array([[0, 0, 1], [0, 3, 2]], "B"))
 
+    def test_from_seq_to_array(self):
+        """CharAlphabet from_seq_to_array should handle words and bad chars"""
+        seq = RNA.make_seq("UCAGGAC")
+        self.assertEqual(RnaBases.from_seq_to_array(seq), array([0, 1, 2, 3, 3, 2, 1]))
+        dinucs = RnaBases.get_word_alphabet(2)
+        got = dinucs.from_seq_to_array(seq[:6])
+        self.assertEqual(got, array([dinucs.index(w) for w in ["UC", "AG", "GA"]]))
+        # incomplete terminal word is dropped
+        self.assertEqual(dinucs.from_seq_to_array(seq), got)
+        with self.assertRaises(KeyError):
+            RnaBases.from_seq_to_array(RNA.make_seq("UCNG"))
+
     def test_to_chars(self):
         """CharAlphabet to_chars should convert an input array to chars"""
         r = CharAlphabet("UCAG")
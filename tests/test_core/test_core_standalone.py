@@ -650,6 +650,29 @@ class AlignmentTestMethods(unittest.TestCase):
             aln.to_dict(), {"seq1": "ACG-----", "seq2": "ACGAC---", "seq3": "ACGC-ATG"}
         )
 
+    def test_trim_stop_codons_alignment(self):
+        """Alignment and RNA sequences trimmed same as ArrayAlignment"""
+        data = {"seq1": "ACGTAA---", "seq2": "ACGAC----", "seq3": "ACGCAATGA"}
+        expect = {"seq1": "ACG---", "seq2": "ACGAC-", "seq3": "ACGCAA"}
+        for array_align in (True, False):
+            aln = make_aligned_seqs(data=data, moltype=DNA, array_align=array_align)
+            got = aln.trim_stop_codons(allow_partial=True)
+            self.assertIsInstance(got, aln.__class__)
+            self.assertEqual(got.to_dict(), expect)
+
+        rna = {n: s.replace("T", "U").strip("-") for n, s in data.items()}
+        seq_coll = make_unaligned_seqs(data=rna, moltype="rna")
+        got = seq_coll.trim_stop_codons(allow_partial=True)
+        self.assertEqual(got.to_dict(), dict(seq1="ACG", seq2="ACGAC", seq3="ACGCAA"))
+        self.assertTrue(seq_coll.has_terminal_stops(allow_partial=True))
+        # mitochondrial code, AGA is a stop
+        seq_coll = make_unaligned_seqs(data={"a": "ACGAGA", "b": "TGA"}, moltype=DNA)
+        self.assertTrue(seq_coll.has_terminal_stops(gc=2))
+        got = seq_coll.trim_stop_codons(gc=2)
+        self.assertEqual(got.to_dict(), dict(a="ACG", b="TGA"))
+        got = seq_coll.trim_stop_codons(gc=1)
+        self.assertEqual(got.to_dict(), dict(a="ACGAGA", b=""))
+
     def test_trim_stop_codons_info(self):
         """trim_stop_codons should preserve info attribute"""
         seq_coll = SequenceCollection(
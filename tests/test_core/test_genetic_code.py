@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 """ Unit tests for Genetic Code classes.
 """
-from cogent3 import DNA, RNA
+from cogent3 import DNA, RNA, make_unaligned_seqs
 from cogent3.core.genetic_code import (
     DEFAULT,
     GeneticCode,
@@ -329,6 +329,34 @@ class GeneticCodeTests(TestCase):
             got = sgc.get_stop_indices(seq, start=frame)
             self.assertEqual(got, expect)
 
+        # overlapping stop codons are all identified
+        mt = get_code(2)
+        seq = DNA.make_seq("CTAGAGGA")
+        expected = [[], [1, 4], [2]]
+        for frame, expect in enumerate(expected):
+            got = mt.get_stop_indices(seq, start=frame)
+            self.assertEqual(got, expect)
+
+    def test_translate_case(self):
+        """translation handles lower case and RNA"""
+        sgc = GeneticCode(self.SGC)
+        self.assertEqual(sgc.translate("atgUUUtaa"), "MF*")
+        self.assertEqual(sgc.translate("ATGNNN---TA"), "MXX")
+
+    def test_sixframes_many(self):
+        """six-frame translation of many sequences matches sixframes"""
+        data = {"a": "ATGCTAACATAAA", "b": "", "c": "GGTTAACCGN-TAG", "d": "ACG"}
+        seqs = make_unaligned_seqs(data, moltype=DNA)
+        for gc in (DEFAULT, get_code(2)):
+            got = gc.sixframes_many(seqs)
+            expect = [gc.sixframes(seqs.named_seqs[n]) for n in seqs.names]
+            self.assertEqual(got, expect)
+            got = gc.sixframes_many(data.values())
+            self.assertEqual(got, expect)
+
+        got = DEFAULT.sixframes_many(["AC", "ATGA"])
+        self.assertEqual(got, [[""] * 6, ["M", "*", "", "S", "H", ""]])
+
     def test_Synonyms(self):
         """GeneticCode synonyms should return aa -> codon set mapping."""
         expected_synonyms = {
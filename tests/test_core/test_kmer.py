@@ -0,0 +1,144 @@
+from collections import Counter
+from itertools import product
+from unittest import TestCase, main
+
+import numpy
+
+from cogent3 import DNA, PROTEIN, RNA
+from cogent3.core.kmer import (
+    codes_to_motifs,
+    kmer_counts,
+    kmer_counts_per_seq,
+    reverse_complement_codes,
+)
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def _brute_counts(seq, k, moltype, canonical=False):
+    """overlapping k-mer counts from string slicing"""
+    seq = seq.replace("-", "").replace("?", "")
+    counts = Counter()
+    for i in range(len(seq) - k + 1):
+        kmer = seq[i : i + k]
+        if not set(kmer) <= set(moltype.alphabet):
+            continue
+        if canonical:
+            order = {c: i for i, c in enumerate(moltype.alphabet)}
+            kmer = min(kmer, moltype.rc(kmer), key=lambda m: [order[c] for c in m])
+        counts[kmer] += 1
+    return counts
+
+
+class TestKmerCodes(TestCase):
+    def test_codes_to_motifs(self):
+        """codes decode to k-mers in lexicographic order"""
+        words = ["".join(w) for w in product(DNA.alphabet, repeat=3)]
+        got = codes_to_motifs(numpy.arange(len(words)), 3, DNA.alphabet)
+        self.assertEqual(got, words)
+        self.assertEqual(codes_to_motifs([], 3, DNA.alphabet), [])
+
+    def test_reverse_complement_codes(self):
+        """reverse complement codes match moltype.rc"""
+        words = ["".join(w) for w in product(DNA.alphabet, repeat=4)]
+        codes = numpy.arange(len(words))
+        got = reverse_complement_codes(codes, 4, [2, 3, 0, 1])
+        self.assertEqual([words[i] for i in got], [DNA.rc(w) for w in words])
+
+
+class TestKmerCounts(TestCase):
+    def setUp(self):
+        rng = numpy.random.RandomState(3)
+        chars = list("ACGT") * 5 + list("N-?R")
+        self.data = {
+            f"s{i}": "".join(rng.choice(chars, size=rng.randint(5, 60)))
+            for i in range(6)
+        }
+
+    def test_matches_brute_force(self):
+        """counts match counting of string slices"""
+        for k in (1, 2, 3, 5):
+            for canonical in (False, True):
+                for name, seq in self.data.items():
+                    got = kmer_counts(seq, k, DNA, canonical=canonical).to_dict()
+                    self.assertEqual(got, _brute_counts(seq, k, DNA, canonical))
+
+    def test_per_seq(self):
+        """rows match single sequence counts"""
+        for canonical in (False, True):
+            got = kmer_counts_per_seq(self.data, 3, DNA, canonical=canonical)
+            self.assertEqual(got.template.names[0], list(self.data))
+            got = got.to_dict()
+            for name, seq in self.data.items():
+                expect = _brute_counts(seq, 3, DNA, canonical)
+                self.assertEqual({m: c for m, c in got[name].items() if c}, expect)
+
+    def test_dense(self):
+        """dense counts include all k-mers in lexicographic order"""
+        got = kmer_counts("ACGTTA", 2, DNA, dense=True)
+        words = ["".join(w) for w in product(DNA.alphabet, repeat=2)]
+        self.assertEqual(got.motifs, tuple(words))
+        self.assertEqual(got["GT"], 1)
+        self.assertEqual(got.array.sum(), 5)
+        got = kmer_counts_per_seq(self.data, 2, DNA, canonical=True, dense=True)
+        # palindromes plus one of each other reverse complement pair
+        self.assertEqual(len(got.motifs), 4 + 12 // 2)
+        self.assertEqual(got.shape, (6, 10))
+
+    def test_array_input(self):
+        """uint8 arrays of characters are counted"""
+        seq = self.data["s0"]
+        data = numpy.frombuffer(seq.encode("latin-1"), dtype=numpy.uint8)
+        self.assertEqual(
+            kmer_counts(data, 4, DNA).to_dict(), kmer_counts(seq, 4, DNA).to_dict()
+        )
+
+    def test_moltypes(self):
+        """RNA is canonicalised, protein only supports non-canonical counts"""
+        got = kmer_counts("ACGUUA", 2, RNA, canonical=True).to_dict()
+        self.assertEqual(got, {"UA": 1, "AC": 2, "CG": 1, "UU": 1})
+        got = kmer_counts("MKVLMK", 2, PROTEIN)
+        self.assertEqual(got["MK"], 2)
+        with self.assertRaises(TypeError):
+            kmer_counts("MKVLMK", 2, PROTEIN, canonical=True)
+
+    def test_no_kmers(self):
+        """sequences without a valid k-mer have no or zero counts"""
+        from cogent3 import make_seq, make_unaligned_seqs
+        from cogent3.core.alignment import CompactSequenceCollection
+
+        for seq in ("AC", "NNNN", "", "A-C"):
+            got = kmer_counts(seq, 3, DNA)
+            self.assertEqual((got.shape, got.motifs, got.to_dict()), ((0,), (), {}))
+            got = kmer_counts(seq, 3, DNA, dense=True)
+            self.assertEqual(got.shape, (64,))
+            self.assertEqual(got.array.sum(), 0)
+            self.assertEqual(got.motif_length, 3)
+
+        data = {"a": "AC", "b": "NNNN"}
+        got = kmer_counts_per_seq(data, 3, DNA)
+        self.assertEqual(got.shape, (2, 0))
+        self.assertEqual(got.template.names[0], ["a", "b"])
+        got = kmer_counts_per_seq(data, 3, DNA, canonical=True, dense=True)
+        self.assertEqual(got.shape, (2, 32))
+        self.assertEqual(got.array.sum(), 0)
+
+        # the same is returned by sequence and collection methods
+        self.assertEqual(make_seq("AC", moltype="dna").kmer_counts(3).shape, (0,))
+        self.assertEqual(DNA.make_light_seq("NN").kmer_counts(3).shape, (0,))
+        coll = make_unaligned_seqs(data, moltype="dna")
+        self.assertEqual(coll.kmer_counts_per_seq(3).shape, (2, 0))
+        compact = CompactSequenceCollection(data, moltype="dna")
+        self.assertEqual(compact.kmer_counts_per_seq(3, dense=True).shape, (2, 64))
+
+
+if __name__ == "__main__":
+    main()
@@ -524,6 +524,26 @@ class MolTypeTests(TestCase):
         self.assertEqual(g("---a---c---u----g---"), "acug")
         self.assertEqual(g(tuple("---a---c---u----g---")), tuple("acug"))
 
+    def test_non_byte_chars(self):
+        """MolType methods handle characters outside latin-1 and sequences"""
+        s = "AC\u0394G-NR\xe9"
+        chars = list(s)
+        for mt in (RnaMolType, DnaMolType):
+            self.assertEqual(mt.first_invalid(s), mt.first_invalid(chars))
+            self.assertEqual(mt.gap_vector(s), mt.gap_vector(chars))
+            self.assertEqual(mt.degap(s), "".join(mt.degap(chars)))
+            self.assertEqual(mt.rc(s), "".join(mt.rc(chars)))
+            self.assertEqual(
+                mt.get_degenerate_positions(s), mt.get_degenerate_positions(chars),
+            )
+        seq = DNA.make_seq("AC-GTNR")
+        self.assertEqual(DNA.first_degenerate(seq), 5)
+        self.assertEqual(DNA.gap_indices(seq), [2])
+        self.assertEqual(DNA.get_degenerate_positions(seq), [2, 5, 6])
+        self.assertEqual(DNA.get_degenerate_positions(seq, include_gap=False), [5, 6])
+        self.assertEqual(DNA.rc(seq), DNA.make_seq("YNAC-GT"))
+        self.assertEqual(DNA.degap(seq), DNA.make_seq("ACGTNR"))
+
     def test_gap_indices(self):
         """MolType gap_indices should return correct gap positions"""
         g = RnaMolType.gap_indices
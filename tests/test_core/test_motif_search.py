@@ -0,0 +1,124 @@
+import re
+
+from unittest import TestCase, main
+
+import numpy
+
+from cogent3 import (
+    DNA,
+    PROTEIN,
+    make_aligned_seqs,
+    make_seq,
+    make_unaligned_seqs,
+)
+from cogent3.core.motif_search import MotifSearch
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def _regex_hits(seqs, patterns, moltype, both_strands=True):
+    """hits from overlapping regex searches"""
+    hits = set()
+    for i, name in enumerate(seqs):
+        for j, pattern in enumerate(patterns):
+            queries = [(1, pattern)]
+            rc = moltype.rc(pattern) if both_strands else pattern
+            if rc != pattern:
+                queries.append((-1, rc))
+            for strand, query in queries:
+                regex = f"(?=({moltype.to_regex(query)}))"
+                for m in re.finditer(regex, seqs[name]):
+                    hits.add((i, m.start(1), m.end(1), strand, j))
+    return hits
+
+
+class TestMotifSearch(TestCase):
+    def setUp(self):
+        rng = numpy.random.RandomState(7)
+        chars = list("ACGT") * 6 + list("NR")
+        self.data = {
+            f"s{i}": "".join(rng.choice(chars, size=rng.randint(0, 300)))
+            for i in range(8)
+        }
+        self.patterns = ["TATAWA", "GGATCC", "RCCATGG", "GCCNNNGGC", "YG", "A"]
+
+    def test_matches_regex(self):
+        """hits are the same as overlapping regex matches"""
+        for both_strands in (True, False):
+            search = MotifSearch(self.patterns, both_strands=both_strands)
+            expect = _regex_hits(self.data, self.patterns, DNA, both_strands)
+            for chunk_size in (7, 50, 1000):
+                got = search.search(self.data, chunk_size=chunk_size)
+                self.assertEqual(set(map(tuple, got.hits.tolist())), expect)
+                self.assertEqual(len(got), len(expect))
+
+    def test_hits_sorted(self):
+        """hits are ordered by sequence then position"""
+        got = MotifSearch(self.patterns).search(self.data).hits
+        order = numpy.lexsort((got["start"], got["seq"]))
+        self.assertEqual(order.tolist(), list(range(len(got))))
+
+    def test_named_patterns(self):
+        """pattern names and counts"""
+        seq = make_seq("AACCGGTTTATAAAGGATCC", moltype="dna", name="x")
+        hits = seq.find_motifs({"tata": "TATAWA", "bamhi": "GGATCC"})
+        self.assertEqual(hits.seq_names, ["x"])
+        self.assertEqual(hits.pattern_names, ["tata", "bamhi"])
+        # TATAAA on plus strand, TTTATA is its reverse complement
+        self.assertEqual(hits.counts().tolist(), [[2, 1]])
+        table = hits.to_table()
+        self.assertEqual(table.shape, (3, 5))
+        self.assertEqual(table[0, "strand"], -1)
+
+    def test_annotate(self):
+        """features cover the matched sequence"""
+        seq = make_seq("AACCGGTTTATAAAGGATCC", moltype="dna", name="x")
+        hits = seq.find_motifs(["TATAWA"])
+        features = hits.annotate(seq, annot_type="site")
+        self.assertEqual(len(seq.annotations), 2)
+        self.assertEqual([str(f.get_slice()) for f in features], ["TATAAA"] * 2)
+
+    def test_collections(self):
+        """searches ungapped sequences of collections and alignments"""
+        data = {"a": "TATA-AACC", "b": "TTTA--TAA"}
+        expect = _regex_hits(
+            {k: v.replace("-", "") for k, v in data.items()}, ["TTA"], DNA
+        )
+        for array_align in (True, False):
+            aln = make_aligned_seqs(data, moltype="dna", array_align=array_align)
+            hits = aln.find_motifs(["TTA"])
+            self.assertEqual(set(map(tuple, hits.hits.tolist())), expect)
+            features = hits.annotate(aln)
+            self.assertEqual({str(f.get_slice()) for f in features}, {"TTA"})
+        seqs = make_unaligned_seqs(self.data, moltype="dna")
+        hits = seqs.find_motifs(self.patterns)
+        expect = _regex_hits(self.data, self.patterns, DNA)
+        self.assertEqual(set(map(tuple, hits.hits.tolist())), expect)
+
+    def test_protein(self):
+        """protein patterns only searched on one strand"""
+        seqs = {"a": "MKVLDNMKVL", "b": "MEVL"}
+        search = MotifSearch(["MBV", "VL"], moltype="protein")
+        self.assertFalse(search.both_strands)
+        got = search.search(seqs)
+        expect = _regex_hits(seqs, ["MBV", "VL"], PROTEIN, both_strands=False)
+        self.assertEqual(set(map(tuple, got.hits.tolist())), expect)
+
+    def test_invalid(self):
+        """invalid patterns raise ValueError"""
+        with self.assertRaises(ValueError):
+            MotifSearch(["ACGJ"])
+        with self.assertRaises(ValueError):
+            MotifSearch([])
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,16 @@
 """
 from collections import Counter
 
-from numpy import array, log2, nan, vstack
+from numpy import array, log2, nan, ones, vstack
+from numpy.random import RandomState
 from numpy.testing import assert_allclose
 
-from cogent3.core.profile import PSSM, MotifCountsArray, MotifFreqsArray
+from cogent3.core.profile import (
+    PSSM,
+    MotifCountsArray,
+    MotifFreqsArray,
+    scan_pssms,
+)
 from cogent3.util.unit_test import TestCase, main
 
 
@@ -492,6 +498,74 @@ class PSSMTests(TestCase):
         scores = pssm.score_seq(seq)
         assert_allclose(scores, [-4.481, -5.703, -2.966], atol=1e-3)
 
+    def test_score_indexed_seqs(self):
+        """scores many indexed sequences at once"""
+        data = [
+            [0.1, 0.3, 0.5, 0.1],
+            [0.25, 0.25, 0.25, 0.25],
+            [0.05, 0.8, 0.05, 0.1],
+            [0.7, 0.1, 0.1, 0.1],
+            [0.6, 0.15, 0.05, 0.2],
+        ]
+        pssm = PSSM(data, "ACTG")
+        indices = array([[3, 1, 2, 0, 2, 2, 3], [4, 1, 2, 0, 2, 2, 3]])
+        scores = pssm.score_indexed_seqs(indices)
+        expect = [[-4.481, -5.703, -2.966], [-3.158, -5.703, -2.966]]
+        assert_allclose(scores, expect, atol=1e-3)
+        self.assertEqual(pssm.score_indexed_seqs(indices[:, :4]).shape, (2, 0))
+
+    def test_scan_pssms(self):
+        """threshold and top_k select from all window scores"""
+        data = [
+            [0.1, 0.3, 0.5, 0.1],
+            [0.25, 0.25, 0.25, 0.25],
+            [0.05, 0.8, 0.05, 0.1],
+        ]
+        pssms = [PSSM(data, "ACTG"), PSSM(data[::-1], "TCAG")]
+        seqs = ["TCAGACNTTACG-AC", "AC", "GGTACCATGACT"]
+        hits = scan_pssms(pssms, seqs)
+        for i, pssm in enumerate(pssms):
+            for j, seq in enumerate(seqs):
+                selected = hits[(hits["pssm"] == i) & (hits["seq"] == j)]
+                expect = pssm.score_seq(seq) if len(seq) >= 4 else []
+                self.assertEqual(selected["start"].tolist(), list(range(len(expect))))
+                assert_allclose(selected["score"], expect)
+
+        for chunk_size in (2, 5, 100):
+            got = scan_pssms(pssms, seqs, threshold=0.5, chunk_size=chunk_size)
+            expect = hits[hits["score"] >= 0.5]
+            self.assertEqual(got.tolist(), expect.tolist())
+
+            got = scan_pssms(pssms, seqs, top_k=2, chunk_size=chunk_size)
+            for i in range(2):
+                for j in (0, 2):
+                    selected = hits[(hits["pssm"] == i) & (hits["seq"] == j)]
+                    best = sorted(selected["score"])[-2:]
+                    found = got[(got["pssm"] == i) & (got["seq"] == j)]
+                    assert_allclose(sorted(found["score"]), best)
+
+        with self.assertRaises(ValueError):
+            scan_pssms(pssms, seqs, top_k=0)
+
+    def test_scan_pssms_non_latin1(self):
+        """characters outside latin-1 score 0, as for score_seq"""
+        pssm = PSSM([[0.1, 0.2, 0.3, 0.4]] * 3, "TCAG")
+        seq = "ACGT\u0100ACG"
+        hits = scan_pssms([pssm], [seq])
+        assert_allclose(hits["score"], pssm.score_seq(seq))
+
+    def test_scan_pssms_dinucleotide(self):
+        """PSSMs of multiple character motifs score consecutive motifs"""
+        motifs = [a + b for a in "TCAG" for b in "TCAG"]
+        data = RandomState(1).dirichlet(ones(16), size=3)
+        pssm = PSSM(data, motifs)
+        seq = "ACGTTAGCATGCAACGTTTAGC"
+        expect = pssm.score_seq(seq)
+        self.assertEqual(len(expect), len(seq) // 2 - 2)
+        hits = scan_pssms(pssm, [seq])
+        self.assertEqual(hits["start"].tolist(), list(range(0, 2 * len(expect), 2)))
+        assert_allclose(hits["score"], expect)
+
 
 if __name__ == "__main__":
     main()
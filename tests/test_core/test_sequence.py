@@ -33,6 +33,7 @@ from cogent3.core.sequence import (
     ArraySequence,
     ArraySequenceBase,
     DnaSequence,
+    LightSequence,
     ProteinSequence,
     RnaSequence,
     Sequence,
@@ -842,6 +843,17 @@ class SequenceTests(TestCase):
         self.assertEqual(str(got), "ACCNNGT")
         self.assertTrue(isinstance(got, self.SEQ))
 
+    def test_kmer_counts(self):
+        """counts overlapping k-mers, excluding ambiguities"""
+        seq = self.DNA("AACCGGTTAN-T")
+        got = seq.kmer_counts(3)
+        self.assertEqual(
+            got.to_dict(),
+            {"AAC": 1, "ACC": 1, "CCG": 1, "CGG": 1, "GGT": 1, "GTT": 1, "TTA": 1},
+        )
+        got = seq.kmer_counts(3, canonical=True)
+        self.assertEqual(got.to_dict(), {"TTA": 1, "AAC": 2, "CCG": 2, "ACC": 2})
+
     def test_counts(self):
         """count motifs of different sizes, +/- ambiguities"""
         # test DNA seq
@@ -1112,6 +1124,155 @@ class SequenceIntegrationTests(TestCase):
         self.assertEqual(str(r.to_dna()), "TTTCGT")
 
 
+class WindowStatsSequenceTests(TestCase):
+    """windowed statistics are provided by sequences"""
+
+    def test_window_methods(self):
+        """Sequence and ArraySequence give the same windowed statistics"""
+        data = "ACGGTTACGNNA-TTCGGCCATTA"
+        seq = DNA.make_seq(data, name="s")
+        array_seq = DNA.make_array_seq(data, name="s")
+        for s in (seq, array_seq):
+            counts = s.window_counts(10, 5, k=2)
+            self.assertEqual(counts.shape, (3, 16))
+            self.assertEqual(counts[1]["AC"], 1)
+            gc = s.window_gc(10, 5)
+            assert_allclose(gc.values, [5 / 9, 2 / 7, 5 / 8])
+            self.assertEqual(len(s.window_skew(10, 5)), 3)
+            self.assertEqual(len(s.window_entropy(10, 5, k=2)), 3)
+            self.assertEqual(len(s.window_strand_symmetry(10, 5)), 3)
+
+        with self.assertRaises(TypeError):
+            PROTEIN.make_seq("ACDEFGHIK").window_gc(4, 2)
+
+
+class LightSequenceTests(TestCase):
+    """LightSequence should behave like a sequence string"""
+
+    def test_init(self):
+        """stores upper case bytes, takes name from sequence objects"""
+        s = DNA.make_light_seq("acgtn", name="x")
+        self.assertEqual(str(s), "ACGTN")
+        self.assertEqual(bytes(s), b"ACGTN")
+        self.assertIs(s.moltype, DNA)
+        self.assertFalse(hasattr(s, "__dict__"))
+        s = LightSequence(DNA.make_seq("ACG", name="y"))
+        self.assertEqual((s.name, str(s)), ("y", "ACG"))
+        self.assertIs(s.moltype, ASCII)
+        s = LightSequence(b"acg", moltype="dna", preserve_case=True)
+        self.assertEqual(str(s), "acg")
+
+    def test_sequence_protocol(self):
+        """supports len, iteration, indexing, comparison and hashing"""
+        s = DNA.make_light_seq("ACGTTA", name="x")
+        self.assertEqual(len(s), 6)
+        self.assertEqual(list(s), list("ACGTTA"))
+        self.assertEqual(s[1:4], "CGT")
+        self.assertEqual(s[-1], "A")
+        self.assertIsInstance(s[::2], LightSequence)
+        self.assertEqual(s[::2].name, "x")
+        self.assertTrue("GTT" in s)
+        self.assertEqual(s, DNA.make_seq("ACGTTA"))
+        self.assertNotEqual(s, "ACG")
+        self.assertTrue(s < "T")
+        self.assertEqual({s: 1}["ACGTTA"], 1)
+        self.assertEqual(
+            repr(DNA.make_light_seq("A" * 12)), "LightSequence(AAAAAAA... 12)"
+        )
+        self.assertEqual(s.to_fasta(), ">x\nACGTTA\n")
+
+    def test_promotion(self):
+        """Sequence attributes are provided by a lazily created Sequence"""
+        s = DNA.make_light_seq("AACGT", name="x")
+        self.assertIsNone(s._promoted)
+        self.assertEqual(s.rc(), "ACGTT")
+        seq = s.to_sequence()
+        self.assertIsInstance(seq, DnaSequence)
+        self.assertIs(s.to_sequence(), seq)
+        s.add_feature("gene", "g1", [(0, 2)])
+        self.assertEqual(len(s.annotations), 1)
+        self.assertEqual(str(s.get_annotations_matching("gene")[0].get_slice()), "AA")
+        s.name = "y"
+        self.assertEqual(s.to_sequence().name, "y")
+        with self.assertRaises(AttributeError):
+            s.not_an_attribute
+
+    def test_sequence_from_light(self):
+        """MolType.make_seq accepts LightSequence"""
+        s = DNA.make_seq(DNA.make_light_seq("ACG", name="x"))
+        self.assertIsInstance(s, DnaSequence)
+        self.assertEqual((s.name, str(s)), ("x", "ACG"))
+
+    def test_collection_element(self):
+        """collections store LightSequence without promoting it"""
+        from cogent3 import make_aligned_seqs, make_unaligned_seqs
+
+        light = [
+            LightSequence("ACGGT", name="a"),
+            DNA.make_light_seq("AC-TT", name="b"),
+        ]
+        coll = make_unaligned_seqs(light, moltype="dna")
+        for seq in coll.seqs:
+            self.assertIsInstance(seq, LightSequence)
+            self.assertIs(seq.moltype, DNA)
+            self.assertIsNone(seq._promoted)
+        self.assertEqual(coll.to_dict(), {"a": "ACGGT", "b": "AC-TT"})
+        self.assertEqual(coll.degap().to_dict(), {"a": "ACGGT", "b": "ACTT"})
+        self.assertIsInstance(coll.take_seqs(["b"]).seqs[0], LightSequence)
+        # the input sequences are not modified
+        self.assertIs(light[0].moltype, ASCII)
+        # annotations are held by the promoted sequence
+        coll.named_seqs["a"].add_feature("gene", "g1", [(0, 2)])
+        self.assertIsInstance(coll.named_seqs["a"]._promoted, DnaSequence)
+        self.assertEqual(len(coll.named_seqs["a"].annotations), 1)
+        # info is held by the promoted sequence
+        coll.named_seqs["b"].info = {"x": 1}
+        self.assertEqual(coll.named_seqs["b"].to_sequence().info["x"], 1)
+        # alignments require Sequence objects
+        aln = make_aligned_seqs(light, moltype="dna", array_align=False)
+        self.assertIsInstance(aln.named_seqs["b"].data, DnaSequence)
+
+    def test_collection_methods(self):
+        """collection methods that make new sequences support LightSequence"""
+        from cogent3 import make_unaligned_seqs
+
+        data = {"a": "ATGAAATAG", "b": "ATGCCCTAA", "c": "ATGC"}
+        expect = make_unaligned_seqs(data, moltype="dna")
+        light = [DNA.make_light_seq(s, name=n) for n, s in data.items()]
+        coll = make_unaligned_seqs(light, moltype="dna")
+        # a promoted sequence keeps its info
+        coll.named_seqs["b"].info = {"x": 1}
+
+        got = coll.trim_stop_codons(allow_partial=True)
+        self.assertEqual(
+            got.to_dict(), expect.trim_stop_codons(allow_partial=True).to_dict()
+        )
+        self.assertIsInstance(got.named_seqs["a"], LightSequence)
+        self.assertEqual(got.named_seqs["b"].info["x"], 1)
+
+        for pad_length in (None, 12):
+            got = coll.pad_seqs(pad_length)
+            self.assertEqual(got.to_dict(), expect.pad_seqs(pad_length).to_dict())
+            self.assertIsInstance(got.named_seqs["c"], LightSequence)
+
+    def test_pickle(self):
+        """pickling preserves name, moltype and data"""
+        from pickle import loads
+
+        s = DNA.make_light_seq("ACGT", name="x")
+        got = loads(dumps(s))
+        self.assertEqual((got.name, str(got)), ("x", "ACGT"))
+        self.assertIs(got.moltype, DNA)
+
+    def test_kmer_counts(self):
+        """matches counts from a Sequence"""
+        s = DNA.make_light_seq("ACGTNACGT-A")
+        self.assertEqual(
+            s.kmer_counts(2).to_dict(), DNA.make_seq(str(s)).kmer_counts(2).to_dict()
+        )
+        self.assertIsNone(s._promoted)
+
+
 class ModelSequenceTests(SequenceTests):
     """Tests of the ArraySequence class's inheritance of SequenceI."""
 
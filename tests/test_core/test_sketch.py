@@ -0,0 +1,108 @@
+from unittest import TestCase, main
+
+import numpy
+
+from cogent3 import make_aligned_seqs, make_unaligned_seqs
+from cogent3.core.sketch import MinHashIndex, kmer_codes
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def _random_seqs(num_seqs, length, seed=0):
+    rng = numpy.random.RandomState(seed)
+    return {
+        f"s{i}": "".join(rng.choice(list("ACGT"), size=length)) for i in range(num_seqs)
+    }
+
+
+class TestKmerCodes(TestCase):
+    def test_kmer_codes(self):
+        """k-mers containing invalid states are excluded"""
+        got = kmer_codes([0, 1, 2, 3], 2, 4)
+        self.assertEqual(got.tolist(), [1, 6, 11])
+        got = kmer_codes([0, 1, 4, 2, 3], 2, 4)
+        self.assertEqual(got.tolist(), [1, 11])
+        got = kmer_codes([0, 1], 3, 4)
+        self.assertEqual(len(got), 0)
+
+
+class TestMinHashIndex(TestCase):
+    def setUp(self):
+        data = _random_seqs(50, 200)
+        # make near identical copies
+        seq = list(data["s0"])
+        seq[100] = "A" if seq[100] != "A" else "C"
+        data["near_s0"] = "".join(seq)
+        data["same_s1"] = data["s1"]
+        data["short"] = "ACG"
+        self.seqs = make_unaligned_seqs(data=data, moltype="dna")
+
+    def test_signature(self):
+        """identical sequences have identical signatures"""
+        index = self.seqs.similarity_index(k=6)
+        self.assertIsInstance(index, MinHashIndex)
+        self.assertEqual(len(index), self.seqs.num_seqs)
+        got = index.signature("ACGT-ACGTNNACGTACG")
+        expect = index.signature("ACGTACGTNNACGTACG")
+        numpy.testing.assert_equal(got, expect)
+        self.assertEqual(index.signature("ACG").tolist(), [2 ** 64 - 1] * 64)
+
+    def test_candidates(self):
+        """near identical sequences are returned as candidates"""
+        index = self.seqs.similarity_index(k=6)
+        got = index.candidates(self.seqs.get_seq("s1"))
+        self.assertEqual({n for n, _ in got[:2]}, {"s1", "same_s1"})
+        self.assertEqual(got[0][1], 1.0)
+        got = dict(index.candidates(self.seqs.get_seq("s0"), min_jaccard=0.5))
+        self.assertEqual(set(got), {"s0", "near_s0"})
+        self.assertTrue(0.5 < got["near_s0"] < 1)
+        self.assertEqual(index.candidates("ACG"), [])
+
+    def test_get_similar(self):
+        """returns collection of similar sequences, optionally verified"""
+        index = self.seqs.similarity_index(k=6)
+        target = self.seqs.get_seq("s0")
+        got = index.get_similar(target, min_jaccard=0.5)
+        self.assertEqual(set(got.names), {"s0", "near_s0"})
+        got = index.get_similar(
+            target, min_jaccard=0.5, verify=True, max_similarity=0.999
+        )
+        self.assertEqual(got.names, ["near_s0"])
+        # same as the exhaustive method
+        expect = self.seqs.get_similar(target, min_similarity=0.99)
+        got = index.get_similar(target, verify=True, min_similarity=0.99)
+        self.assertEqual(set(got.names), set(expect.names))
+
+    def test_aligned(self):
+        """gaps are ignored"""
+        aln = make_aligned_seqs(
+            data={
+                "a": "ACGGT--ACGTTAGC",
+                "b": "ACGGTAAACGTTAGC",
+                "c": "ACGG---ACGTTAGC",
+            },
+            moltype="dna",
+            array_align=True,
+        )
+        index = aln.similarity_index(k=3, num_hashes=16, num_bands=8)
+        got = index.candidates("ACGGTACGTTAGC", min_jaccard=1.0)
+        self.assertEqual([n for n, _ in got], ["a"])
+
+    def test_invalid(self):
+        """raises ValueError for incompatible arguments"""
+        with self.assertRaises(ValueError):
+            self.seqs.similarity_index(num_hashes=10, num_bands=3)
+        with self.assertRaises(ValueError):
+            self.seqs.similarity_index(k=40)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from collections import Counter
+from unittest import TestCase, main
+
+import numpy
+
+from numpy.testing import assert_allclose
+
+from cogent3 import DNA, PROTEIN
+from cogent3.core.window_stats import (
+    WindowValues,
+    window_counts,
+    window_entropy,
+    window_gc,
+    window_skew,
+    window_starts,
+    window_strand_symmetry,
+)
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Production"
+
+
+def _brute_counts(seq, k):
+    """overlapping k-mer counts of canonical DNA characters"""
+    counts = Counter()
+    for i in range(len(seq) - k + 1):
+        kmer = seq[i : i + k]
+        if set(kmer) <= set("ACGT"):
+            counts[kmer] += 1
+    return counts
+
+
+def _nonzero(counts):
+    return {m: v for m, v in counts.items() if v}
+
+
+class WindowStatsTests(TestCase):
+    def setUp(self):
+        rng = numpy.random.RandomState(13)
+        self.data = "".join(rng.choice(list("ACGTTTN-"), 500))
+        self.seq = DNA.make_seq(self.data, name="s1")
+
+    def test_window_starts(self):
+        """window starts match sliding_windows"""
+        for args in [(50, 7), (50, 7, 3, 200), (500, 1), (501, 1), (10, 10, 495)]:
+            starts = window_starts(len(self.seq), *args)
+            got = [str(self.seq[s : s + args[0]]) for s in starts]
+            expect = [str(w) for w in self.seq.sliding_windows(*args)]
+            self.assertEqual(got, expect)
+
+    def test_window_counts(self):
+        """counts match those from sequence slices"""
+        for k in (1, 2, 3):
+            counts = window_counts(self.seq, 50, 13, k=k, start=4)
+            for start, window in zip(
+                counts.keys(), self.seq.sliding_windows(50, 13, 4)
+            ):
+                got = _nonzero(counts[start].to_dict())
+                self.assertEqual(got, _brute_counts(str(window), k))
+
+    def test_window_counts_non_overlapping(self):
+        """non-overlapping counts match Sequence.counts"""
+        for k in (2, 3):
+            counts = window_counts(self.seq, 50, 7, k=k, overlapping=False)
+            for start, window in zip(counts.keys(), self.seq.sliding_windows(50, 7)):
+                expect = _nonzero(DNA.make_seq(str(window)).counts(motif_length=k))
+                self.assertEqual(_nonzero(counts[start].to_dict()), expect)
+
+    def test_array_seq(self):
+        """ArraySequence results match Sequence"""
+        seq = DNA.make_array_seq(self.data)
+        assert_allclose(
+            window_counts(seq, 30, 11, k=2).array,
+            window_counts(self.seq, 30, 11, k=2).array,
+        )
+        assert_allclose(
+            window_gc(seq, 30, 11).values, window_gc(self.seq, 30, 11).values
+        )
+
+    def test_window_gc_skew(self):
+        """GC fraction and skew from canonical bases in each window"""
+        gc = window_gc(self.seq, 40, 10)
+        skew = window_skew(self.seq, 40, 10)
+        at = window_skew(self.seq, 40, 10, motifs=("A", "T"))
+        for i, window in enumerate(self.seq.sliding_windows(40, 10)):
+            c = _brute_counts(str(window), 1)
+            self.assertAlmostEqual(
+                gc.values[i], (c["G"] + c["C"]) / sum(c[b] for b in "ACGT")
+            )
+            self.assertAlmostEqual(
+                skew.values[i], (c["G"] - c["C"]) / (c["G"] + c["C"])
+            )
+            self.assertAlmostEqual(at.values[i], (c["A"] - c["T"]) / (c["A"] + c["T"]))
+
+        self.assertEqual(at.stat, "AT skew")
+        self.assertTrue(numpy.isnan(window_gc(DNA.make_seq("NN--"), 2, 1).values).all())
+        with self.assertRaises(TypeError):
+            window_gc(PROTEIN.make_seq("ACDEF"), 2, 1)
+
+    def test_window_entropy(self):
+        """Shannon entropy of k-mer frequencies"""
+        for k in (1, 2):
+            entropy = window_entropy(self.seq, 60, 20, k=k)
+            for i, window in enumerate(self.seq.sliding_windows(60, 20)):
+                freqs = numpy.array(list(_brute_counts(str(window), k).values()))
+                freqs = freqs / freqs.sum()
+                self.assertAlmostEqual(
+                    entropy.values[i], -(freqs * numpy.log2(freqs)).sum()
+                )
+
+    def test_window_strand_symmetry(self):
+        """matches strand_symmetry of each window"""
+        for motif_length, window in ((1, 30), (2, 100)):
+            result = window_strand_symmetry(self.seq, window, 17, motif_length)
+            for i, sub in enumerate(self.seq.sliding_windows(window, 17)):
+                expect = DNA.make_seq(str(sub)).strand_symmetry(motif_length)
+                self.assertAlmostEqual(result.values[i], expect.G)
+                self.assertAlmostEqual(result.pvalues[i], expect.pvalue)
+
+        # undefined if a strand has no counts
+        result = window_strand_symmetry(DNA.make_seq("GGGGAAAA"), 4, 4)
+        self.assertTrue(numpy.isnan(result.values).all())
+        self.assertTrue(numpy.isnan(result.pvalues).all())
+
+    def test_window_values(self):
+        """WindowValues output as table and bedgraph"""
+        values = WindowValues([0, 5, 10], 5, [0.5, numpy.nan, 0.25], "GC", "chr1")
+        assert_allclose(values.ends, [5, 10, 15])
+        table = values.to_table()
+        self.assertEqual(table.header, ("start", "end", "GC"))
+        self.assertEqual(table.shape, (3, 3))
+        got = values.to_bedgraph().splitlines()
+        self.assertTrue(got[0].startswith('track type=bedGraph name="GC"'))
+        self.assertEqual(got[1:], ["chr1\t0\t5\t0.50", "chr1\t10\t15\t0.25"])
+        self.assertEqual(len(values.draw().traces), 1)
+
+    def test_bedgraph_overlapping_windows(self):
+        """overlapping windows are written as non-overlapping records"""
+        values = WindowValues([0, 2, 4, 6], 4, [0.1, 0.2, numpy.nan, 0.4], "GC", "x")
+        got = values.to_bedgraph().splitlines()[1:]
+        records = [line.split("\t") for line in got]
+        self.assertEqual(
+            [r[1:3] for r in records], [["0", "3"], ["3", "5"], ["7", "10"]]
+        )
+        # each record starts at or after the end of the previous one
+        ends = [int(r[2]) for r in records]
+        starts = [int(r[1]) for r in records]
+        self.assertTrue(all(s >= e for s, e in zip(starts[1:], ends)))
+        # the same holds for step of 1
+        values = WindowValues(numpy.arange(10), 5, numpy.arange(10) / 10, "GC", "x")
+        records = [line.split("\t") for line in values.to_bedgraph().splitlines()[1:]]
+        bounds = [int(v) for r in records for v in r[1:3]]
+        self.assertEqual(bounds, sorted(bounds))
+        self.assertEqual((bounds[0], bounds[-1]), (0, 14))
+
+
+if __name__ == "__main__":
+    main()
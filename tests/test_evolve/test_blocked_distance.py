@@ -0,0 +1,133 @@
+import os
+
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import numpy
+
+from numpy.testing import assert_allclose, assert_equal
+
+from cogent3 import make_aligned_seqs
+from cogent3.evolve.blocked_distance import (
+    _tiles,
+    blocked_distances,
+    load_distances,
+)
+
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2020, The Cogent Project"
+__credits__ = ["Gavin Huttley"]
+__license__ = "BSD-3"
+__version__ = "2020.6.30a"
+__maintainer__ = "Gavin Huttley"
+__email__ = "Gavin.Huttley@anu.edu.au"
+__status__ = "Alpha"
+
+
+def _make_aln(num_seqs, moltype="dna", alphabet="ACGT", seed=2):
+    rng = numpy.random.RandomState(seed)
+    ancestor = rng.choice(list(alphabet), 200)
+    data = {}
+    for i in range(num_seqs):
+        seq = ancestor.copy()
+        positions = rng.randint(0, len(seq), 25)
+        seq[positions] = rng.choice(list(alphabet + "-"), 25)
+        data[f"s{num_seqs - i:02d}"] = "".join(seq)
+    return make_aligned_seqs(data=data, moltype=moltype)
+
+
+class BlockedDistanceTests(TestCase):
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.aln = _make_aln(13)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name="dists"):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_tiles(self):
+        """tiles cover the upper triangle once"""
+        covered = numpy.zeros((13, 13), dtype=int)
+        for r0, r1, c0, c1 in _tiles(13, 4):
+            covered[r0:r1, c0:c1] += 1
+        self.assertTrue(
+            (numpy.triu(covered, 1) == numpy.triu(numpy.ones((13, 13)), 1)).all()
+        )
+
+    def test_matches_in_memory(self):
+        """tiled distances match in memory distances"""
+        aln = _make_aln(13, "protein", "ACDEFGHIKLMNPQRSTVWY")
+        for calc, aln in [("tn93", self.aln), ("hamming", aln), ("percent", aln)]:
+            expect = aln.distance_matrix(calc=calc)
+            for tile_size in (1, 4, 13):
+                got = blocked_distances(
+                    aln, calc, self._path(f"{calc}-{tile_size}"), tile_size=tile_size
+                )
+                self.assertEqual(got.names, expect.names)
+                assert_allclose(got.to_condensed(), expect.to_condensed())
+                assert_allclose(got.array, expect.array)
+
+    def test_resume(self):
+        """only incomplete tiles are computed when resuming"""
+        path = self._path()
+        expect = blocked_distances(self.aln, "jc69", path, tile_size=4)
+        expect = expect.to_condensed().copy()
+
+        # mimic an interrupted computation
+        done = numpy.load(os.path.join(path, "tiles.npy"), mmap_mode="r+")
+        done[[1, 4]] = False
+        done.flush()
+        dists = numpy.load(os.path.join(path, "distances.npy"), mmap_mode="r+")
+        dists[:] = -1
+        dists.flush()
+        del done, dists
+
+        with self.assertRaises(ValueError):
+            load_distances(path)
+
+        got = blocked_distances(self.aln, "jc69", path, tile_size=4)
+        recomputed = got.to_condensed() != -1
+        self.assertTrue(0 < recomputed.sum() < len(expect))
+        assert_equal(got.to_condensed()[recomputed], expect[recomputed])
+
+        # settings differ from the stored computation
+        with self.assertRaises(ValueError):
+            blocked_distances(self.aln, "jc69", path, tile_size=5)
+        with self.assertRaises(ValueError):
+            blocked_distances(self.aln[:100], "jc69", path, tile_size=4)
+
+    def test_invalid(self):
+        """invalid distances are nan, or raise an ArithmeticError"""
+        data = self.aln.to_dict()
+        # every site differs, so JC69 is undefined
+        data["s03"] = data["s03"].translate(str.maketrans("ACGT", "CGTA"))
+        aln = make_aligned_seqs(data=data, moltype="dna")
+        got = blocked_distances(aln, "jc69", self._path(), tile_size=4)
+        self.assertTrue(numpy.isnan(got["s03", "s05"]))
+        # as s03 is invalid with all others, all are dropped
+        self.assertIsNone(got.drop_invalid())
+        self.assertIsNone(aln.distance_matrix(calc="jc69", drop_invalid=True))
+        with self.assertRaisesRegex(ArithmeticError, "s01 - s03"):
+            blocked_distances(
+                aln, "jc69", self._path("raises"), tile_size=4, invalid_raises=True
+            )
+        with self.assertRaises(ArithmeticError):
+            aln.distance_matrix(calc="jc69", out_path=self._path("aln"))
+        got = aln.distance_matrix(
+            calc="jc69", out_path=self._path("aln"), drop_invalid=True
+        )
+        self.assertIsNone(got)
+        # dropping nothing returns the on disk matrix
+        got = self.aln.distance_matrix(
+            calc="jc69", out_path=self._path("valid"), drop_invalid=True
+        )
+        assert_allclose(
+            got.to_condensed(), self.aln.distance_matrix("jc69").to_condensed()
+        )
+
+
+if __name__ == "__main__":
+    main()
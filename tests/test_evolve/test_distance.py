@@ -28,17 +28,30 @@ from cogent3.evolve.fast_distance import (
     _calculators,
     _fill_diversity_matrix,
     _hamming,
+    _hamming_stats,
     _jc69_from_matrix,
+    _jc69_stats,
+    _logdet,
+    _logdet_stats,
+    _pack_seqs,
+    _paralinear,
+    _paralinear_stats,
     _tn93_from_matrix,
+    _tn93_stats,
     available_distances,
     get_distance_calculator,
     get_moltype_index_array,
     seq_to_indices,
 )
 from cogent3.evolve.models import F81, HKY85, JC69
+from cogent3.evolve.pairwise_distance_numba import (
+    count_packed_differences,
+    fill_diversity_matrices,
+)
 from cogent3.evolve.pairwise_distance_numba import (
     fill_diversity_matrix as numba_fill_diversity_matrix,
 )
+from cogent3.evolve.pairwise_distance_numba import popcount
 
 
 warnings.filterwarnings("ignore", "Not using MPI as mpi4py not found")
@@ -133,6 +146,88 @@ class TestPair(TestCase):
         numba_fill_diversity_matrix(matrix2, s1, s2)
         assert_allclose(matrix1, matrix2)
 
+    def test_fill_diversity_matrices(self):
+        """all pairs kernel matches single pair diversity matrices"""
+        indices = numpy.array(
+            [[0, 1, 2, 3, -9, 0], [0, 1, 1, 3, 2, -9], [3, 3, 2, 1, 0, 0]]
+        )
+        rows = numpy.array([0, 0, 1])
+        cols = numpy.array([1, 2, 2])
+        matrices = numpy.zeros((3, 4, 4))
+        fill_diversity_matrices(matrices, indices, rows, cols)
+        for k, (i, j) in enumerate(zip(rows, cols)):
+            expect = numpy.zeros((4, 4))
+            numba_fill_diversity_matrix(expect, indices[i], indices[j])
+            assert_equal(matrices[k], expect)
+
+    def test_popcount(self):
+        """number of set bits in 64-bit words"""
+        for value in (0, 1, 2 ** 64 - 1, 0xF0F0, 12345678901234567):
+            self.assertEqual(popcount(numpy.uint64(value)), bin(value).count("1"))
+
+    def test_count_packed_differences(self):
+        """bit packed counts match diversity matrices"""
+        rng = numpy.random.RandomState(11)
+        for dim, length in ((4, 7), (4, 150), (21, 64), (21, 200)):
+            indices = rng.randint(-1, dim, (5, length))
+            valid, planes = _pack_seqs(indices, dim)
+            self.assertEqual(planes.shape[1], 2 if dim == 4 else 5)
+            rows, cols = numpy.triu_indices(5, 1)
+            totals = numpy.zeros(len(rows))
+            diffs = numpy.zeros(len(rows))
+            count_packed_differences(valid, planes, rows, cols, totals, diffs)
+            matrices = numpy.zeros((len(rows), dim, dim))
+            fill_diversity_matrices(matrices, indices, rows, cols)
+            expect = matrices.sum(axis=(1, 2))
+            assert_equal(totals, expect)
+            assert_equal(diffs, expect - numpy.trace(matrices, axis1=1, axis2=2))
+
+    def test_stats_from_matrices(self):
+        """stats from stacks of diversity matrices match single matrix funcs"""
+        rng = numpy.random.RandomState(7)
+        matrices = numpy.diag([20.0, 20, 20, 20]) + rng.randint(0, 4, (50, 4, 4))
+        # identical, empty, saturated and missing state matrices
+        matrices[0] = numpy.diag([5.0, 0, 3, 0])
+        matrices[1] = 0
+        matrices[2] = 10 - numpy.diag([10.0] * 4)
+        matrices[3, 0] = matrices[3, :, 0] = 0
+        calc = TN93Pair(DNA)
+        funcs = [
+            (_hamming, _hamming_stats, []),
+            (_jc69_from_matrix, _jc69_stats, []),
+            (_tn93_from_matrix, _tn93_stats, calc._func_args),
+            (_logdet, _logdet_stats, [True]),
+            (_logdet, _logdet_stats, [False]),
+            (_paralinear, _paralinear_stats, []),
+        ]
+        for func, array_func, args in funcs:
+            got = numpy.array(array_func(matrices.copy(), *args)).T
+            for k, matrix in enumerate(matrices):
+                expect = func(matrix.copy(), *args)
+                expect = [numpy.nan if v is None else v for v in expect]
+                assert_allclose(got[k], expect, err_msg=f"{func.__name__} {k}")
+
+    def test_func_without_array_func(self):
+        """calculators without an array func apply func to each pair"""
+
+        class DiffsPair(HammingPair):
+            def __init__(self, *args, **kwargs):
+                super(DiffsPair, self).__init__(*args, **kwargs)
+                self._array_func = None
+                self._packed_counts = False
+
+        aln = make_aligned_seqs(
+            data={"a": "ACGGT", "b": "ACGCT", "c": "TCGCA", "d": "ACGCT"}, moltype=DNA
+        )
+        calc = DiffsPair(DNA, alignment=aln)
+        calc.run(show_progress=False)
+        expect = HammingPair(DNA, alignment=aln)
+        expect.run(show_progress=False)
+        assert_equal(calc.dists.array, expect.dists.array)
+        self.assertEqual(calc.duplicated, {"b": ["d"]})
+        self.assertEqual(calc._dists, expect._dists)
+        self.assertEqual(calc._dists[("a", "c")].dist, 3)
+
     def test_hamming_from_matrix(self):
         """compute hamming from diversity matrix"""
         s1 = seq_to_indices("ACGTACGTAC", self.dna_char_indices)
@@ -745,6 +840,75 @@ class TestDistanceMatrix(TestCase):
             names.remove(n)
         self.assertEqual(set(darr.names), names)
 
+    def test_from_array(self):
+        """constructs from square or condensed arrays with names"""
+        names = ["c", "a", "b"]
+        square = numpy.array([[0, 1.0, 2.0], [1.0, 0, 3.0], [2.0, 3.0, 0]])
+        dmat = DistanceMatrix(square, names=names)
+        self.assertEqual(dmat.names, names)
+        self.assertEqual(dmat["c", "b"], 2.0)
+        assert_allclose(dmat.to_condensed(), [1.0, 2.0, 3.0])
+        condensed = DistanceMatrix([1.0, 2.0, 3.0], names=names)
+        assert_allclose(condensed.array, square)
+        assert_equal(dmat.name_indices(["b", "c"]), [2, 0])
+        self.assertEqual(
+            dmat.to_dict(),
+            DistanceMatrix(
+                {(a, b): dmat[a, b] for a in names for b in names}
+            ).to_dict(),
+        )
+        # wrapping a DictArray shares its template
+        self.assertIs(DistanceMatrix(dmat).template, dmat.template)
+
+        with self.assertRaises(ValueError):
+            DistanceMatrix(square)
+        with self.assertRaises(ValueError):
+            DistanceMatrix(square, names=names[:2])
+        with self.assertRaises(ValueError):
+            DistanceMatrix([1.0, 2.0], names=names)
+
+    def test_from_condensed(self):
+        """matrix reading from condensed distances"""
+        names = ["c", "a", "b", "d"]
+        square = numpy.arange(16, dtype=float).reshape(4, 4)
+        square = square + square.T
+        square[0, 2] = square[2, 0] = numpy.nan
+        numpy.fill_diagonal(square, 0)
+        expect = DistanceMatrix(square, names=names)
+        condensed = expect.to_condensed()
+        got = DistanceMatrix.from_condensed(condensed, names)
+        self.assertIs(got.to_condensed(), condensed)
+        self.assertEqual(got["d", "a"], expect["d", "a"])
+        self.assertEqual(got["a", "a"], 0)
+        sub = got.take_dists(["d", "c", "a"])
+        assert_equal(sub.array, expect.take_dists(["d", "c", "a"]).array)
+        self.assertEqual(got.drop_invalid().names, ["a", "d"])
+        # the square array is only created on use
+        self.assertNotIn("array", got.__dict__)
+        assert_equal(got.array, expect.array)
+        self.assertIsNone(got._condensed)
+        with self.assertRaises(ValueError):
+            DistanceMatrix.from_condensed(condensed[:-1], names)
+
+    def test_take_dists_order(self):
+        """take_dists preserves name order, does not modify the original"""
+        names = ["c", "a", "b", "d"]
+        square = numpy.arange(16, dtype=float).reshape(4, 4)
+        square = square + square.T
+        numpy.fill_diagonal(square, 0)
+        dmat = DistanceMatrix(square, names=names)
+        got = dmat.take_dists(["d", "c", "b"])
+        self.assertEqual(got.names, ["c", "b", "d"])
+        self.assertEqual(got["c", "d"], dmat["c", "d"])
+        self.assertIsNone(dmat.take_dists(["c", "a", "b"], negate=True))
+        row = dmat["a"]
+        self.assertEqual(row.shape, (4,))
+        self.assertEqual(dmat.names, names)
+
+        square[0, 2] = square[2, 0] = numpy.nan
+        got = DistanceMatrix(square, names=names).drop_invalid()
+        self.assertEqual(got.names, ["a", "d"])
+
 
 class DistancesTests(TestCase):
     def setUp(self):
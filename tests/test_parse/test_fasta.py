@@ -13,6 +13,7 @@ from cogent3.parse.fasta import (
     FastaParser,
     GroupFastaParser,
     LabelParser,
+    LightFastaParser,
     MinimalFastaParser,
     NcbiFastaLabelParser,
     NcbiFastaParser,
@@ -222,6 +223,43 @@ class FastaParserTests(GenericFastaTest):
         self.assertEqual((b.name, b), ("456", "cg".upper()))
 
 
+class LightFastaParserTests(GenericFastaTest):
+    """Tests of LightFastaParser: returns (name, LightSequence) tuples."""
+
+    def test_multiple(self):
+        """LightFastaParser should read multiline records correctly"""
+        from cogent3 import DNA
+        from cogent3.core.sequence import LightSequence
+
+        f = list(LightFastaParser(self.threeseq, moltype="dna"))
+        self.assertEqual(len(f), 3)
+        for name, seq in f:
+            assert isinstance(seq, LightSequence)
+            self.assertEqual(seq.name, name)
+            self.assertIs(seq.moltype, DNA)
+        self.assertEqual(
+            [(n, str(s)) for n, s in f],
+            [("123", "A"), ("abc", "CAGGAC"), ("456", "CG")],
+        )
+
+    def test_multiple_bad(self):
+        """Parser should complain or skip bad records"""
+        self.assertRaises(RecordError, list, LightFastaParser(self.twogood))
+        f = list(LightFastaParser(self.twogood, strict=False))
+        self.assertEqual([n for n, _ in f], ["abc", "456"])
+
+    def test_to_collection(self):
+        """parsed sequences can be used to make a collection"""
+        from cogent3 import make_unaligned_seqs
+
+        seqs = make_unaligned_seqs(dict(LightFastaParser(self.threeseq)), moltype="dna")
+        self.assertEqual(seqs.to_dict(), {"123": "A", "abc": "CAGGAC", "456": "CG"})
+        seqs = make_unaligned_seqs(
+            [s for _, s in LightFastaParser(self.threeseq)], moltype="dna"
+        )
+        self.assertEqual(seqs.names, ["123", "abc", "456"])
+
+
 class NcbiFastaLabelParserTests(TestCase):
     """Tests of the label line parser for NCBI's FASTA identifiers."""
 
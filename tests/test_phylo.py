@@ -3,13 +3,23 @@ import os
 import unittest
 import warnings
 
+from unittest.mock import patch
+
 from numpy import exp, log
 
 from cogent3 import get_model, load_aligned_seqs, load_tree, make_tree
-from cogent3.phylo.consensus import get_splits, get_tree, majority_rule
-from cogent3.phylo.least_squares import wls
+from cogent3.phylo.consensus import (
+    SplitSupport,
+    get_split_bits,
+    get_splits,
+    get_tree,
+    majority_rule,
+    robinson_foulds,
+    robinson_foulds_matrix,
+)
+from cogent3.phylo.least_squares import WLS, wls
 from cogent3.phylo.maximum_likelihood import ML
-from cogent3.phylo.nj import gnj, nj
+from cogent3.phylo.nj import fast_nj, gnj, nj
 from cogent3.phylo.tree_collection import (
     LogLikelihoodScoredTreeCollection,
     ScoredTreeCollection,
@@ -408,6 +418,96 @@ class ConsensusTests(unittest.TestCase):
         tree = load_tree(os.path.join(data_path, "murphy.tree"))
         self.assertTrue(tree.same_topology(get_tree(get_splits(tree))))
 
+    def test_get_split_bits(self):
+        """bitset splits match get_splits, independent of the root"""
+        tree = load_tree(os.path.join(data_path, "murphy.tree"))
+        names = sorted(tree.get_tip_names())
+        tip_bits = {n: 1 << i for i, n in enumerate(names)}
+        got = get_split_bits(tree, tip_bits)
+        expect = get_splits(tree)
+        self.assertEqual(len(got), len(expect))
+        for split, params in expect.items():
+            (side,) = [s for s in split if names[0] not in s]
+            bits = sum(tip_bits[n] for n in side)
+            self.assertAlmostEqual(got[bits], params["length"])
+
+        rooted = tree.rooted_with_tip(names[3])
+        self.assertEqual(set(get_split_bits(rooted, tip_bits)), set(got))
+
+    def test_split_support(self):
+        """split weights and mean lengths from a collection of trees"""
+        support = SplitSupport(self.unrooted_trees_lengths)
+        ac = support.tip_bits["a"] | support.tip_bits["c"]
+        bd = support.tip_bits["b"] | support.tip_bits["d"]
+        # whichever side excludes the first tip
+        bits = ac if ac & 1 == 0 else bd
+        self.assertAlmostEqual(support.support(bits), 2 / 3)
+        self.assertAlmostEqual(support.length(bits), 0.5)
+
+        table = support.to_table()
+        self.assertEqual(table.header, ("split", "support", "length"))
+        self.assertEqual(table.shape[0], 2)
+        self.assertAlmostEqual(table.columns["support"][0], 2 / 3)
+        self.assertEqual(support.to_table(include_tips=True).shape[0], 6)
+
+        support = SplitSupport(self.rooted_trees_lengths, rooted=True)
+        table = support.to_table()
+        self.assertEqual(table.header, ("clade", "support", "length"))
+        self.assertEqual(table.columns["support"].tolist(), [3, 2, 2, 1, 1])
+
+        with self.assertRaises(NotImplementedError):
+            SplitSupport([(1, Tree("(a,b,c);")), (1, Tree("(a,b,d);"))])
+
+    def test_robinson_foulds(self):
+        """number of splits in only one tree"""
+        t1 = Tree("((a,b),c,(d,e));")
+        self.assertEqual(robinson_foulds(t1, Tree("((a,b),c,(d,e));")), 0)
+        self.assertEqual(robinson_foulds(t1, Tree("((e,d),(b,a),c);")), 0)
+        self.assertEqual(robinson_foulds(t1, Tree("((a,c),b,(d,e));")), 2)
+        self.assertEqual(robinson_foulds(t1, Tree("(a,b,c,d,e);")), 2)
+        # re-rooting doesn't change unrooted splits
+        self.assertEqual(robinson_foulds(t1, t1.rooted_with_tip("a")), 0)
+        rooted = Tree("((a,b),(c,(d,e)));")
+        other = Tree("(((a,b),c),(d,e));")
+        self.assertEqual(robinson_foulds(rooted, other), 0)
+        self.assertEqual(robinson_foulds(rooted, other, rooted=True), 2)
+        with self.assertRaises(ValueError):
+            robinson_foulds(t1, Tree("((a,b),c,(d,f));"))
+
+    def test_robinson_foulds_matrix(self):
+        """all pairs Robinson-Foulds distances match those of each pair"""
+        trees = [tree for (score, tree) in self.trees_randomly_rooted]
+        for rooted in (False, True):
+            got = robinson_foulds_matrix(trees, rooted=rooted)
+            self.assertEqual(got.shape, (len(trees), len(trees)))
+            for i, j in [(0, 1), (3, 12), (20, 5), (7, 7)]:
+                self.assertEqual(
+                    got[str(i), str(j)],
+                    robinson_foulds(trees[i], trees[j], rooted=rooted),
+                )
+
+        sct = LogLikelihoodScoredTreeCollection(self.trees_randomly_rooted)
+        got = sct.get_rf_distances()
+        self.assertEqual(got["0", "1"], robinson_foulds(trees[0], trees[1]))
+        got = robinson_foulds_matrix(self.trees, names="abcd")
+        self.assertEqual(got.names, list("abcd"))
+        self.assertEqual(got["a", "c"], 2)
+        self.assertEqual(got["a", "b"], 0)
+        with self.assertRaises(ValueError):
+            robinson_foulds_matrix(self.trees, names="abc")
+        with self.assertRaises(ValueError):
+            robinson_foulds_matrix(self.trees + [Tree("((a,b),c,e);")])
+        for trees in ([], self.trees[:1]):
+            with self.assertRaises(ValueError):
+                robinson_foulds_matrix(trees)
+
+    def test_robinson_foulds_matrix_parallel(self):
+        """trees encoded in parallel give the same distances"""
+        trees = [tree for (score, tree) in self.trees_randomly_rooted]
+        expect = robinson_foulds_matrix(trees)
+        got = robinson_foulds_matrix(trees, parallel=True)
+        self.assertEqual(got.array.tolist(), expect.array.tolist())
+
     def test_consensus_tree_branch_lengths(self):
         """consensus trees should average branch lengths properly"""
 
@@ -496,6 +596,11 @@ class TreeReconstructionTests(unittest.TestCase):
     def setUp(self):
         self.tree = make_tree(treestring="((a:3,b:4):2,(c:6,d:7):30,(e:5,f:5):5)")
         self.dists = self.tree.get_distances()
+        # deterministic noise, so the fit is not exact
+        self.noisy_dists = {
+            (a, b): dist * (1 + 0.1 * ((ord(a) * ord(b)) % 7 - 3))
+            for (a, b), dist in self.dists.items()
+        }
 
     def assertTreeDistancesEqual(self, t1, t2):
         d1 = t1.get_distances()
@@ -509,6 +614,30 @@ class TreeReconstructionTests(unittest.TestCase):
         reconstructed = nj(self.dists, show_progress=False)
         self.assertTreeDistancesEqual(self.tree, reconstructed)
 
+    def test_fast_nj(self):
+        """fast_nj matches nj"""
+        import numpy
+
+        from cogent3.evolve.fast_distance import DistanceMatrix
+
+        reconstructed = fast_nj(self.dists, show_progress=False)
+        self.assertEqual(reconstructed.name, "root")
+        self.assertEqual(len(reconstructed.children), 3)
+        self.assertTreeDistancesEqual(self.tree, reconstructed)
+
+        # noisy distances, so the tree is not simply recovered
+        rng = numpy.random.RandomState(3)
+        points = rng.random_sample((40, 4))
+        data = numpy.sqrt(((points[:, None] - points[None]) ** 2).sum(axis=-1))
+        dmat = DistanceMatrix(data, names=[f"s{i}" for i in range(40)])
+        expect = nj(dmat, show_progress=False)
+        got = fast_nj(dmat, show_progress=False)
+        self.assertTrue(got.same_topology(expect))
+        self.assertTreeDistancesEqual(got, expect)
+
+        with self.assertRaises(ValueError):
+            fast_nj({("a", "b"): 1.0}, show_progress=False)
+
     def test_gnj(self):
         """testing gnj"""
         results = gnj(self.dists, keep=1, show_progress=False)
@@ -541,11 +670,70 @@ class TreeReconstructionTests(unittest.TestCase):
         self.assertEqual(scores[:2], [7.75, 7.75])
         self.assertNotEqual(scores[2], 7.75)
 
+    def test_nj_distance_matrix(self):
+        """nj from a DistanceMatrix matches that from a dict"""
+        from cogent3.evolve.fast_distance import DistanceMatrix
+
+        dmat = DistanceMatrix(self.dists)
+        reconstructed = nj(dmat, show_progress=False)
+        self.assertTreeDistancesEqual(self.tree, reconstructed)
+
+    def test_distance_matrix_to_2D(self):
+        """DistanceMatrix converted as for a dict"""
+        from numpy import nan
+        from numpy.testing import assert_allclose
+
+        from cogent3.evolve.fast_distance import DistanceMatrix
+        from cogent3.phylo.util import distance_dict_to_2D
+
+        names = ["a", "b", "c"]
+        data = [[1.0, 2.0, nan], [2.0, 0.0, 3.0], [4.0, 3.0, 0.0]]
+        got_names, got = distance_dict_to_2D(DistanceMatrix(data, names=names))
+        self.assertEqual(got_names, names)
+        assert_allclose(got, [[0, 2, 4], [2, 0, 3], [4, 3, 0]])
+
+        data[2][0] = nan
+        with self.assertRaises(KeyError):
+            distance_dict_to_2D(DistanceMatrix(data, names=names))
+        data[2][0] = 5.0
+        data[0][2] = 4.0
+        with self.assertRaises(ValueError):
+            distance_dict_to_2D(DistanceMatrix(data, names=names))
+
     def test_wls(self):
         """testing wls"""
         reconstructed = wls(self.dists, a=4, show_progress=False)
         self.assertTreeDistancesEqual(self.tree, reconstructed)
 
+    def test_wls_batch_scorers(self):
+        """batched and incremental scoring match scoring each tree"""
+        from numpy import identity
+        from numpy.testing import assert_allclose
+
+        from cogent3.phylo.tree_space import grown
+
+        evaluator = WLS(self.noisy_dists)
+        names = evaluator.names
+        # a 5 tip tree, grown to 6 at each of its edges
+        old_ancestry = grown(grown(identity(3, int), 1), 2)
+        ancestries = [grown(old_ancestry, edge) for edge in range(7)]
+        expect = [evaluator.make_tree_scorer(names)(a) for a in ancestries]
+
+        got = evaluator.make_batch_scorer(names)(ancestries)
+        for (err, lengths), (expect_err, expect_lengths) in zip(got, expect):
+            assert_allclose(err, expect_err, atol=1e-12)
+            assert_allclose(lengths, expect_lengths, atol=1e-12)
+
+        got = evaluator.make_grown_scorer(names)(old_ancestry, list(range(7)))
+        for (
+            (err, lengths, ancestry),
+            (expect_err, expect_lengths),
+            expect_ancestry,
+        ) in zip(got, expect, ancestries):
+            assert_allclose(err, expect_err, atol=1e-12)
+            assert_allclose(lengths, expect_lengths, atol=1e-12)
+            assert_allclose(ancestry, expect_ancestry)
+
     def test_truncated_wls(self):
         """testing wls with order option"""
         order = ["e", "b", "c", "d"]
@@ -582,6 +770,61 @@ class TreeReconstructionTests(unittest.TestCase):
         assert_allclose(lnL, -8882.217502905267)
         self.assertTrue(tree.same_topology(make_tree("(Mouse,Rat,(Human,Dog));")))
 
+    def test_ml_parallel(self):
+        """ML candidate trees evaluated in parallel match serial"""
+        aln = load_aligned_seqs(os.path.join(data_path, "brca1.fasta"), moltype="dna")
+        aln = aln.take_seqs(["Human", "Mouse", "Rat", "Dog", "Horse"])
+        aln = aln.omit_gap_pos(allowed_gap_frac=0)
+        ml = ML(get_model("JC69"), aln)
+        expect = ml.trex(a=3, k=2, return_all=True, show_progress=False)
+        got = ml.trex(a=3, k=2, return_all=True, parallel=True, show_progress=False)
+        self.assertEqual(len(got), len(expect))
+        for (lnL1, tree1), (lnL2, tree2) in zip(got, expect):
+            self.assertAlmostEqual(lnL1, lnL2, places=4)
+            self.assertTrue(tree1.same_topology(tree2))
+
+    def test_trex_prune(self):
+        """pruned tree search evaluates fewer candidates"""
+        import pickle
+
+        import numpy
+
+        from cogent3.phylo import tree_space
+
+        evaluator = WLS(self.noisy_dists)
+        scorer = tree_space._CandidateScorer(evaluator, evaluator.names[:4])
+        # scorers are sent to other processes when parallel
+        scorer = pickle.loads(pickle.dumps(scorer))
+        ((err, ordinal, edge, lengths, ancestry),) = scorer(
+            (0, numpy.identity(3, int), [1])
+        )
+        self.assertEqual((ordinal, edge), (0, 1))
+        self.assertEqual(ancestry.shape, (5, 5))
+
+        with patch.object(
+            tree_space._CandidateScorer,
+            "__call__",
+            autospec=True,
+            side_effect=tree_space._CandidateScorer.__call__,
+        ) as counted:
+            expect = evaluator.trex(a=4, k=3, return_all=True)
+            num_calls = counted.call_count
+            got = evaluator.trex(a=4, k=3, return_all=True, prune=True)
+
+        self.assertLess(counted.call_count - num_calls, num_calls)
+        self.assertAlmostEqual(got[0][0], expect[0][0])
+        self.assertTrue(got[0][1].same_topology(expect[0][1]))
+
+    def test_trex_prune_parallel(self):
+        """pruned tree search in parallel matches serial"""
+        evaluator = WLS(self.noisy_dists)
+        expect = evaluator.trex(a=4, k=3, return_all=True, prune=True)
+        got = evaluator.trex(a=4, k=3, return_all=True, prune=True, parallel=True)
+        self.assertEqual(len(got), len(expect))
+        for (err1, tree1), (err2, tree2) in zip(got, expect):
+            self.assertAlmostEqual(err1, err2)
+            self.assertTrue(tree1.same_topology(tree2))
+
 
 if __name__ == "__main__":
     unittest.main()